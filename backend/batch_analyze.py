@@ -0,0 +1,89 @@
+"""
+Tags a directory or tar/zip archive of images and voice clips by mood.
+
+    python batch_analyze.py photos/ --out moods.jsonl
+    python batch_analyze.py library.tar.gz --out moods/ --format parquet
+    python batch_analyze.py clips.zip --out voice.jsonl --kind audio
+
+Re-running with the same --out resumes: files already in the output
+are skipped. Parquet output needs the optional `pyarrow` package.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import sys
+
+from emotion.batch_jobs import (
+    BATCH_QUEUE_SIZE,
+    BATCH_SIZE,
+    BATCH_WORKERS,
+    BatchJob,
+)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("source", help="directory, .tar(.gz/.bz2/.xz) or .zip")
+    parser.add_argument("--out", required=True,
+                        help="JSONL file or Parquet directory")
+    parser.add_argument("--format", choices=("jsonl", "parquet"),
+                        help="default: from the --out extension")
+    parser.add_argument("--kind", choices=("all", "image", "audio"), default="all")
+    parser.add_argument("--workers", type=int, default=BATCH_WORKERS,
+                        help="decode / detect threads")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="face crops (or clips) per forward pass")
+    parser.add_argument("--queue", type=int, default=BATCH_QUEUE_SIZE,
+                        help="files buffered between pipeline stages")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO").upper())
+
+    if not os.path.exists(args.source):
+        print(f"❌ No such source: {args.source}")
+        sys.exit(2)
+
+    kinds = ("image", "audio") if args.kind == "all" else (args.kind,)
+    job = BatchJob(
+        args.source,
+        args.out,
+        fmt=args.format,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        queue_size=args.queue,
+        kinds=kinds
+    )
+
+    # Ctrl-C stops cleanly; everything written so far is kept for resume
+    signal.signal(signal.SIGINT, lambda *_: job.cancel())
+
+    def progress(stats):
+        print(
+            f"\r📦 {stats['processed']} files "
+            f"({stats['failed']} failed) · {stats['files_per_sec']:.1f} files/s",
+            end="",
+            flush=True
+        )
+
+    result = job.run(progress)
+    stats = result["stats"]
+    print()
+    print(
+        f"{'✅' if result['status'] == 'completed' else '⚠️'} {result['status']}: "
+        f"{stats['processed']} files in {stats['seconds']:.1f}s "
+        f"({stats['files_per_sec']:.1f} files/s), "
+        f"{stats['failed']} failed, {stats['skipped']} skipped (resumed)"
+    )
+    if result["error"]:
+        print(f"❌ {result['error']}")
+
+    sys.exit(0 if result["status"] == "completed" else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Voice upload ingest: original sf.read + librosa.resample vs
+emotion/audio_ingest.py (float32 decode, polyphase resampling, length cap).
+
+    python benchmarks/bench_audio_ingest.py
+
+Uploads are what the browser fallback sends: 48 kHz 16-bit WAV (plus a
+44.1 kHz stereo variant). "reference" is the pre-refactor path with
+librosa's keyword resample call (the old positional call fails on
+librosa >= 0.10); it decodes and resamples the whole clip. With ffmpeg
+on PATH, WebM/Opus uploads of the same clips are timed too.
+"""
+
+import io
+import os
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from fixtures import speech_clip
+from emotion.audio_ingest import MAX_VOICE_SECONDS
+from emotion.voice_emotion import TARGET_SR, load_voice_audio
+
+RUNS = 5
+# The first MAX_VOICE_SECONDS of both paths must still match closely
+SNR_MIN_DB = 40.0
+
+
+def reference(data):
+    audio, sr = sf.read(io.BytesIO(data))
+    if audio.ndim > 1:
+        audio = np.mean(audio, axis=1)
+    if sr != TARGET_SR:
+        audio = librosa.resample(audio, orig_sr=sr, target_sr=TARGET_SR)
+    return audio.astype(np.float32, copy=False)
+
+
+def upload(seconds, sr, channels, fmt="WAV"):
+    audio = speech_clip(seconds, sr=sr)
+    if channels == 2:
+        audio = np.stack([audio, 0.8 * audio], axis=1)
+
+    buf = io.BytesIO()
+    sf.write(buf, audio, sr, format=fmt, subtype="PCM_16")
+    return buf.getvalue()
+
+
+def webm_upload(wav):
+    out = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", "pipe:0",
+         "-c:a", "libopus", "-b:a", "32k", "-f", "webm", "pipe:1"],
+        input=wav, capture_output=True, check=True
+    )
+    return out.stdout
+
+
+def measure(fn, data):
+    fn(data)   # warm-up (filter design, FFT plans)
+
+    t = time.perf_counter()
+    for _ in range(RUNS):
+        fn(data)
+    elapsed = (time.perf_counter() - t) / RUNS
+
+    tracemalloc.start()
+    fn(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000.0, peak / 1e6
+
+
+def snr_db(ref, new):
+    n = min(len(ref), len(new))
+    # Skip filter edges, where the two resamplers legitimately differ
+    ref, new = ref[1000:n - 1000], new[1000:n - 1000]
+    noise = np.sum((ref - new) ** 2) + 1e-20
+    return 10 * np.log10(np.sum(ref ** 2) / noise)
+
+
+def main():
+    ok = True
+    new = lambda data: load_voice_audio(data)[0]
+
+    print(f"cap: MAX_VOICE_SECONDS={MAX_VOICE_SECONDS:g}")
+    print(
+        f"{'upload':>18} {'ref ms':>8} {'new ms':>8} {'speedup':>8} "
+        f"{'ref MB':>7} {'new MB':>7} {'new s':>6} {'SNR dB':>7}"
+    )
+
+    for sr, channels in ((48000, 1), (44100, 2)):
+        for seconds in (5, 30, 120):
+            data = upload(seconds, sr, channels)
+
+            snr = snr_db(reference(data), new(data))
+            ok = ok and snr >= SNR_MIN_DB
+
+            ref_ms, ref_mb = measure(reference, data)
+            new_ms, new_mb = measure(new, data)
+            kept = len(new(data)) / TARGET_SR
+
+            tag = f"{seconds}s {sr // 1000}k/{channels}ch"
+            print(
+                f"{tag:>18} {ref_ms:>8.1f} {new_ms:>8.1f} {ref_ms / new_ms:>7.1f}x "
+                f"{ref_mb:>7.1f} {new_mb:>7.1f} {kept:>6.1f} {snr:>7.1f}"
+            )
+
+    if shutil.which("ffmpeg"):
+        for seconds in (5, 30, 120):
+            data = webm_upload(upload(seconds, 48000, 1))
+            new_ms, new_mb = measure(new, data)
+            kept = len(new(data)) / TARGET_SR
+            tag = f"{seconds}s webm/opus"
+            print(
+                f"{tag:>18} {'-':>8} {new_ms:>8.1f} {'-':>8} "
+                f"{'-':>7} {new_mb:>7.1f} {kept:>6.1f} {'-':>7}"
+            )
+    else:
+        print("(ffmpeg not on PATH, WebM/Opus uploads skipped)")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Face CNN throughput vs latency, with and without micro-batching.
+
+    python benchmarks/bench_face_batching.py                # real model
+    python benchmarks/bench_face_batching.py --synthetic    # no TF needed
+
+--synthetic replaces Keras with a stand-in that has a fixed per-call
+overhead plus a small per-sample cost, which is the shape of the
+problem batching solves.
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from emotion.batching import MicroBatcher
+
+
+def load_predict_fn(synthetic: bool, call_overhead_ms: float, item_ms: float):
+    if synthetic:
+        weights = np.random.rand(64 * 64, 5).astype("float32")
+
+        def predict(batch):
+            time.sleep(call_overhead_ms / 1000.0 + item_ms / 1000.0 * len(batch))
+            logits = batch.reshape(len(batch), -1) @ weights
+            e = np.exp(logits - logits.max(axis=1, keepdims=True))
+            return e / e.sum(axis=1, keepdims=True)
+
+        return predict
+
+    from tensorflow.keras.models import load_model
+
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    model = load_model(
+        os.path.join(base, "model", "face_emotion_model.h5"), compile=False
+    )
+    return lambda batch: model.predict(batch, verbose=0)
+
+
+def run(call, concurrency: int, requests_per_worker: int):
+    latencies = []
+    lock = threading.Lock()
+    sample = np.random.rand(1, 64, 64, 1).astype("float32")
+
+    def worker():
+        local = []
+        for _ in range(requests_per_worker):
+            t0 = time.perf_counter()
+            call(sample)
+            local.append(time.perf_counter() - t0)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+
+    lat_ms = np.array(latencies) * 1000.0
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(lat_ms, 50)),
+        "p95_ms": float(np.percentile(lat_ms, 95)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", action="store_true")
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32")
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--max-batch-size", type=int, default=16)
+    parser.add_argument("--max-wait-ms", type=float, default=2.0)
+    parser.add_argument("--call-overhead-ms", type=float, default=20.0)
+    parser.add_argument("--item-ms", type=float, default=0.3)
+    args = parser.parse_args()
+
+    predict = load_predict_fn(args.synthetic, args.call_overhead_ms, args.item_ms)
+    direct_lock = threading.Lock()   # Keras predict() is effectively serial
+
+    def direct(x):
+        with direct_lock:
+            return predict(x)[0]
+
+    print(
+        f"{'conc':>5} {'mode':>8} {'req/s':>9} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'batch':>6}"
+    )
+
+    for conc in [int(c) for c in args.concurrency.split(",")]:
+        r = run(direct, conc, args.requests)
+        print(
+            f"{conc:>5} {'direct':>8} {r['throughput']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} {1:>6.1f}"
+        )
+
+        batcher = MicroBatcher(
+            predict,
+            max_batch_size=args.max_batch_size,
+            max_wait_ms=args.max_wait_ms
+        )
+        r = run(batcher.predict, conc, args.requests)
+        stats = batcher.get_stats()
+        batcher.close()
+        print(
+            f"{conc:>5} {'batched':>8} {r['throughput']:>9.1f} "
+            f"{r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+            f"{stats['mean_batch']:>6.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
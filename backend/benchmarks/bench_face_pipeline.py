@@ -0,0 +1,187 @@
+"""
+Per-stage timing of the face upload path on large phone-camera JPEGs.
+
+    python benchmarks/bench_face_pipeline.py
+    python benchmarks/bench_face_pipeline.py --image photo.jpg --runs 20
+
+Stages: upload read, decode (full vs IMREAD_REDUCED_*), SSD blob
+(extra cv2.resize vs blobFromImage alone), SSD forward, detection
+post-processing (Python loop vs vectorized) and crop + preprocess.
+
+Without the Caffe weights in models/dnn_face the forward pass is
+replaced by a fixed (200, 7) detection array and reported as n/a.
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from emotion import face_emotion
+from emotion.face_emotion import (
+    decode_image,
+    decode_reduction,
+    detections_to_boxes,
+    preprocess_face,
+    upload_buffer,
+)
+
+SIZES = {"12MP": (4032, 3024), "8MP": (3264, 2448), "3MP": (2048, 1536)}
+
+
+def phone_jpeg(width, height, seed=0):
+    """Smooth scene + sensor noise, compressed like a camera (q=92)"""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 255, (height // 64, width // 64, 3), np.uint8)
+    img = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    img = cv2.add(img, rng.integers(0, 12, img.shape, np.uint8))
+
+    cv2.ellipse(
+        img, (width // 2, height // 2), (width // 8, height // 6),
+        0, 0, 360, (150, 170, 210), -1
+    )
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 92])
+    return buf.tobytes()
+
+
+def fake_detections():
+    det = np.zeros((200, 7), np.float32)
+    det[:, 2] = np.random.default_rng(0).random(200) * 0.3
+    det[0, 2:7] = [0.97, 0.38, 0.33, 0.62, 0.67]
+    det[1, 2:7] = [0.55, 0.05, 0.10, 0.20, 0.35]
+    return det
+
+
+def loop_postprocess(detections, w, h):
+    """The original per-detection loop, for comparison"""
+    best_box, best_conf = None, 0.0
+    for i in range(detections.shape[0]):
+        conf = float(detections[i, 2])
+        if conf > best_conf and conf > 0.4:
+            box = detections[i, 3:7] * np.array([w, h, w, h])
+            (x1, y1, x2, y2) = box.astype("int")
+            x1, y1 = max(0, x1), max(0, y1)
+            x2, y2 = min(w, x2), min(h, y2)
+            if x2 > x1 and y2 > y1:
+                best_box = (int(x1), int(y1), int(x2), int(y2))
+                best_conf = conf
+    return best_box, best_conf
+
+
+def vector_postprocess(detections, w, h):
+    boxes, conf = detections_to_boxes(detections, w, h)
+    if len(conf) == 0:
+        return None, 0.0
+    best = int(np.argmax(conf))
+    return tuple(int(v) for v in boxes[best]), float(conf[best])
+
+
+def timed(fn, runs):
+    fn()
+    t = time.perf_counter()
+    for _ in range(runs):
+        out = fn()
+    return (time.perf_counter() - t) / runs * 1000.0, out
+
+
+def load_detector():
+    if not os.path.exists(face_emotion.DNN_MODEL_PATH):
+        return None
+    return face_emotion.get_face_net()
+
+
+def bench(name, data, runs, net):
+    rows = []
+
+    def row(stage, ms):
+        rows.append((stage, ms))
+
+    # Spooled uploads are written into a BytesIO chunk by chunk
+    upload = io.BytesIO()
+    upload.write(data)
+
+    def read_copy():
+        upload.seek(0)
+        return np.frombuffer(upload.read(), np.uint8)
+
+    row("read: .read() + frombuffer", timed(read_copy, runs)[0])
+    row("read: upload_buffer", timed(lambda: upload_buffer(upload), runs)[0])
+
+    ms, img = timed(lambda: decode_image(data), runs)
+    row("decode: full", ms)
+
+    factor = decode_reduction(data)
+    if factor > 1:
+        ms, small = timed(lambda: decode_image(data, factor), runs)
+        row(f"decode: reduced 1/{factor}", ms)
+    else:
+        small = img
+
+    mean = (104.0, 177.0, 123.0)
+    row("blob: resize + blob", timed(lambda: cv2.dnn.blobFromImage(
+        cv2.resize(img, (300, 300)), 1.0, (300, 300), mean
+    ), runs)[0])
+    ms, blob = timed(
+        lambda: cv2.dnn.blobFromImage(img, 1.0, (300, 300), mean), runs
+    )
+    row("blob: blobFromImage only", ms)
+    row("blob: reduced image", timed(
+        lambda: cv2.dnn.blobFromImage(small, 1.0, (300, 300), mean), runs
+    )[0])
+
+    if net is not None:
+        def forward():
+            net.setInput(blob)
+            return net.forward()[0, 0]
+        ms, detections = timed(forward, runs)
+        row("ssd forward", ms)
+    else:
+        detections = fake_detections()
+        row("ssd forward", None)
+
+    h, w = img.shape[:2]
+    ms, loop_best = timed(lambda: loop_postprocess(detections, w, h), runs)
+    row("post: python loop", ms)
+    ms, vec_best = timed(lambda: vector_postprocess(detections, w, h), runs)
+    row("post: vectorized", ms)
+    assert loop_best == vec_best, (loop_best, vec_best)
+
+    if vec_best[0] is not None:
+        x1, y1, x2, y2 = vec_best[0]
+        row("crop + preprocess", timed(lambda: preprocess_face(
+            cv2.cvtColor(img[y1:y2, x1:x2], cv2.COLOR_BGR2GRAY)
+        ), runs)[0])
+
+    print(f"\n{name}: {img.shape[1]}x{img.shape[0]}, {len(data) / 1e6:.1f} MB")
+    for stage, ms in rows:
+        value = "n/a" if ms is None else f"{ms:8.2f}"
+        print(f"  {stage:<26} {value:>8} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", help="JPEG/PNG file instead of synthetic")
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    net = load_detector()
+    if net is None:
+        print("⚠️ Caffe weights not found, SSD forward is skipped")
+
+    if args.image:
+        with open(args.image, "rb") as f:
+            bench(os.path.basename(args.image), f.read(), args.runs, net)
+        return
+
+    for name, (w, h) in SIZES.items():
+        bench(name, phone_jpeg(w, h), args.runs, net)
+
+
+if __name__ == "__main__":
+    main()
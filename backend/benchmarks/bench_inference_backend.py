@@ -0,0 +1,93 @@
+"""
+Keras vs NumPy vs TFLite inference backend: startup, per-call latency
+and RSS.
+
+    python export_models.py
+    python quantize_models.py          # int8 .tflite (INFERENCE_QUANT)
+    python benchmarks/bench_inference_backend.py
+
+Each backend runs in a fresh subprocess so import cost and peak RSS
+are measured in isolation.
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+
+MODELS = {
+    "face": (os.path.join(BASE_DIR, "model", "face_emotion_model.h5"), (64, 64, 1)),
+    "voice": (os.path.join(BASE_DIR, "model", "vocalvibe_model.h5"), (160,)),
+}
+
+
+def child(backend: str, which: str, calls: int):
+    os.environ["INFERENCE_BACKEND"] = backend
+
+    t0 = time.perf_counter()
+    import numpy as np
+    from ml_model.backend import load_inference_model
+
+    path, shape = MODELS[which]
+    model = load_inference_model(path)
+    load_s = time.perf_counter() - t0
+
+    x = np.random.rand(1, *shape).astype("float32")
+    model.predict(x, verbose=0)   # warm-up
+
+    lat = []
+    for _ in range(calls):
+        t = time.perf_counter()
+        model.predict(x, verbose=0)
+        lat.append((time.perf_counter() - t) * 1000.0)
+
+    lat.sort()
+    print(json.dumps({
+        "backend": backend,
+        "model": which,
+        "load_s": load_s,
+        "p50_ms": lat[len(lat) // 2],
+        "p95_ms": lat[int(len(lat) * 0.95)],
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--child", nargs=2, metavar=("BACKEND", "MODEL"))
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child, args.calls)
+        return
+
+    print(
+        f"{'model':>6} {'backend':>8} {'load s':>7} {'p50 ms':>8} "
+        f"{'p95 ms':>8} {'RSS MB':>8}"
+    )
+    for which in MODELS:
+        for backend in ("keras", "numpy", "tflite"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--calls", str(args.calls),
+                 "--child", backend, which],
+                capture_output=True, text=True
+            )
+            if out.returncode != 0:
+                print(f"{which:>6} {backend:>8} failed: {out.stderr.strip()[-200:]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{which:>6} {backend:>8} {r['load_s']:>7.2f} {r['p50_ms']:>8.3f} "
+                f"{r['p95_ms']:>8.3f} {r['peak_rss_mb']:>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Fast YIN vs librosa.pyin on synthetic voiced signals.
+
+    python benchmarks/bench_pitch.py
+
+Reports the f0 mean / std each estimator gives (the only statistics
+steer_emotion uses), the error of YIN against pyin, and latency per
+second of audio. Exits non-zero if YIN drifts past the tolerances.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from emotion.pitch import pyin, yin
+
+SR = 22050
+
+# steer_emotion thresholds are tens of Hz apart
+MEAN_TOL_HZ = 15.0
+STD_TOL_HZ = 20.0
+
+
+def harmonic_tone(f0, seconds, sr=SR, vibrato_hz=0.0, vibrato_depth=0.0,
+                  harmonics=5, noise=0.0, seed=0):
+    t = np.arange(int(seconds * sr)) / sr
+    inst_f0 = f0 * (1.0 + vibrato_depth * np.sin(2 * np.pi * vibrato_hz * t))
+    phase = 2 * np.pi * np.cumsum(inst_f0) / sr
+
+    y = sum(np.sin(k * phase) / k for k in range(1, harmonics + 1))
+    y = 0.3 * y / np.max(np.abs(y))
+    if noise:
+        y = y + noise * np.random.default_rng(seed).normal(size=len(y))
+    return y.astype(np.float32)
+
+
+def with_gaps(y, sr=SR, gap_seconds=0.4):
+    gap = np.zeros(int(gap_seconds * sr), np.float32)
+    half = len(y) // 2
+    return np.concatenate([gap, y[:half], gap, y[half:], gap])
+
+
+CASES = {
+    "sine 110 Hz": harmonic_tone(110, 3, harmonics=1),
+    "tone 150 Hz": harmonic_tone(150, 3),
+    "tone 220 Hz vibrato": harmonic_tone(220, 3, vibrato_hz=5, vibrato_depth=0.05),
+    "tone 320 Hz + noise": harmonic_tone(320, 3, noise=0.01),
+    "tone 180 Hz w/ silence": with_gaps(harmonic_tone(180, 3)),
+    "glide 120->260 Hz": harmonic_tone(190, 3, vibrato_hz=0.3, vibrato_depth=0.35),
+}
+
+
+def timed(fn, y):
+    t = time.perf_counter()
+    f0 = fn(y, SR)
+    return f0, time.perf_counter() - t
+
+
+def main():
+    ok = True
+    yin(CASES["sine 110 Hz"], SR)   # warm-up (imports)
+
+    print(
+        f"{'case':<24} {'pyin μ/σ':>14} {'yin μ/σ':>14} "
+        f"{'Δμ':>6} {'Δσ':>6} {'pyin ms/s':>10} {'yin ms/s':>9}"
+    )
+
+    for name, y in CASES.items():
+        seconds = len(y) / SR
+        ref, t_ref = timed(pyin, y)
+        fast, t_fast = timed(yin, y)
+
+        n = min(len(ref), len(fast))
+        ref, fast = ref[:n], fast[:n]
+        d_mean = abs(ref.mean() - fast.mean())
+        d_std = abs(ref.std() - fast.std())
+        passed = d_mean <= MEAN_TOL_HZ and d_std <= STD_TOL_HZ
+        ok = ok and passed
+
+        print(
+            f"{name:<24} {ref.mean():>6.1f}/{ref.std():>6.1f} "
+            f"{fast.mean():>6.1f}/{fast.std():>6.1f} "
+            f"{d_mean:>6.1f} {d_std:>6.1f} "
+            f"{1000 * t_ref / seconds:>10.1f} {1000 * t_fast / seconds:>9.2f}"
+            f"{'' if passed else '  ❌'}"
+        )
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Per-request voice feature cost: original librosa calls vs the
+single-pass extractor in emotion/features.py.
+
+    python benchmarks/bench_voice_features.py
+
+"reference" is the pre-refactor pipeline: librosa.feature.mfcc + two
+deltas on the peak-normalized clip, then librosa.feature.rms and
+spectral_centroid on the raw clip (three separate framings / STFTs).
+Also checks that the 160-dim model input still matches.
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+import librosa
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from emotion.features import compute_voice_features
+
+SR = 22050
+N_MFCC = 40
+RUNS = 10
+VECTOR_ATOL = 1e-3
+
+
+def reference(audio, sr):
+    normed = audio / (np.max(np.abs(audio)) + 1e-6)
+    mfcc = librosa.feature.mfcc(y=normed, sr=sr, n_mfcc=N_MFCC)
+    delta = librosa.feature.delta(mfcc)
+    delta2 = librosa.feature.delta(mfcc, order=2)
+    vector = np.hstack([
+        np.mean(mfcc, axis=1),
+        np.std(mfcc, axis=1),
+        np.mean(delta, axis=1),
+        np.mean(delta2, axis=1)
+    ])
+    rms = librosa.feature.rms(y=audio)[0]
+    centroid = np.mean(librosa.feature.spectral_centroid(y=audio, sr=sr))
+    return {"vector": vector, "rms": rms, "centroid": centroid}
+
+
+def speech_like(seconds, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SR)) / SR
+    f0 = 160 + 40 * np.sin(2 * np.pi * 0.7 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SR
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 2.5 * t), 0, None)   # syllables
+    y = 0.2 * voiced * envelope + 0.01 * rng.normal(size=len(t))
+    return y.astype(np.float32)
+
+
+def measure(fn, audio):
+    fn(audio, SR)   # warm-up (filter banks, FFT plans)
+
+    t = time.perf_counter()
+    for _ in range(RUNS):
+        fn(audio, SR)
+    elapsed = (time.perf_counter() - t) / RUNS
+
+    tracemalloc.start()
+    fn(audio, SR)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000.0, peak / 1e6
+
+
+def main():
+    ok = True
+    print(
+        f"{'clip':>5} {'ref ms':>8} {'new ms':>8} {'speedup':>8} "
+        f"{'ref MB':>7} {'new MB':>7} {'max |Δvec|':>11} {'Δrms':>9} {'Δcentroid':>10}"
+    )
+
+    for seconds in (2.5, 5, 10, 30):
+        audio = speech_like(seconds)
+
+        ref = reference(audio, SR)
+        new = compute_voice_features(audio, SR, n_mfcc=N_MFCC)
+        d_vec = float(np.max(np.abs(ref["vector"] - new["vector"])))
+        d_rms = float(np.max(np.abs(ref["rms"] - new["rms"])))
+        d_cen = abs(float(ref["centroid"]) - new["centroid"])
+        ok = ok and d_vec <= VECTOR_ATOL
+
+        ref_ms, ref_mb = measure(reference, audio)
+        new_ms, new_mb = measure(
+            lambda a, sr: compute_voice_features(a, sr, n_mfcc=N_MFCC), audio
+        )
+
+        print(
+            f"{seconds:>4}s {ref_ms:>8.2f} {new_ms:>8.2f} {ref_ms / new_ms:>7.1f}x "
+            f"{ref_mb:>7.1f} {new_mb:>7.1f} {d_vec:>11.2e} {d_rms:>9.1e} {d_cen:>10.3f}"
+        )
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
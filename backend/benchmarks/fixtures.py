@@ -0,0 +1,89 @@
+"""
+Deterministic synthetic inputs for the benchmark suite.
+
+    face_image(...)      BGR frame with face-like blobs (skin ellipse,
+                         eyes, mouth) on a textured background
+    speech_clip(...)     speech-band audio: glottal pulse train with a
+                         drifting f0, three formant resonances and a
+                         syllable-rate envelope
+    jpeg_bytes / wav_bytes   encoded uploads for the HTTP endpoints
+
+Everything is seeded, so two runs on the same machine see identical
+inputs and can be compared against a baseline.
+"""
+
+import io
+
+import cv2
+import numpy as np
+import soundfile as sf
+
+SR = 22050
+
+# (center Hz, bandwidth Hz) of a neutral vowel
+FORMANTS = ((500, 80), (1500, 120), (2500, 160))
+
+
+def face_image(width=640, height=480, faces=1, seed=0):
+    rng = np.random.default_rng(seed)
+
+    small = rng.integers(40, 200, (max(1, height // 32), max(1, width // 32), 3), np.uint8)
+    img = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+
+    for i in range(faces):
+        cx = int(width * (i + 1) / (faces + 1))
+        cy = height // 2
+        fw = max(8, width // (3 * faces + 1))
+        fh = int(fw * 1.3)
+
+        cv2.ellipse(img, (cx, cy), (fw // 2, fh // 2), 0, 0, 360, (140, 165, 205), -1)
+        for ex in (cx - fw // 5, cx + fw // 5):
+            cv2.circle(img, (ex, cy - fh // 8), max(2, fw // 14), (40, 40, 40), -1)
+        cv2.ellipse(
+            img, (cx, cy + fh // 5), (fw // 5, max(2, fh // 16)),
+            0, 0, 180, (60, 60, 150), max(1, fw // 30)
+        )
+
+    img = cv2.GaussianBlur(img, (5, 5), 0)
+    noise = rng.normal(0, 4, img.shape)
+    return np.clip(img + noise, 0, 255).astype(np.uint8)
+
+
+def jpeg_bytes(img, quality=90):
+    ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    return buf.tobytes()
+
+
+def _resonator(x, center, bandwidth, sr):
+    from scipy.signal import lfilter
+
+    r = np.exp(-np.pi * bandwidth / sr)
+    theta = 2 * np.pi * center / sr
+    a = [1.0, -2 * r * np.cos(theta), r * r]
+    return lfilter([1.0 - r], a, x)
+
+
+def speech_clip(seconds, sr=SR, f0=150.0, seed=0):
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    t = np.arange(n) / sr
+
+    # Drifting pitch -> pulse train at the instantaneous period
+    inst_f0 = f0 * (1.0 + 0.15 * np.sin(2 * np.pi * 0.5 * t + rng.uniform(0, np.pi)))
+    phase = np.cumsum(inst_f0) / sr
+    pulses = np.diff(np.floor(phase), prepend=0.0)
+
+    source = pulses + 0.02 * rng.normal(size=n)
+    voiced = sum(_resonator(source, c, b, sr) for c, b in FORMANTS)
+
+    # ~4 syllables per second with short pauses
+    envelope = np.clip(np.sin(2 * np.pi * 2.0 * t) * 1.5, 0.0, 1.0)
+    y = voiced * envelope
+    y = 0.3 * y / (np.max(np.abs(y)) + 1e-9)
+    return y.astype(np.float32)
+
+
+def wav_bytes(audio, sr=SR):
+    buf = io.BytesIO()
+    sf.write(buf, audio, sr, format="WAV", subtype="PCM_16")
+    return buf.getvalue()
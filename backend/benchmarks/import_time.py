@@ -0,0 +1,70 @@
+"""
+Measures how long `import main` takes in a fresh interpreter and fails
+if it exceeds the budget or pulls in TensorFlow / model weights.
+
+    python benchmarks/import_time.py [--budget 1.5] [--runs 5]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = """
+import json, sys, time
+t = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t
+print(json.dumps({
+    "seconds": elapsed,
+    "tensorflow": "tensorflow" in sys.modules,
+    "keras": "keras" in sys.modules,
+    "models": main.models_loaded(),
+}))
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float,
+                        default=float(os.getenv("IMPORT_BUDGET_S", "1.5")))
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    env = {**os.environ, "SPOTIFY_WARM_CACHE": "0"}
+    samples = []
+
+    for _ in range(args.runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE],
+            cwd=BASE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    times = sorted(s["seconds"] for s in samples)
+    median = times[len(times) // 2]
+    last = samples[-1]
+
+    problems = []
+    if median > args.budget:
+        problems.append(f"median {median:.2f}s > budget {args.budget:.2f}s")
+    if last["tensorflow"] or last["keras"]:
+        problems.append("TensorFlow/Keras imported at module import time")
+    if any(last["models"].values()):
+        problems.append(f"models loaded at import time: {last['models']}")
+
+    print(f"⏱️ import main: median {median:.3f}s "
+          f"(min {times[0]:.3f}s, max {times[-1]:.3f}s, budget {args.budget:.2f}s)")
+
+    if problems:
+        for p in problems:
+            print("❌", p)
+        sys.exit(1)
+    print("✅ within budget")
+
+
+if __name__ == "__main__":
+    main()
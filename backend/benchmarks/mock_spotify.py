@@ -0,0 +1,154 @@
+"""
+Local stand-in for the Spotify token and search endpoints.
+
+    with MockSpotify(latency_ms=40) as spotify:
+        os.environ["SPOTIFY_TOKEN_URL"] = spotify.token_url
+        os.environ["SPOTIFY_SEARCH_URL"] = spotify.search_url
+
+Runs a threaded http.server on 127.0.0.1 (random port) and answers
+with payloads shaped like the real API, after a fixed artificial
+latency, so recommender benchmarks measure our code plus a realistic
+round trip instead of the internet.
+
+    spotify.fail("search", 429, times=1, retry_after="2")
+
+makes the next request(s) to an endpoint fail (tests for retries).
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def _tracks(query, limit):
+    return {
+        "tracks": {
+            "items": [
+                {
+                    "name": f"{query} #{i}",
+                    "artists": [{"name": f"Artist {i}"}],
+                    "preview_url": None,
+                    "external_urls": {
+                        "spotify": f"https://open.spotify.com/track/mock{i}"
+                    },
+                }
+                for i in range(limit)
+            ]
+        }
+    }
+
+
+class MockSpotify:
+    def __init__(self, latency_ms=40.0, token_ttl=3600):
+        self.latency = latency_ms / 1000.0
+        self.token_ttl = token_ttl
+        self.calls = {"token": 0, "search": 0}
+        self._failures = {"token": [], "search": []}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    # ---------------- LIFECYCLE ----------------
+    def start(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; without this, delayed
+            # ACKs add ~40 ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, payload, headers=()):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                self.rfile.read(length)
+                mock._count("token")
+                time.sleep(mock.latency)
+                failure = mock._next_failure("token")
+                if failure is not None:
+                    self._send(*failure)
+                    return
+                self._send(200, {
+                    "access_token": "mock-token",
+                    "token_type": "Bearer",
+                    "expires_in": mock.token_ttl,
+                })
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = parse_qs(url.query)
+                mock._count("search")
+                time.sleep(mock.latency)
+                failure = mock._next_failure("search")
+                if failure is not None:
+                    self._send(*failure)
+                    return
+                self._send(200, _tracks(
+                    params.get("q", ["mock"])[0],
+                    int(params.get("limit", ["10"])[0])
+                ))
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---------------- HELPERS ----------------
+    def fail(self, endpoint, status, times=1, retry_after=None):
+        """Next `times` requests to "token" / "search" answer `status`"""
+        headers = (("Retry-After", str(retry_after)),) if retry_after is not None else ()
+        with self._lock:
+            self._failures[endpoint] += [
+                (status, {"error": {"status": status}}, headers)
+            ] * times
+
+    def _next_failure(self, name):
+        with self._lock:
+            queue = self._failures[name]
+            return queue.pop(0) if queue else None
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def token_url(self):
+        return f"{self.base_url}/api/token"
+
+    @property
+    def search_url(self):
+        return f"{self.base_url}/v1/search"
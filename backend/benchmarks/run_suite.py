@@ -0,0 +1,482 @@
+"""
+Reproducible benchmark suite: stage microbenchmarks + in-process
+ASGI load test, written as JSON so runs can be compared.
+
+    python benchmarks/run_suite.py --out before.json
+    python benchmarks/run_suite.py --out after.json --baseline before.json
+    python benchmarks/run_suite.py --quick          # smaller run counts
+
+Inputs come from benchmarks/fixtures.py (seeded face-like images and
+speech-band clips) and Spotify is served by benchmarks/mock_spotify.py
+on localhost, so nothing leaves the machine.
+
+When the model weights are missing (or with --synthetic) the face
+detector, face CNN and voice model are replaced by cheap stand-ins
+with the real input/output shapes; every other step (decode, blob,
+post-processing, preprocessing, MFCC, pitch, steering, fusion,
+recommender, FastAPI plumbing) is the production code.
+
+Every result has p50 / p95 / p99 / mean (ms), throughput (ops/s) and
+the process peak RSS (MB) observed so far. With --baseline, p95s that
+got slower than --max-regression fail the run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(BASE_DIR)
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import SR, face_image, jpeg_bytes, speech_clip, wav_bytes
+from mock_spotify import MockSpotify
+
+FACE_LABELS = ["angry", "disgust", "fear", "happy", "neutral", "sad", "surprise"]
+VOICE_LABELS = [
+    "angry", "calm", "disgust", "fearful", "happy", "neutral", "sad", "surprised"
+]
+
+
+# ---------------- MEASUREMENT ----------------
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+
+
+def summarize(latencies, elapsed=None):
+    ms = np.asarray(latencies) * 1000.0
+    elapsed = elapsed if elapsed is not None else float(np.sum(latencies))
+    return {
+        "runs": len(ms),
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(np.mean(ms)), 4),
+        "throughput": round(len(ms) / elapsed, 2) if elapsed > 0 else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def bench(fn, runs, warmup=2):
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies)
+
+
+async def bench_async(fn, runs, warmup=2):
+    for _ in range(warmup):
+        await fn()
+    latencies = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        await fn()
+        latencies.append(time.perf_counter() - t)
+    return summarize(latencies)
+
+
+# ---------------- STAND-IN MODELS ----------------
+class StandInModel:
+    """Keras-like predict() with the real input / output shapes"""
+
+    def __init__(self, n_inputs, n_classes, seed=0):
+        rng = np.random.default_rng(seed)
+        self.weights = rng.normal(0, 0.05, (n_inputs, n_classes)).astype(np.float32)
+
+    def predict(self, x, verbose=0):
+        logits = np.asarray(x, np.float32).reshape(len(x), -1) @ self.weights
+        e = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return e / e.sum(axis=1, keepdims=True)
+
+
+class StandInDetector:
+    """cv2.dnn.Net stand-in: one confident box per face in the fixture"""
+
+    def __init__(self, faces=1):
+        det = np.zeros((1, 1, 200, 7), np.float32)
+        det[0, 0, :, 2] = np.linspace(0.3, 0.0, 200)
+        for i in range(faces):
+            cx = (i + 1) / (faces + 1)
+            half = 0.5 / (3 * faces + 1)
+            det[0, 0, i, 2:7] = [0.95 - 0.1 * i, cx - half, 0.3, cx + half, 0.7]
+        self._detections = det
+
+    def setInput(self, blob):
+        self._blob = blob
+
+    def forward(self):
+        return self._detections.copy()
+
+
+def stand_in_attrs(faces=1):
+    """[(module, attribute, stand-in)] that replace the real models"""
+    from emotion import face_emotion
+    from ml_model import load_model
+
+    return [
+        (face_emotion, "_detector_buffers", (b"", b"")),
+        (face_emotion, "get_face_net", lambda: StandInDetector(faces)),
+        (face_emotion, "face_emotion_model", StandInModel(64 * 64, len(FACE_LABELS))),
+        (face_emotion, "emotion_labels", np.array(FACE_LABELS)),
+        (face_emotion, "face_batcher", None),
+        (load_model, "_model", StandInModel(160, len(VOICE_LABELS), seed=1)),
+        (load_model, "_labels", np.array(VOICE_LABELS)),
+    ]
+
+
+def install_stand_ins(faces=1):
+    for module, name, value in stand_in_attrs(faces):
+        setattr(module, name, value)
+
+
+def weights_present():
+    from emotion import face_emotion
+    from ml_model import load_model
+
+    return all(os.path.exists(p) for p in (
+        face_emotion.DNN_MODEL_PATH,
+        face_emotion.FACE_MODEL_PATH,
+        load_model.MODEL_PATH,
+    ))
+
+
+# ---------------- MICROBENCHMARKS ----------------
+def micro_face(runs):
+    from emotion import face_emotion as fe
+
+    single = jpeg_bytes(face_image(640, 480, faces=1))
+    group = jpeg_bytes(face_image(1280, 720, faces=3, seed=1))
+    img = fe.decode_image(single)
+    box, _ = fe.find_best_face(img)
+    x1, y1, x2, y2 = box
+
+    return {
+        "face.decode_640x480": bench(lambda: fe.decode_image(single), runs),
+        "face.detect": bench(lambda: fe.find_best_face(img), runs),
+        "face.classify": bench(lambda: fe.classify_face(img[y1:y2, x1:x2]), runs),
+        "face.detect_emotion": bench(lambda: fe.detect_emotion_bytes(single), runs),
+        "face.detect_emotions_3_faces": bench(
+            lambda: fe.detect_emotions_bytes(group), runs
+        ),
+    }
+
+
+def micro_voice(runs, durations):
+    from emotion import voice_emotion as ve
+    from emotion.features import compute_voice_features
+
+    model, _ = ve.get_voice_model()
+    results = {}
+
+    for seconds in durations:
+        audio = speech_clip(seconds)
+        upload = wav_bytes(audio)
+        features = compute_voice_features(audio, SR, n_mfcc=ve.N_MFCC)
+        preds = model.predict(features["vector"].reshape(1, -1), verbose=0)[0]
+        tag = f"{seconds:g}s"
+
+        results[f"voice.extract_features_{tag}"] = bench(
+            lambda: ve.extract_features(audio, SR), runs
+        )
+        results[f"voice.trim_silence_{tag}"] = bench(
+            lambda: ve.trim_silence(audio, SR), runs
+        )
+        results[f"voice.steer_emotion_{tag}"] = bench(
+            lambda: ve.steer_emotion(preds, audio, SR, features), runs
+        )
+        results[f"voice.detect_voice_emotion_{tag}"] = bench(
+            lambda: ve.detect_voice_emotion_bytes(upload), runs
+        )
+
+    return results
+
+
+def micro_fusion(runs):
+    from emotion.emotion_fusion import fuse_emotions
+
+    face = {"success": True, "emotion": "happy", "confidence": 0.8}
+    voice = {"success": True, "emotion": "sad", "confidence": 0.6}
+    return {"fusion.fuse_emotions": bench(
+        lambda: fuse_emotions(face, voice), runs * 100
+    )}
+
+
+def micro_track_index(runs, tracks=100000):
+    import tempfile
+
+    from recommender.track_index import TrackIndex, build_track_index
+
+    rng = np.random.default_rng(0)
+    catalogue = (
+        {
+            "name": f"Track {i}",
+            "artist": f"Artist {i % 5000}",
+            "spotify_url": f"https://open.spotify.com/track/bench{i}",
+            "valence": rng.random(),
+            "energy": rng.random(),
+            "danceability": rng.random(),
+            "tempo": 60.0 + 120.0 * rng.random(),
+        }
+        for i in range(tracks)
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "index")
+        build_track_index(catalogue, path)
+        index = TrackIndex(path)
+        try:
+            index.warm(["happy", "sad"])
+            recent = frozenset(index.query({"sad": 1.0}, 200))
+            return {
+                "recommender.local_index": bench(
+                    lambda: [index.track(r) for r in index.query({"happy": 1.0})],
+                    runs * 10
+                ),
+                "recommender.local_index_blend": bench(
+                    lambda: index.query({"happy": 0.6, "sad": 0.4}, exclude=recent),
+                    runs * 10
+                ),
+            }
+        finally:
+            index.close()
+
+
+async def micro_recommender(runs):
+    from recommender import spotify
+
+    def clear():
+        with spotify._cache_lock:
+            spotify._cache.clear()
+
+    async def cold():
+        clear()
+        await spotify.get_spotify_recommendations_async("happy")
+
+    async def hit():
+        await spotify.get_spotify_recommendations_async("happy")
+
+    results = {"recommender.cold_search": await bench_async(cold, runs)}
+    results["recommender.cache_hit"] = await bench_async(hit, runs * 10)
+    return results
+
+
+# ---------------- LOAD TEST ----------------
+async def load_endpoint(client, make_request, concurrency, total):
+    latencies = []
+    statuses = {}
+    remaining = [total]
+
+    async def worker():
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            t = time.perf_counter()
+            response = await make_request(client)
+            latencies.append(time.perf_counter() - t)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {**summarize(latencies, elapsed), "statuses": statuses}
+
+
+async def load_test(levels, total):
+    import httpx
+    import main
+
+    image = jpeg_bytes(face_image(640, 480))
+    audio = wav_bytes(speech_clip(3.0))
+
+    endpoints = {
+        "POST /analyze-emotion": lambda c: c.post(
+            "/analyze-emotion", files={"image": ("f.jpg", image, "image/jpeg")}
+        ),
+        "POST /analyze-voice": lambda c: c.post(
+            "/analyze-voice", files={"audio": ("v.wav", audio, "audio/wav")}
+        ),
+        "POST /analyze-fused-emotion": lambda c: c.post(
+            "/analyze-fused-emotion", files={
+                "image": ("f.jpg", image, "image/jpeg"),
+                "audio": ("v.wav", audio, "audio/wav"),
+            }
+        ),
+        "GET /recommend": lambda c: c.get("/recommend", params={"emotion": "sad"}),
+    }
+
+    results = {}
+    async with main.lifespan(main.app):
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench", timeout=60
+        ) as client:
+            for name, make_request in endpoints.items():
+                await make_request(client)   # warm-up
+                results[name] = {}
+                for concurrency in levels:
+                    results[name][str(concurrency)] = await load_endpoint(
+                        client, make_request, concurrency, total
+                    )
+                    print(f"  {name:<28} c={concurrency:<3} "
+                          f"p95={results[name][str(concurrency)]['p95_ms']:.1f} ms")
+    return results
+
+
+async def run_async(results, args, levels):
+    results["micro"].update(await micro_recommender(args.runs))
+    for name, stats in results["micro"].items():
+        print(f"  {name:<40} p50={stats['p50_ms']:.3f} ms "
+              f"p95={stats['p95_ms']:.3f} ms")
+
+    if not args.skip_load:
+        print("🚦 ASGI load test")
+        results["load"] = await load_test(levels, args.requests)
+
+
+# ---------------- REPORT ----------------
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def flatten(results):
+    """{"micro": {...}, "load": {ep: {c: {...}}}} -> {name: stats}"""
+    flat = dict(results.get("micro", {}))
+    for endpoint, levels in results.get("load", {}).items():
+        for concurrency, stats in levels.items():
+            flat[f"{endpoint} c={concurrency}"] = stats
+    return flat
+
+
+def compare(current, baseline, max_regression, noise_floor_ms):
+    base = flatten(baseline)
+    regressions = []
+
+    print(f"\n{'benchmark':<44} {'base p95':>10} {'now p95':>10} {'Δ':>8}")
+    for name, stats in flatten(current).items():
+        if name not in base:
+            continue
+        before, after = base[name]["p95_ms"], stats["p95_ms"]
+        change = (after - before) / before if before else 0.0
+        # Sub-floor differences are timer noise, not regressions
+        regressed = change > max_regression and after - before > noise_floor_ms
+        flag = " ❌" if regressed else ""
+        print(f"{name:<44} {before:>10.3f} {after:>10.3f} {change:>+7.0%}{flag}")
+        if regressed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out", help="write JSON results here")
+    parser.add_argument("--baseline", help="JSON from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="allowed p95 slowdown vs baseline (0.2 = 20%%)")
+    parser.add_argument("--noise-floor-ms", type=float, default=0.05,
+                        help="ignore p95 changes smaller than this")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="stand-in models even if weights exist")
+    parser.add_argument("--quick", action="store_true")
+    parser.add_argument("--runs", type=int, default=50)
+    parser.add_argument("--durations", default="2.5,5,10")
+    parser.add_argument("--concurrency", default="1,4,16")
+    parser.add_argument("--requests", type=int, default=64,
+                        help="requests per endpoint and concurrency level")
+    parser.add_argument("--spotify-latency-ms", type=float, default=40.0)
+    parser.add_argument("--skip-load", action="store_true")
+    args = parser.parse_args()
+
+    if args.quick:
+        args.runs, args.requests = 10, 16
+
+    spotify = MockSpotify(latency_ms=args.spotify_latency_ms).start()
+    os.environ.update({
+        "SPOTIFY_TOKEN_URL": spotify.token_url,
+        "SPOTIFY_SEARCH_URL": spotify.search_url,
+        "SPOTIFY_CLIENT_ID": "bench",
+        "SPOTIFY_CLIENT_SECRET": "bench",
+        "SPOTIFY_WARM_CACHE": "0",
+    })
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    synthetic = args.synthetic or not weights_present()
+    if synthetic:
+        # Stand-ins are patched into this process only
+        os.environ["INFERENCE_EXECUTOR"] = "thread"
+        install_stand_ins()
+
+    durations = [float(d) for d in args.durations.split(",")]
+    levels = [int(c) for c in args.concurrency.split(",")]
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "models": "synthetic" if synthetic else "real",
+            "runs": args.runs,
+            "requests": args.requests,
+            "spotify_latency_ms": args.spotify_latency_ms,
+        },
+        "micro": {},
+    }
+
+    try:
+        print("🔬 microbenchmarks")
+        results["micro"].update(micro_face(args.runs))
+        results["micro"].update(micro_voice(args.runs, durations))
+        results["micro"].update(micro_fusion(args.runs))
+        results["micro"].update(micro_track_index(args.runs))
+        # One event loop for everything async: the shared httpx client
+        # is bound to the loop that created it
+        asyncio.run(run_async(results, args, levels))
+    finally:
+        spotify.stop()
+
+    results["meta"]["peak_rss_mb"] = round(peak_rss_mb(), 1)
+    results["meta"]["spotify_calls"] = spotify.calls
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"📄 wrote {args.out}")
+    else:
+        print(json.dumps(results, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(
+                results, json.load(f), args.max_regression, args.noise_floor_ms
+            )
+        if regressions:
+            print(f"❌ {len(regressions)} regression(s) over "
+                  f"{args.max_regression:.0%}")
+            sys.exit(1)
+        print("✅ no regressions")
+
+
+if __name__ == "__main__":
+    main()
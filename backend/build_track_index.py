@@ -0,0 +1,126 @@
+"""
+Builds the local track catalogue served by recommender/track_index.py.
+
+    python build_track_index.py tracks.csv [more.csv ...]
+    python build_track_index.py export.jsonl --out data/track_index
+    TRACK_INDEX_PATH=data/track_index uvicorn main:app
+
+Inputs are CSV or JSONL exports of Spotify audio features, one track
+per row. Recognised columns (first match wins):
+
+    name          name, track_name
+    artist        artist, artist_name, artists (first listed)
+    spotify_url   spotify_url, uri, id, track_id
+    preview_url   preview_url (optional)
+    valence, energy, danceability, tempo
+
+Rows missing any of these are skipped. Duplicate tracks are kept once.
+"""
+
+import argparse
+import ast
+import csv
+import json
+import sys
+
+from recommender.track_index import FEATURES, TRACK_INDEX_PATH, build_track_index
+
+NAME_COLUMNS = ("name", "track_name")
+ARTIST_COLUMNS = ("artist", "artist_name", "artists")
+ID_COLUMNS = ("spotify_url", "uri", "id", "track_id")
+
+
+def _first(row, columns):
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _artist(value):
+    # Exports list several artists as "['A', 'B']", ["A", "B"] or "A;B"
+    if isinstance(value, list):
+        return str(value[0]) if value else None
+    if value.startswith("["):
+        try:
+            names = ast.literal_eval(value)
+            return str(names[0]) if names else None
+        except (ValueError, SyntaxError):
+            pass
+    return value.split(";")[0].strip()
+
+
+def _spotify_url(value):
+    if value.startswith("http"):
+        return value
+    if value.startswith("spotify:track:"):
+        value = value.rsplit(":", 1)[1]
+    return f"https://open.spotify.com/track/{value}"
+
+
+def normalize(row):
+    """Export row -> track dict for build_track_index, or None"""
+    name = _first(row, NAME_COLUMNS)
+    artist = _first(row, ARTIST_COLUMNS)
+    track_id = _first(row, ID_COLUMNS)
+    if name is None or artist is None or track_id is None:
+        return None
+
+    try:
+        features = {f: float(row[f]) for f in FEATURES}
+    except (KeyError, TypeError, ValueError):
+        return None
+
+    artist = _artist(artist)
+    if not artist:
+        return None
+
+    return {
+        "name": str(name),
+        "artist": artist,
+        "spotify_url": _spotify_url(str(track_id)),
+        "preview_url": row.get("preview_url") or None,
+        **features
+    }
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        if path.endswith((".jsonl", ".json")):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("inputs", nargs="+", help="CSV / JSONL track exports")
+    parser.add_argument("--out", default=TRACK_INDEX_PATH)
+    args = parser.parse_args(argv)
+
+    stats = {"rows": 0, "skipped": 0}
+
+    def tracks():
+        for path in args.inputs:
+            for row in read_rows(path):
+                stats["rows"] += 1
+                track = normalize(row)
+                if track is None:
+                    stats["skipped"] += 1
+                    continue
+                yield track
+
+    count = build_track_index(tracks(), args.out)
+
+    print(
+        f"{'✅' if count else '❌'} {count} tracks → {args.out} "
+        f"({stats['rows']} rows read, {stats['skipped']} skipped)"
+    )
+    sys.exit(0 if count else 1)
+
+
+if __name__ == "__main__":
+    main()
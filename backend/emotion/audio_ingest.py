@@ -0,0 +1,120 @@
+"""
+Upload bytes -> float32 mono audio, capped to MAX_VOICE_SECONDS.
+
+    audio, sr = decode_audio(data, max_seconds=30, target_sr=22050)
+    audio = resample_audio(audio, sr, 22050)
+
+WAV / FLAC / OGG (vorbis, opus) / MP3 are decoded in-process by
+libsndfile straight into float32, reading only the frames up to the
+cap. Containers libsndfile can't open (WebM / Matroska and MP4 from
+browser MediaRecorder) are piped through a local ffmpeg, which downmixes,
+resamples and truncates in the same pass and writes raw f32le to stdout.
+
+Resampling calls libsoxr's multi-stage polyphase filter directly on the
+float32 samples (the same "HQ" filter as librosa.resample's default, so
+features barely move, but without librosa's float64 round trip). soxr
+ships with librosa; scipy's resample_poly is the fallback and is ~2x
+slower at 48k -> 22.05k, whose exact ratio 147/320 needs a long filter.
+"""
+
+import io
+import os
+import shutil
+import subprocess
+from math import gcd
+
+import numpy as np
+import soundfile as sf
+
+# Longer uploads are analyzed on their first MAX_VOICE_SECONDS only
+MAX_VOICE_SECONDS = float(os.getenv("MAX_VOICE_SECONDS", "30"))
+FFMPEG_BIN = os.getenv("FFMPEG_BIN", "ffmpeg")
+FFMPEG_TIMEOUT = float(os.getenv("FFMPEG_TIMEOUT", "20"))
+
+AUDIO_EXTS = (".wav", ".flac", ".ogg", ".opus", ".mp3", ".webm", ".m4a")
+# MediaRecorder blobs are often labelled video/* even when audio-only
+AUDIO_CONTENT_TYPES = ("video/webm", "video/mp4", "application/ogg")
+
+
+def is_audio_type(content_type):
+    content_type = (content_type or "").split(";")[0].strip().lower()
+    return content_type.startswith("audio/") or content_type in AUDIO_CONTENT_TYPES
+
+
+def _needs_ffmpeg(data):
+    # EBML header (WebM / Matroska) or an ISO-BMFF 'ftyp' box (MP4 / M4A)
+    return data[:4] == b"\x1a\x45\xdf\xa3" or data[4:8] == b"ftyp"
+
+
+# ---------------- DECODE ----------------
+def _decode_soundfile(data, max_seconds):
+    with sf.SoundFile(io.BytesIO(data)) as f:
+        frames = -1
+        if max_seconds and f.frames > 0:
+            frames = min(f.frames, int(max_seconds * f.samplerate))
+        audio = f.read(frames, dtype="float32", always_2d=True)
+        sr = f.samplerate
+
+    channels = audio.shape[1]
+    if channels == 1:
+        return np.ascontiguousarray(audio[:, 0]), sr
+    # Downmix as a matvec: ~20x faster than the strided mean(axis=1)
+    return audio @ np.full(channels, 1.0 / channels, np.float32), sr
+
+
+def _decode_ffmpeg(data, max_seconds, target_sr):
+    cmd = [FFMPEG_BIN, "-nostdin", "-hide_banner", "-loglevel", "error",
+           "-i", "pipe:0"]
+    if max_seconds:
+        cmd += ["-t", str(max_seconds)]
+    cmd += ["-vn", "-ac", "1", "-ar", str(target_sr), "-f", "f32le", "pipe:1"]
+
+    try:
+        out = subprocess.run(
+            cmd, input=data, capture_output=True, timeout=FFMPEG_TIMEOUT
+        )
+    except FileNotFoundError as e:
+        raise RuntimeError(
+            "Decoding WebM / MP4 audio needs `ffmpeg` on PATH (or FFMPEG_BIN)"
+        ) from e
+
+    if out.returncode != 0:
+        raise ValueError(f"ffmpeg decode failed: {out.stderr.decode(errors='replace')[-200:]}")
+
+    return np.frombuffer(out.stdout, dtype="<f4").astype(np.float32, copy=False), target_sr
+
+
+def decode_audio(data, max_seconds=MAX_VOICE_SECONDS, target_sr=None):
+    """
+    Upload bytes -> (float32 mono audio, sample rate). The ffmpeg path
+    already resamples to target_sr (when given); the libsndfile path
+    returns the file's own rate.
+    """
+    if not _needs_ffmpeg(data):
+        try:
+            return _decode_soundfile(data, max_seconds)
+        except sf.LibsndfileError:
+            # Unknown to libsndfile (e.g. AAC in ADTS): let ffmpeg try
+            if shutil.which(FFMPEG_BIN) is None:
+                raise
+
+    return _decode_ffmpeg(data, max_seconds, target_sr or 48000)
+
+
+# ---------------- RESAMPLE ----------------
+def resample_audio(audio, sr, target_sr):
+    """float32 polyphase resampling from sr to target_sr"""
+    if sr == target_sr:
+        return audio
+
+    try:
+        import soxr
+    except ImportError:
+        from scipy.signal import resample_poly
+
+        g = gcd(int(sr), int(target_sr))
+        return resample_poly(
+            audio, int(target_sr) // g, int(sr) // g
+        ).astype(np.float32, copy=False)
+
+    return soxr.resample(audio, sr, target_sr, quality="HQ")
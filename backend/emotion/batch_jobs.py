@@ -0,0 +1,551 @@
+"""
+Offline bulk analysis of image / audio archives.
+
+    job = BatchJob("library.zip", "moods.jsonl")
+    job.run()            # or start_job(...) for a background thread
+
+Files stream through a bounded pipeline:
+
+    reader thread  -> directory walk / tar stream / zip members
+    N workers      -> decode -> detect -> crop (images)
+                      decode -> trim silence -> features -> cues (audio)
+    main loop      -> one CNN forward pass per batch_size face crops
+                      (and per batch_size clips), then writes results
+
+Both queues are bounded, so memory stays flat however large the
+archive is. Results are written incrementally (JSONL lines, or Parquet
+part files), and a restarted job skips every file already present in
+the output.
+"""
+
+import json
+import logging
+import os
+import queue
+import tarfile
+import threading
+import time
+import uuid
+import zipfile
+
+import numpy as np
+
+from emotion import voice_emotion
+from emotion.audio_ingest import AUDIO_EXTS
+from emotion.face_emotion import get_face_model, prepare_faces, summarize_faces
+from metrics import stage
+from ml_model.load_model import get_voice_model
+
+logger = logging.getLogger(__name__)
+
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", str(min(4, os.cpu_count() or 1))))
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", "64"))
+BATCH_QUEUE_SIZE = int(os.getenv("BATCH_QUEUE_SIZE", "64"))
+# Parquet rows per part file (each part is written atomically)
+BATCH_PARQUET_ROWS = int(os.getenv("BATCH_PARQUET_ROWS", "1000"))
+# Finished jobs stay in the registry this long, and at most this many
+BATCH_JOB_TTL = float(os.getenv("BATCH_JOB_TTL", "3600"))
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "100"))
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png")
+
+_DONE = object()
+
+
+def file_kind(name):
+    ext = os.path.splitext(name)[1].lower()
+    if ext in IMAGE_EXTS:
+        return "image"
+    if ext in AUDIO_EXTS:
+        return "audio"
+    return None
+
+
+# ---------------- SOURCES ----------------
+def iter_source(path, kinds=("image", "audio"), skip=()):
+    """
+    Yields (name, kind, bytes) for every supported file under a
+    directory or inside a .tar(.gz/.bz2/.xz) / .zip archive. Names are
+    relative to the source, so resume works across machines. Files in
+    `skip` are not read at all.
+    """
+    def wanted(name):
+        kind = file_kind(name)
+        if kind in kinds and name not in skip:
+            return kind
+        return None
+
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for fname in sorted(files):
+                full = os.path.join(root, fname)
+                name = os.path.relpath(full, path).replace(os.sep, "/")
+                kind = wanted(name)
+                if kind:
+                    with open(full, "rb") as f:
+                        yield name, kind, f.read()
+
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as zf:
+            for info in zf.infolist():
+                kind = None if info.is_dir() else wanted(info.filename)
+                if kind:
+                    yield info.filename, kind, zf.read(info)
+
+    elif tarfile.is_tarfile(path):
+        # Streaming mode: members are read in archive order, no seeking
+        with tarfile.open(path, "r|*") as tf:
+            for member in tf:
+                kind = wanted(member.name) if member.isfile() else None
+                if kind:
+                    yield member.name, kind, tf.extractfile(member).read()
+
+    else:
+        raise ValueError(f"Not a directory, tar or zip archive: {path}")
+
+
+# ---------------- SINKS ----------------
+class JsonlSink:
+    """One JSON object per line, flushed after every write"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def done(self):
+        """Files already in the output; drops a torn last line"""
+        names = set()
+        if not os.path.exists(self.path):
+            return names
+
+        with open(self.path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                f.truncate(end)
+            for line in data[:end].splitlines():
+                try:
+                    names.add(json.loads(line)["file"])
+                except (ValueError, KeyError):
+                    continue
+        return names
+
+    def write(self, records):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        for record in records:
+            self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetSink:
+    """
+    Directory of part-NNNNN.parquet files. Each part is written to a
+    temp file and renamed, so a crash never leaves a half-written part.
+    Needs the optional `pyarrow` package. Nested face lists are stored
+    as a JSON string column.
+    """
+
+    def __init__(self, path, rows_per_part=BATCH_PARQUET_ROWS):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise RuntimeError("Parquet output needs the `pyarrow` package") from e
+
+        self._pa = pyarrow
+        self._pq = pyarrow.parquet
+        # Fixed schema: parts with only failures still match the rest
+        self._schema = pyarrow.schema([
+            ("file", pyarrow.string()),
+            ("type", pyarrow.string()),
+            ("success", pyarrow.bool_()),
+            ("emotion", pyarrow.string()),
+            ("confidence", pyarrow.float64()),
+            ("face_count", pyarrow.int64()),
+            ("faces", pyarrow.string()),
+            ("trimmed", pyarrow.float64()),
+            ("error", pyarrow.string()),
+        ])
+        self.path = path
+        self.rows_per_part = rows_per_part
+        self._rows = []
+        os.makedirs(path, exist_ok=True)
+        self._next_part = len(self._parts())
+
+    def _parts(self):
+        return sorted(
+            f for f in os.listdir(self.path)
+            if f.startswith("part-") and f.endswith(".parquet")
+        )
+
+    def done(self):
+        names = set()
+        for part in self._parts():
+            table = self._pq.read_table(
+                os.path.join(self.path, part), columns=["file"]
+            )
+            names.update(table.column("file").to_pylist())
+        return names
+
+    def write(self, records):
+        for record in records:
+            row = {c: record.get(c) for c in self._schema.names}
+            if row["faces"] is not None:
+                row["faces"] = json.dumps(row["faces"])
+            self._rows.append(row)
+        if len(self._rows) >= self.rows_per_part:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        table = self._pa.Table.from_pylist(self._rows, schema=self._schema)
+        final = os.path.join(self.path, f"part-{self._next_part:05d}.parquet")
+        tmp = final + ".tmp"
+        self._pq.write_table(table, tmp)
+        os.replace(tmp, final)
+        self._next_part += 1
+        self._rows = []
+
+    def close(self):
+        self._flush()
+
+
+def open_sink(path, fmt=None):
+    if fmt is None:
+        fmt = "jsonl" if path.endswith((".jsonl", ".json")) else "parquet"
+    if fmt == "jsonl":
+        return JsonlSink(path)
+    if fmt == "parquet":
+        return ParquetSink(path)
+    raise ValueError(f"Unknown output format: {fmt}")
+
+
+# ---------------- WORKER STAGES ----------------
+def _prepare(name, kind, data):
+    """CPU stage run by the worker pool -> (name, kind, prepared, error)"""
+    try:
+        if kind == "image":
+            return name, kind, prepare_faces(data), None
+
+        audio, sr, vad = voice_emotion.load_voiced_audio(data)
+        if vad["voiced_seconds"] < voice_emotion.MIN_VOICED_SECONDS:
+            return name, kind, None, "too little speech"
+
+        with stage("voice_features"):
+            features = voice_emotion.compute_voice_features(
+                audio, sr, n_mfcc=voice_emotion.N_MFCC
+            )
+        cues = voice_emotion.voice_cues(audio, sr, features)
+        return name, kind, {
+            "vector": features["vector"],
+            "cues": cues,
+            "trimmed": round(vad["trimmed"], 3)
+        }, None
+
+    except Exception as e:
+        return name, kind, None, str(e) or type(e).__name__
+
+
+def _failure(name, kind, error=None):
+    record = {
+        "file": name,
+        "type": kind,
+        "success": False,
+        "emotion": "neutral",
+        "confidence": 0.0
+    }
+    if kind == "image":
+        record["face_count"] = 0
+    if error:
+        record["error"] = error
+    return record
+
+
+# ---------------- JOB ----------------
+class BatchJob:
+    def __init__(self, source, output, fmt=None, workers=BATCH_WORKERS,
+                 batch_size=BATCH_SIZE, queue_size=BATCH_QUEUE_SIZE,
+                 kinds=("image", "audio"), job_id=None):
+        self.id = job_id or uuid.uuid4().hex
+        self.source = source
+        self.output = output
+        self.fmt = fmt
+        self.workers = max(1, int(workers))
+        self.batch_size = max(1, int(batch_size))
+        self.queue_size = max(1, int(queue_size))
+        self.kinds = tuple(kinds)
+
+        self.status = "pending"
+        self.error = None
+        self.stats = {
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "skipped": 0,
+            "batches": 0,
+            "seconds": 0.0,
+            "files_per_sec": 0.0,
+        }
+        self._started = None
+        self.finished_at = None
+        self._stop = threading.Event()
+
+    # ---------------- CONTROL ----------------
+    def cancel(self):
+        self._stop.set()
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "status": self.status,
+            "source": self.source,
+            "output": self.output,
+            "error": self.error,
+            "stats": dict(self.stats),
+        }
+
+    def run(self, progress=None):
+        """Blocks until the source is drained; progress(stats) per write"""
+        self.status = "running"
+        self._started = time.perf_counter()
+        sink = None
+
+        try:
+            sink = open_sink(self.output, self.fmt)
+            done = sink.done()
+            self.stats["skipped"] = len(done)
+            if done:
+                logger.info("⏭️ Resuming %s: %d files already done", self.id, len(done))
+
+            self._pipeline(sink, done, progress)
+            if self._stop.is_set():
+                self.status = "cancelled"
+            else:
+                # A source error stops the reader but keeps what was written
+                self.status = "failed" if self.error else "completed"
+
+        except Exception as e:
+            logger.error("❌ Batch job %s failed: %s", self.id, e)
+            self.status = "failed"
+            self.error = str(e)
+
+        finally:
+            if sink is not None:
+                sink.close()
+            self._update_rate()
+            self.finished_at = time.monotonic()
+
+        return self.to_dict()
+
+    # ---------------- PIPELINE ----------------
+    def _pipeline(self, sink, done, progress):
+        inbox = queue.Queue(self.queue_size)
+        outbox = queue.Queue(self.queue_size)
+        closing = threading.Event()
+
+        def put(q, item):
+            # Bounded put that still notices cancellation
+            while not (self._stop.is_set() or closing.is_set()):
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def get(q):
+            # Bounded get: after a cancel, _DONE may never be queued
+            while not (self._stop.is_set() or closing.is_set()):
+                try:
+                    return q.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+            return _DONE
+
+        def read():
+            try:
+                for item in iter_source(self.source, self.kinds, done):
+                    if not put(inbox, item):
+                        break
+            except Exception as e:
+                logger.error("❌ Batch source error: %s", e)
+                self.error = str(e)
+            finally:
+                for _ in range(self.workers):
+                    put(inbox, _DONE)
+
+        def work():
+            while True:
+                item = get(inbox)
+                if item is _DONE:
+                    break
+                if not put(outbox, _prepare(*item)):
+                    break
+            put(outbox, _DONE)
+
+        threads = [threading.Thread(target=read, name="batch-reader", daemon=True)]
+        threads += [
+            threading.Thread(target=work, name=f"batch-worker-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for t in threads:
+            t.start()
+
+        faces, clips = [], []
+        crops = 0
+        finished = 0
+
+        def emit(records):
+            sink.write(records)
+            for record in records:
+                self.stats["processed"] += 1
+                self.stats["succeeded" if record["success"] else "failed"] += 1
+            self._update_rate()
+            if progress is not None:
+                progress(dict(self.stats))
+
+        try:
+            while finished < self.workers and not self._stop.is_set():
+                try:
+                    item = outbox.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _DONE:
+                    finished += 1
+                    continue
+
+                name, kind, prepared, error = item
+                if prepared is None:
+                    emit([_failure(name, kind, error)])
+                elif kind == "image":
+                    faces.append((name, prepared))
+                    crops += len(prepared["batch"])
+                    if crops >= self.batch_size:
+                        emit(self._predict_faces(faces))
+                        faces, crops = [], 0
+                else:
+                    clips.append((name, prepared))
+                    if len(clips) >= self.batch_size:
+                        emit(self._predict_voices(clips))
+                        clips = []
+
+            if not self._stop.is_set():
+                if faces:
+                    emit(self._predict_faces(faces))
+                if clips:
+                    emit(self._predict_voices(clips))
+
+        finally:
+            # Unblocks the reader / workers if we left early
+            closing.set()
+            for t in threads:
+                t.join(timeout=1.0)
+
+    def _predict_faces(self, items):
+        """All crops from several images -> one forward pass"""
+        model, _ = get_face_model()
+        batch = np.concatenate([p["batch"] for _, p in items])
+
+        with stage("face_cnn"):
+            probs = model.predict(batch, verbose=0)
+        self.stats["batches"] += 1
+
+        records, start = [], 0
+        for name, prepared in items:
+            n = len(prepared["batch"])
+            result = summarize_faces(prepared, probs[start:start + n])
+            start += n
+            records.append({
+                "file": name,
+                "type": "image",
+                "success": True,
+                "emotion": result["room"]["emotion"],
+                "confidence": result["room"]["confidence"],
+                "face_count": n,
+                "faces": result["faces"]
+            })
+        return records
+
+    def _predict_voices(self, items):
+        model, _ = get_voice_model()
+        vectors = np.stack([p["vector"] for _, p in items])
+
+        with stage("voice_model"):
+            preds = model.predict(vectors, verbose=0)
+        self.stats["batches"] += 1
+
+        records = []
+        for (name, prepared), p in zip(items, preds):
+            # No session: every clip is steered on its own
+            emotion, confidence = voice_emotion.steer_from_cues(p, prepared["cues"])
+            records.append({
+                "file": name,
+                "type": "audio",
+                "success": True,
+                "emotion": emotion,
+                "confidence": confidence,
+                "trimmed": prepared["trimmed"]
+            })
+        return records
+
+    def _update_rate(self):
+        if self._started is None:
+            return
+        seconds = time.perf_counter() - self._started
+        self.stats["seconds"] = round(seconds, 3)
+        self.stats["files_per_sec"] = round(
+            self.stats["processed"] / seconds, 2
+        ) if seconds > 0 else 0.0
+
+
+# ---------------- BACKGROUND JOBS ----------------
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def _prune_jobs():
+    """Drops finished jobs past BATCH_JOB_TTL, then the oldest beyond
+    BATCH_MAX_JOBS. Caller holds _jobs_lock; running jobs always stay."""
+    now = time.monotonic()
+    finished = sorted(
+        (job for job in _jobs.values() if job.finished_at is not None),
+        key=lambda job: job.finished_at
+    )
+    excess = len(_jobs) - BATCH_MAX_JOBS
+    for job in finished:
+        if now - job.finished_at > BATCH_JOB_TTL or excess > 0:
+            del _jobs[job.id]
+            excess -= 1
+
+
+def start_job(source, output, **options):
+    """Runs a BatchJob on a daemon thread; poll it with get_job(id)"""
+    job = BatchJob(source, output, **options)
+    with _jobs_lock:
+        _prune_jobs()
+        _jobs[job.id] = job
+
+    threading.Thread(
+        target=job.run, name=f"batch-job-{job.id[:8]}", daemon=True
+    ).start()
+    return job
+
+
+def get_job(job_id):
+    with _jobs_lock:
+        _prune_jobs()
+        return _jobs.get(job_id)
+
+
+def list_jobs():
+    with _jobs_lock:
+        _prune_jobs()
+        return [job.to_dict() for job in _jobs.values()]
@@ -0,0 +1,117 @@
+"""
+Dynamic micro-batching for small Keras models.
+
+Concurrent callers submit single samples; a background thread gathers
+them for up to max_wait_ms or max_batch_size items and runs one batched
+forward pass, then hands each caller its own row of the output.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatcher:
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=2.0,
+                 name="micro-batcher"):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self.stats = {"batches": 0, "items": 0, "max_batch": 0}
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name=name, daemon=True
+        )
+        self._thread.start()
+
+    # ---------------- CALLER SIDE ----------------
+    def submit(self, x) -> Future:
+        """x is one sample, with or without a leading batch axis of 1"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is closed")
+
+        x = np.asarray(x)
+        if x.ndim > 0 and x.shape[0] == 1:
+            x = x[0]
+
+        future = Future()
+        self._queue.put((x, future))
+        return future
+
+    def predict(self, x):
+        return self.submit(x).result()
+
+    def predict_many(self, xs):
+        futures = [self.submit(x) for x in xs]
+        return [f.result() for f in futures]
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+
+    # ---------------- WORKER SIDE ----------------
+    def _collect(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.perf_counter() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = (
+                    self._queue.get(timeout=remaining)
+                    if remaining > 0 else self._queue.get_nowait()
+                )
+            except queue.Empty:
+                break
+
+            if item is None:
+                self._closed = True
+                break
+            batch.append(item)
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            try:
+                # Inside the try: a mismatched input shape fails this
+                # batch instead of killing the thread
+                inputs = np.stack([x for x, _ in batch])
+                outputs = self.predict_fn(inputs)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+            else:
+                for (_, future), out in zip(batch, outputs):
+                    future.set_result(out)
+
+            self.stats["batches"] += 1
+            self.stats["items"] += len(batch)
+            self.stats["max_batch"] = max(self.stats["max_batch"], len(batch))
+
+            if self._closed and self._queue.empty():
+                return
+
+    def get_stats(self):
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "mean_batch": self.stats["items"] / batches if batches else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+        }
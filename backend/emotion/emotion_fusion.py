@@ -74,3 +74,21 @@ def fuse_emotions(
         "confidence": 0.5,
         "source": "fallback"
     }
+
+
+def fusion_mix(
+    face_result: Dict,
+    voice_result: Dict,
+    face_weight: float = 0.6,
+    voice_weight: float = 0.4
+):
+    """
+    {emotion: weight} from each successful modality's confidence, for
+    recommending between two moods instead of snapping to one
+    """
+    mix = {}
+    for result, weight in ((face_result, face_weight), (voice_result, voice_weight)):
+        if result.get("success"):
+            emotion = result["emotion"]
+            mix[emotion] = mix.get(emotion, 0.0) + result["confidence"] * weight
+    return mix
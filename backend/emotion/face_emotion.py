@@ -1,8 +1,17 @@
 import cv2
+import logging
 import numpy as np
 import os
+import threading
 from fastapi import UploadFile
-from tensorflow.keras.models import load_model
+
+from metrics import stage
+from emotion.batching import MicroBatcher
+from emotion.face_tracker import FaceTracker
+from emotion.inference_pool import INFERENCE_EXECUTOR
+from ml_model.backend import INFERENCE_BACKEND, load_inference_model
+
+logger = logging.getLogger(__name__)
 
 # ================= BASE PATH =================
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -16,11 +25,6 @@ DNN_MODEL_PATH = os.path.join(
     BASE_DIR, "models", "dnn_face", "res10_300x300_ssd_iter_140000.caffemodel"
 )
 
-face_net = cv2.dnn.readNetFromCaffe(PROTO_PATH, DNN_MODEL_PATH)
-
-print("🙂 Face detector loaded (DNN)")
-print("📁 DNN model:", DNN_MODEL_PATH)
-
 # ================= FACE EMOTION MODEL =================
 FACE_MODEL_PATH = os.path.join(
     BASE_DIR, "model", "face_emotion_model.h5"
@@ -30,14 +34,125 @@ FACE_LABEL_PATH = os.path.join(
     BASE_DIR, "model", "face_emotion_labels.npy"
 )
 
-print("🧠 Loading FACE emotion model from:", FACE_MODEL_PATH)
-print("MODEL EXISTS:", os.path.exists(FACE_MODEL_PATH))
+# ================= MICRO-BATCHING =================
+# Concurrent requests share one batched forward pass. Default on only for
+# the thread pool: a process worker runs one call at a time, so batching
+# there just adds FACE_BATCH_MAX_WAIT_MS to every request
+FACE_BATCHING = os.getenv(
+    "FACE_BATCHING", "1" if INFERENCE_EXECUTOR == "thread" else "0"
+) == "1"
+FACE_BATCH_MAX_SIZE = int(os.getenv("FACE_BATCH_MAX_SIZE", "16"))
+FACE_BATCH_MAX_WAIT_MS = float(os.getenv("FACE_BATCH_MAX_WAIT_MS", "2"))
+
+# ================= DECODE =================
+# FACE_DECODE_REDUCED=1 -> large uploads are decoded at 1/2, 1/4 or 1/8
+# scale (libjpeg DCT scaling), keeping the short side >= FACE_DECODE_MIN_SIDE.
+# The SSD only sees 300x300 and the CNN 64x64, so full 12 MP decodes
+# are wasted work.
+FACE_DECODE_REDUCED = os.getenv("FACE_DECODE_REDUCED", "0") == "1"
+FACE_DECODE_MIN_SIDE = int(os.getenv("FACE_DECODE_MIN_SIDE", "480"))
+FACE_MIN_CONFIDENCE = 0.4
+
+_REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+# ================= LAZY LOADING =================
+# Nothing is loaded at import time; the first request (or an explicit
+# load_face_models() warm-up) pays for it.
+face_emotion_model = None
+emotion_labels = None
+face_batcher = None
+
+_load_lock = threading.Lock()
+# cv2.dnn.Net is not safe to share across threads -> one per thread,
+# all built from the same in-memory copy of the Caffe files
+_thread_local = threading.local()
+_detector_buffers = None
+
+
+def _get_detector_buffers():
+    global _detector_buffers
+
+    if _detector_buffers is None:
+        with _load_lock:
+            if _detector_buffers is None:
+                _detector_buffers = (
+                    np.fromfile(PROTO_PATH, dtype=np.uint8),
+                    np.fromfile(DNN_MODEL_PATH, dtype=np.uint8),
+                )
+                logger.info("🙂 Face detector loaded (DNN)")
+                logger.info("📁 DNN model: %s", DNN_MODEL_PATH)
+    return _detector_buffers
+
+
+def get_face_net():
+    net = getattr(_thread_local, "face_net", None)
+    if net is None:
+        net = cv2.dnn.readNetFromCaffe(*_get_detector_buffers())
+        _thread_local.face_net = net
+    return net
+
+
+def get_face_model():
+    """Returns (model, labels), loading them on first use"""
+    global face_emotion_model, emotion_labels, face_batcher
 
-face_emotion_model = load_model(FACE_MODEL_PATH, compile=False)
-emotion_labels = np.load(FACE_LABEL_PATH)
+    if face_emotion_model is not None:
+        return face_emotion_model, emotion_labels
 
-print("🧠 Face emotion model loaded")
-print("🏷️ Labels:", emotion_labels)
+    with _load_lock:
+        if face_emotion_model is None:
+            logger.info("🧠 Loading FACE emotion model from: %s", FACE_MODEL_PATH)
+            logger.info("MODEL EXISTS: %s", os.path.exists(FACE_MODEL_PATH))
+            logger.info("⚙️ Inference backend: %s", INFERENCE_BACKEND)
+
+            model = load_inference_model(FACE_MODEL_PATH)
+            emotion_labels = np.load(FACE_LABEL_PATH)
+
+            if FACE_BATCHING:
+                face_batcher = MicroBatcher(
+                    lambda batch: model.predict(batch, verbose=0),
+                    max_batch_size=FACE_BATCH_MAX_SIZE,
+                    max_wait_ms=FACE_BATCH_MAX_WAIT_MS,
+                    name="face-batcher"
+                )
+            face_emotion_model = model
+
+            logger.info("🧠 Face emotion model loaded")
+            logger.info("🏷️ Labels: %s", emotion_labels)
+
+    return face_emotion_model, emotion_labels
+
+
+def load_face_models():
+    get_face_net()
+    get_face_model()
+
+
+def face_models_loaded():
+    return {
+        "face_detector": _detector_buffers is not None,
+        "face_emotion": face_emotion_model is not None,
+    }
+
+
+def predict_face(processed_face):
+    """(1, 64, 64, 1) float32 -> class probabilities"""
+    model, _ = get_face_model()
+    if face_batcher is not None:
+        return face_batcher.predict(processed_face)
+    return model.predict(processed_face, verbose=0)[0]
+
+
+def predict_faces(processed_faces):
+    """(N, 64, 64, 1) float32 -> (N, classes), one batched forward pass"""
+    model, _ = get_face_model()
+    if face_batcher is not None:
+        return np.stack(face_batcher.predict_many(processed_faces))
+    return model.predict(processed_faces, verbose=0)
 
 # ================= PREPROCESS =================
 def preprocess_face(face_img):
@@ -46,6 +161,13 @@ def preprocess_face(face_img):
     face_img = np.reshape(face_img, (1, 64, 64, 1))
     return face_img
 
+
+def preprocess_faces(gray_img, boxes):
+    """All crops -> (N, 64, 64, 1) float32 in one resize/normalize call"""
+    crops = [gray_img[y1:y2, x1:x2] for (x1, y1, x2, y2) in boxes]
+    blob = cv2.dnn.blobFromImages(crops, 1.0 / 255.0, (64, 64))
+    return blob.transpose(0, 2, 3, 1)
+
 # ================= MAIN API =================
 def detect_emotion(image: UploadFile):
     """
@@ -58,86 +180,323 @@ def detect_emotion(image: UploadFile):
         face_detected: bool
     }
     """
+    return detect_emotion_bytes(upload_buffer(image.file))
+
+
+def detect_emotion_bytes(data: bytes):
+    """
+    Same as detect_emotion, on already-read upload bytes
+    (picklable, so it can run in an inference worker process);
+    any buffer works, e.g. upload_buffer() in thread mode
+    """
 
     try:
-        data = image.file.read()
-        np_img = np.frombuffer(data, np.uint8)
-        img = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+        with stage("face_decode"):
+            img, _ = decode_upload(data)
 
         if img is None:
-            return {
-                "success": False,
-                "emotion": "neutral",
-                "confidence": 0.0,
-                "face_detected": False
-            }
-
-        (h, w) = img.shape[:2]
-
-        blob = cv2.dnn.blobFromImage(
-            cv2.resize(img, (300, 300)),
-            1.0,
-            (300, 300),
-            (104.0, 177.0, 123.0)
+            return no_face_result()
+
+        with stage("face_detect"):
+            box, best_conf = find_best_face(img)
+
+        if box is None:
+            return no_face_result()
+
+        logger.debug("🧪 Face detected (confidence=%.2f)", best_conf)
+
+        # ---------- Emotion Prediction ----------
+        x1, y1, x2, y2 = box
+        emotion, emotion_conf = classify_face(img[y1:y2, x1:x2])
+
+        logger.debug("🎯 Face emotion: %s (%.2f)", emotion, emotion_conf)
+
+        return {
+            "success": True,
+            "emotion": emotion,
+            "confidence": emotion_conf,
+            "face_detected": True
+        }
+
+    except Exception as e:
+        logger.error("❌ Face emotion error: %s", e)
+        return no_face_result()
+
+
+def no_face_result():
+    return {
+        "success": False,
+        "emotion": "neutral",
+        "confidence": 0.0,
+        "face_detected": False
+    }
+
+
+# ================= MULTI-FACE API =================
+def detect_emotions_bytes(data: bytes):
+    """
+    Every face above the detection threshold, classified in one batch
+    Returns:
+    {
+        success: bool,
+        faces: [{box, emotion, confidence, detection_confidence}],
+        room: {emotion, confidence}   # detection-weighted mean of probs
+    }
+    """
+
+    try:
+        prepared = prepare_faces(data)
+        if prepared is None:
+            return no_faces_result()
+
+        with stage("face_cnn"):
+            probs = predict_faces(prepared["batch"])
+
+        result = summarize_faces(prepared, probs)
+        logger.debug(
+            "👥 %d faces → room mood %s",
+            len(result["faces"]), result["room"]["emotion"]
         )
+        return result
 
-        face_net.setInput(blob)
-        detections = face_net.forward()
+    except Exception as e:
+        logger.error("❌ Multi-face emotion error: %s", e)
+        return no_faces_result()
 
-        best_face = None
-        best_conf = 0.0
 
-        # ---------- Find strongest face ----------
-        for i in range(detections.shape[2]):
-            conf = float(detections[0, 0, i, 2])
+def prepare_faces(data):
+    """
+    Decode -> detect -> crop stage of detect_emotions_bytes, without the
+    CNN, so callers can pool crops from many images into one batch.
+    Returns None when there is no face, else
+    {boxes, detection_confidence, batch (N, 64, 64, 1), reduce}
+    """
+    with stage("face_decode"):
+        img, reduce = decode_upload(data)
+    if img is None:
+        return None
 
-            if conf > best_conf and conf > 0.4:
-                box = detections[0, 0, i, 3:7] * np.array([w, h, w, h])
-                (x1, y1, x2, y2) = box.astype("int")
+    with stage("face_detect"):
+        boxes, det_conf = find_faces(img)
+    if not boxes:
+        return None
 
-                x1, y1 = max(0, x1), max(0, y1)
-                x2, y2 = min(w, x2), min(h, y2)
+    with stage("face_preprocess"):
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        batch = preprocess_faces(gray, boxes)
 
-                face_roi = img[y1:y2, x1:x2]
+    return {
+        "boxes": boxes,
+        "detection_confidence": det_conf,
+        "batch": batch,
+        "reduce": reduce,
+    }
 
-                if face_roi.size > 0:
-                    best_face = face_roi
-                    best_conf = conf
 
-        if best_face is None:
-            return {
-                "success": False,
-                "emotion": "neutral",
-                "confidence": 0.0,
-                "face_detected": False
-            }
+def summarize_faces(prepared, probs):
+    """prepare_faces() output + (N, classes) probs -> API result"""
+    _, labels = get_face_model()
+    reduce = prepared["reduce"]
+    det_conf = prepared["detection_confidence"]
 
-        print(f"🧪 Face detected (confidence={best_conf:.2f})")
+    indices = probs.argmax(axis=1)
+    faces = [
+        {
+            # Boxes in original-image pixels, even after a reduced decode
+            "box": [v * reduce for v in box],
+            "emotion": str(labels[i]),
+            "confidence": float(p[i]),
+            "detection_confidence": float(c)
+        }
+        for box, p, i, c in zip(prepared["boxes"], probs, indices, det_conf)
+    ]
 
-        # ---------- Emotion Prediction ----------
-        gray_face = cv2.cvtColor(best_face, cv2.COLOR_BGR2GRAY)
+    room_probs = np.average(probs, axis=0, weights=det_conf)
+    room_index = int(np.argmax(room_probs))
+
+    return {
+        "success": True,
+        "faces": faces,
+        "room": {
+            "emotion": str(labels[room_index]),
+            "confidence": float(room_probs[room_index])
+        }
+    }
+
+
+def no_faces_result():
+    return {
+        "success": False,
+        "faces": [],
+        "room": {"emotion": "neutral", "confidence": 0.0}
+    }
+
+
+# ================= PIPELINE STAGES =================
+def upload_buffer(file):
+    """
+    Upload contents read straight into a uint8 array (what imdecode
+    consumes), instead of read() -> bytes -> np.frombuffer. A view of
+    the spooled BytesIO would avoid even this copy, but Starlette closes
+    the upload after the response and a live export makes that fail.
+    """
+    inner = getattr(file, "_file", file)
+
+    inner.seek(0, os.SEEK_END)
+    size = inner.tell()
+    inner.seek(0)
+
+    buf = np.empty(size, np.uint8)
+    inner.readinto(memoryview(buf))
+    return buf
+
+
+def image_size(data):
+    """(width, height) from a JPEG / PNG header, or None"""
+    buf = memoryview(data).cast("B")
+
+    if bytes(buf[:8]) == b"\x89PNG\r\n\x1a\n" and len(buf) >= 24:
+        return (int.from_bytes(buf[16:20], "big"),
+                int.from_bytes(buf[20:24], "big"))
+
+    if bytes(buf[:2]) != b"\xff\xd8":
+        return None
+
+    # Walk JPEG segments up to the first start-of-frame marker
+    i = 2
+    while i + 9 < len(buf):
+        if buf[i] != 0xFF:
+            return None
+        marker = buf[i + 1]
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        length = int.from_bytes(buf[i + 2:i + 4], "big")
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            return (int.from_bytes(buf[i + 7:i + 9], "big"),
+                    int.from_bytes(buf[i + 5:i + 7], "big"))
+        i += 2 + length
+    return None
+
+
+def decode_reduction(data, min_side=FACE_DECODE_MIN_SIDE):
+    """Largest of 1 / 2 / 4 / 8 keeping the short side >= min_side"""
+    size = image_size(data)
+    if size is None:
+        return 1
+
+    short = min(size)
+    for factor in (8, 4, 2):
+        if short // factor >= min_side:
+            return factor
+    return 1
+
+
+def decode_image(data, reduce=1):
+    """bytes / memoryview / uint8 array -> BGR image (no extra copy)"""
+    np_img = np.frombuffer(data, np.uint8)
+    flag = _REDUCED_FLAGS.get(reduce, cv2.IMREAD_COLOR)
+    return cv2.imdecode(np_img, flag)
+
+
+def decode_upload(data):
+    """decode_image() with FACE_DECODE_REDUCED applied -> (img, factor)"""
+    reduce = decode_reduction(data) if FACE_DECODE_REDUCED else 1
+    return decode_image(data, reduce), reduce
+
+
+def run_face_detector(img):
+    """SSD forward pass -> (200, 7) detections"""
+    # blobFromImage does the 300x300 resize itself
+    blob = cv2.dnn.blobFromImage(
+        img,
+        1.0,
+        (300, 300),
+        (104.0, 177.0, 123.0)
+    )
+
+    face_net = get_face_net()
+    face_net.setInput(blob)
+    return face_net.forward()[0, 0]
+
+
+def detections_to_boxes(detections, w, h, min_conf=FACE_MIN_CONFIDENCE):
+    """(N, 7) detections -> (int boxes (M, 4), confidences (M,)), clipped"""
+    conf = detections[:, 2]
+    keep = conf > min_conf
+
+    boxes = (detections[keep, 3:7] * np.array([w, h, w, h])).astype("int")
+    boxes[:, [0, 2]] = np.clip(boxes[:, [0, 2]], 0, w)
+    boxes[:, [1, 3]] = np.clip(boxes[:, [1, 3]], 0, h)
+
+    valid = (boxes[:, 2] > boxes[:, 0]) & (boxes[:, 3] > boxes[:, 1])
+    return boxes[valid], conf[keep][valid]
+
+
+def find_faces(img, min_conf=FACE_MIN_CONFIDENCE):
+    """All detections above min_conf -> ([(x1, y1, x2, y2)], confidences)"""
+    (h, w) = img.shape[:2]
+    boxes, conf = detections_to_boxes(run_face_detector(img), w, h, min_conf)
+    return [tuple(int(v) for v in b) for b in boxes], conf
+
+
+def find_best_face(img):
+    """Returns ((x1, y1, x2, y2), confidence) or (None, 0.0)"""
+    (h, w) = img.shape[:2]
+    boxes, conf = detections_to_boxes(run_face_detector(img), w, h)
+
+    if len(conf) == 0:
+        return None, 0.0
+
+    best = int(np.argmax(conf))
+    return tuple(int(v) for v in boxes[best]), float(conf[best])
+
+
+def classify_face(face_bgr):
+    """BGR face crop -> (emotion, confidence)"""
+    with stage("face_preprocess"):
+        gray_face = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2GRAY)
         processed_face = preprocess_face(gray_face)
 
-        preds = face_emotion_model.predict(processed_face, verbose=0)[0]
+    with stage("face_cnn"):
+        preds = predict_face(processed_face)
+    _, labels = get_face_model()
+
+    emotion_index = int(np.argmax(preds))
+    return str(labels[emotion_index]), float(preds[emotion_index])
+
+
+# ================= CAMERA STREAM =================
+def start_camera_session():
+    return FaceTracker(find_best_face)
 
-        emotion_index = int(np.argmax(preds))
-        emotion = str(emotion_labels[emotion_index])
-        emotion_conf = float(preds[emotion_index])
 
-        print(f"🎯 Face emotion: {emotion} ({emotion_conf:.2f})")
+def analyze_camera_frame(tracker: FaceTracker, data: bytes):
+    """One streamed frame: SSD only when the tracker asks for it"""
+    try:
+        with stage("face_decode"):
+            img = decode_image(data)
+        if img is None:
+            return {**no_face_result(), "detector_ran": False}
+
+        with stage("face_track"):
+            box, detector_ran = tracker.update(img)
+        if box is None:
+            return {**no_face_result(), "detector_ran": detector_ran}
+
+        x1, y1, x2, y2 = box
+        emotion, emotion_conf = classify_face(img[y1:y2, x1:x2])
 
         return {
             "success": True,
             "emotion": emotion,
             "confidence": emotion_conf,
-            "face_detected": True
+            "face_detected": True,
+            "box": [x1, y1, x2, y2],
+            "detector_ran": detector_ran
         }
 
     except Exception as e:
-        print("❌ Face emotion error:", e)
-        return {
-            "success": False,
-            "emotion": "neutral",
-            "confidence": 0.0,
-            "face_detected": False
-        }
+        logger.error("❌ Camera frame error: %s", e)
+        tracker.reset()
+        return {**no_face_result(), "detector_ran": False}
@@ -0,0 +1,107 @@
+"""
+Cheap face tracking between SSD detections for camera streams.
+
+The SSD detector runs every FACE_DETECT_EVERY frames, or as soon as
+tracking is lost. In between, the face is followed by normalized
+template matching of a downscaled (~32 px wide) grayscale patch inside
+a small search window around the previous box, which costs a tiny
+fraction of a 300x300 SSD forward pass.
+"""
+
+import os
+
+import cv2
+
+FACE_DETECT_EVERY = int(os.getenv("FACE_DETECT_EVERY", "5"))
+FACE_TRACK_MIN_SCORE = float(os.getenv("FACE_TRACK_MIN_SCORE", "0.6"))
+# Search window = box grown by this fraction of its size on each side
+FACE_TRACK_MARGIN = float(os.getenv("FACE_TRACK_MARGIN", "0.5"))
+TEMPLATE_WIDTH = 32
+
+
+class FaceTracker:
+    def __init__(self, detect_fn, detect_every=FACE_DETECT_EVERY,
+                 min_score=FACE_TRACK_MIN_SCORE, margin=FACE_TRACK_MARGIN):
+        """detect_fn(img) -> ((x1, y1, x2, y2), confidence) or (None, 0.0)"""
+        self.detect_fn = detect_fn
+        self.detect_every = max(1, detect_every)
+        self.min_score = min_score
+        self.margin = margin
+
+        self.box = None
+        self._template = None
+        self._scale = 1.0
+        self._since_detect = 0
+
+        self.stats = {"frames": 0, "detections": 0, "tracked": 0, "lost": 0}
+
+    def reset(self):
+        self.box = None
+        self._template = None
+        self._since_detect = 0
+
+    # ---------------- TEMPLATE ----------------
+    def _set_template(self, gray, box):
+        x1, y1, x2, y2 = box
+        self._scale = TEMPLATE_WIDTH / max(1, x2 - x1)
+        height = max(1, int(round((y2 - y1) * self._scale)))
+        self._template = cv2.resize(
+            gray[y1:y2, x1:x2], (TEMPLATE_WIDTH, height),
+            interpolation=cv2.INTER_AREA
+        )
+
+    def _track(self, gray):
+        x1, y1, x2, y2 = self.box
+        bw, bh = x2 - x1, y2 - y1
+        h, w = gray.shape[:2]
+
+        mx, my = int(bw * self.margin), int(bh * self.margin)
+        sx1, sy1 = max(0, x1 - mx), max(0, y1 - my)
+        sx2, sy2 = min(w, x2 + mx), min(h, y2 + my)
+
+        s = self._scale
+        region = cv2.resize(
+            gray[sy1:sy2, sx1:sx2],
+            (max(1, int(round((sx2 - sx1) * s))), max(1, int(round((sy2 - sy1) * s)))),
+            interpolation=cv2.INTER_AREA
+        )
+
+        th, tw = self._template.shape[:2]
+        if region.shape[0] < th or region.shape[1] < tw:
+            return None
+
+        result = cv2.matchTemplate(region, self._template, cv2.TM_CCOEFF_NORMED)
+        _, score, _, (lx, ly) = cv2.minMaxLoc(result)
+        if score < self.min_score:
+            return None
+
+        nx1 = min(max(0, sx1 + int(round(lx / s))), w - 1)
+        ny1 = min(max(0, sy1 + int(round(ly / s))), h - 1)
+        return (nx1, ny1, min(w, nx1 + bw), min(h, ny1 + bh))
+
+    # ---------------- UPDATE ----------------
+    def update(self, img):
+        """Returns (box or None, ran_detector)"""
+        self.stats["frames"] += 1
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+        if self.box is not None and self._since_detect < self.detect_every:
+            box = self._track(gray)
+            if box is not None:
+                self.box = box
+                self._since_detect += 1
+                self.stats["tracked"] += 1
+                return box, False
+            self.stats["lost"] += 1
+
+        box, _ = self.detect_fn(img)
+        self.stats["detections"] += 1
+        self._since_detect = 0
+
+        if box is None:
+            self.reset()
+            return None, True
+
+        self.box = box
+        self._set_template(gray, box)
+        return box, True
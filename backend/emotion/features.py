@@ -0,0 +1,121 @@
+"""
+Single-pass voice feature extraction.
+
+The clip is framed once (librosa defaults: n_fft=2048, hop=512,
+centered, zero padded) and everything is derived from those frames in
+float32:
+
+    frames -> RMS                       (librosa.feature.rms)
+    frames -> |STFT| -> centroid        (librosa.feature.spectral_centroid)
+           -> |STFT|^2 -> mel -> dB -> DCT -> MFCC, deltas
+                                        (librosa.feature.mfcc / delta)
+
+The 160-dim vector matches the original librosa extract_features
+within float32 tolerance, so vocalvibe_model.h5 is unchanged.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+import scipy.fft
+from numpy.lib.stride_tricks import sliding_window_view
+
+N_FFT = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+TOP_DB = 80.0
+AMIN = 1e-10
+
+# Bump whenever the vector for the same audio changes (decode, resample,
+# framing, MFCC math): cached training features are keyed on it
+FEATURE_VERSION = 3
+
+
+@lru_cache(maxsize=8)
+def _hann(n_fft):
+    # Periodic Hann, as scipy.signal.get_window("hann", n_fft)
+    n = np.arange(n_fft, dtype=np.float64)
+    return (0.5 - 0.5 * np.cos(2.0 * np.pi * n / n_fft)).astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def _mel_basis(sr, n_fft, n_mels):
+    import librosa
+    return librosa.filters.mel(sr=sr, n_fft=n_fft, n_mels=n_mels).astype(np.float32)
+
+
+@lru_cache(maxsize=8)
+def _fft_freqs(sr, n_fft):
+    return np.fft.rfftfreq(n_fft, 1.0 / sr).astype(np.float32)
+
+
+def frame_signal(audio, n_fft=N_FFT, hop_length=HOP_LENGTH):
+    """(n_frames, n_fft) centered frames, as librosa's center=True"""
+    audio = np.asarray(audio, dtype=np.float32)
+    pad = n_fft // 2
+    padded = np.pad(audio, (pad, pad))
+    if len(padded) < n_fft:
+        padded = np.pad(padded, (0, n_fft - len(padded)))
+    return sliding_window_view(padded, n_fft)[::hop_length]
+
+
+def power_to_db(S):
+    log_spec = 10.0 * np.log10(np.maximum(S, AMIN))
+    return np.maximum(log_spec, log_spec.max() - TOP_DB)
+
+
+def mfcc_from_power(power, sr, n_mfcc, n_fft=N_FFT):
+    """power: (n_frames, n_fft // 2 + 1) -> (n_mfcc, n_frames)"""
+    mel = _mel_basis(sr, n_fft, N_MELS) @ power.T
+    return scipy.fft.dct(power_to_db(mel), axis=0, type=2, norm="ortho")[:n_mfcc]
+
+
+def spectral_centroid(magnitude, sr, n_fft=N_FFT):
+    """magnitude: (n_frames, bins) -> centroid per frame"""
+    norm = magnitude.sum(axis=1)
+    # librosa leaves all-zero columns unnormalized (centroid 0)
+    norm[norm < np.finfo(np.float32).tiny] = 1.0
+    return (magnitude @ _fft_freqs(sr, n_fft)) / norm
+
+
+def feature_vector(mfcc):
+    import librosa
+
+    delta = librosa.feature.delta(mfcc)
+    delta2 = librosa.feature.delta(mfcc, order=2)
+
+    return np.hstack([
+        np.mean(mfcc, axis=1),
+        np.std(mfcc, axis=1),
+        np.mean(delta, axis=1),
+        np.mean(delta2, axis=1)
+    ])
+
+
+def compute_voice_features(audio, sr, n_mfcc=40):
+    """
+    Returns {
+        vector:   model input (4 * n_mfcc,),
+        rms:      per-frame RMS of the raw clip,
+        centroid: mean spectral centroid (Hz)
+    }
+    """
+    frames = frame_signal(audio)
+
+    rms = np.sqrt(np.mean(frames ** 2, axis=1, dtype=np.float32))
+
+    spectrum = scipy.fft.rfft(frames * _hann(N_FFT), axis=1)
+    magnitude = np.abs(spectrum)
+
+    # extract_features peak-normalizes the clip before MFCC; scaling the
+    # power spectrum by 1 / peak^2 is the same thing
+    peak = np.max(np.abs(audio)) + 1e-6 if len(audio) else 1.0
+    power = magnitude ** 2 / np.float32(peak ** 2)
+
+    mfcc = mfcc_from_power(power, sr, n_mfcc)
+
+    return {
+        "vector": feature_vector(mfcc),
+        "rms": rms,
+        "centroid": float(np.mean(spectral_centroid(magnitude, sr))),
+    }
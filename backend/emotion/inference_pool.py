@@ -0,0 +1,189 @@
+"""
+Runs CPU-bound face / voice inference off the event loop.
+
+INFERENCE_EXECUTOR=thread  -> ThreadPoolExecutor (OpenCV / TF / librosa
+                              release the GIL for the heavy parts)
+INFERENCE_EXECUTOR=process -> spawned worker processes, each loading the
+                              models once in its initializer
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from metrics import call_with_timings, record_all
+
+logger = logging.getLogger(__name__)
+
+INFERENCE_EXECUTOR = os.getenv("INFERENCE_EXECUTOR", "thread")
+INFERENCE_WORKERS = int(
+    os.getenv("INFERENCE_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+# Tasks allowed to wait for a worker before we answer 429
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", "16"))
+INFERENCE_TIMEOUT = float(os.getenv("INFERENCE_TIMEOUT", "15"))
+
+
+class InferenceBusy(Exception):
+    """All workers and queue slots are taken."""
+
+
+class InferenceTimeout(Exception):
+    """A task did not finish within INFERENCE_TIMEOUT."""
+
+
+_executor = None
+_local_executor = None
+_executor_lock = threading.Lock()
+_in_flight = 0
+_in_flight_lock = threading.Lock()
+
+POOL_STATS = {
+    "submitted": 0,
+    "completed": 0,
+    "rejected": 0,
+    "timeouts": 0,
+}
+
+
+# ---------------- WORKER INIT ----------------
+def _init_worker():
+    # Load the models once per worker process
+    warm_models()
+
+
+def warm_models():
+    from emotion.face_emotion import load_face_models
+    from ml_model.load_model import get_voice_model
+
+    for load in (load_face_models, get_voice_model):
+        try:
+            load()
+        except Exception as e:
+            logger.error("❌ Model warm-up failed (%s): %s", load.__name__, e)
+
+
+def models_loaded():
+    from emotion.face_emotion import face_models_loaded
+    from ml_model.load_model import voice_model_loaded
+
+    return {**face_models_loaded(), "voice_emotion": voice_model_loaded()}
+
+
+# ---------------- EXECUTOR ----------------
+def get_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            if INFERENCE_EXECUTOR == "process":
+                _executor = ProcessPoolExecutor(
+                    max_workers=INFERENCE_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+            else:
+                _executor = ThreadPoolExecutor(
+                    max_workers=INFERENCE_WORKERS,
+                    thread_name_prefix="inference"
+                )
+            logger.info(
+                f"⚙️ Inference executor: {INFERENCE_EXECUTOR} "
+                f"x{INFERENCE_WORKERS} (queue={INFERENCE_QUEUE_SIZE})"
+            )
+        return _executor
+
+
+def get_local_executor():
+    """Threads in this process, for stateful (unpicklable) tasks"""
+    global _local_executor
+
+    if INFERENCE_EXECUTOR != "process":
+        return get_executor()
+
+    with _executor_lock:
+        if _local_executor is None:
+            _local_executor = ThreadPoolExecutor(
+                max_workers=INFERENCE_WORKERS,
+                thread_name_prefix="inference-local"
+            )
+        return _local_executor
+
+
+def shutdown_executor():
+    global _executor, _local_executor
+
+    with _executor_lock:
+        for executor in (_executor, _local_executor):
+            if executor is not None:
+                executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+        _local_executor = None
+
+
+def _release(_future):
+    global _in_flight
+
+    with _in_flight_lock:
+        _in_flight -= 1
+    POOL_STATS["completed"] += 1
+
+
+async def run_inference(fn, *args, local=False):
+    """
+    Runs fn(*args) on the inference pool.
+
+    local=True keeps the call in this process (for per-connection state
+    such as a face tracker) while sharing the same backpressure.
+
+    Raises InferenceBusy when the pool and its queue are full and
+    InferenceTimeout when the task exceeds INFERENCE_TIMEOUT.
+
+    Stage timings recorded inside fn (see metrics.stage) are returned
+    from the worker and recorded here, in the caller's request context.
+    """
+    global _in_flight
+
+    executor = get_local_executor() if local else get_executor()
+
+    with _in_flight_lock:
+        if _in_flight >= INFERENCE_WORKERS + INFERENCE_QUEUE_SIZE:
+            POOL_STATS["rejected"] += 1
+            raise InferenceBusy()
+        _in_flight += 1
+
+    # The slot is held until the worker is really done, even if the
+    # caller has already given up on it
+    try:
+        future = executor.submit(call_with_timings, fn, *args)
+    except Exception:
+        with _in_flight_lock:
+            _in_flight -= 1
+        raise
+    POOL_STATS["submitted"] += 1
+    future.add_done_callback(_release)
+
+    try:
+        result, timings = await asyncio.wait_for(
+            asyncio.wrap_future(future), INFERENCE_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        future.cancel()
+        POOL_STATS["timeouts"] += 1
+        raise InferenceTimeout()
+
+    record_all(timings)
+    return result
+
+
+def get_pool_stats():
+    return {
+        **POOL_STATS,
+        "executor": INFERENCE_EXECUTOR,
+        "workers": INFERENCE_WORKERS,
+        "queue_size": INFERENCE_QUEUE_SIZE,
+        "in_flight": _in_flight,
+    }
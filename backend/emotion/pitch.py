@@ -0,0 +1,142 @@
+"""
+Pitch (f0) estimation for voice steering.
+
+steer_emotion only needs the mean / std of f0, so the default "yin"
+estimator is a vectorized YIN over decimated, framed audio: one FFT
+per frame batch instead of pyin's per-frame HMM / Viterbi decoding.
+Unvoiced frames are 0, like np.nan_to_num(pyin(...)[0]).
+
+PITCH_ESTIMATOR=pyin keeps the original librosa.pyin path.
+"""
+
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+PITCH_ESTIMATOR = os.getenv("PITCH_ESTIMATOR", "yin")
+
+FMIN = 65.41     # librosa.note_to_hz("C2")
+FMAX = 2093.0    # librosa.note_to_hz("C7")
+
+# Same frame timing as librosa.pyin defaults at 22050 Hz
+FRAME_SECONDS = 2048 / 22050
+HOP_SECONDS = 512 / 22050
+
+YIN_THRESHOLD = float(os.getenv("YIN_THRESHOLD", "0.15"))
+# Frames whose best CMND dip is above this are unvoiced
+YIN_VOICING_THRESHOLD = float(os.getenv("YIN_VOICING_THRESHOLD", "0.35"))
+# Frames quieter than this fraction of the loudest frame are unvoiced
+YIN_SILENCE_RATIO = float(os.getenv("YIN_SILENCE_RATIO", "0.05"))
+
+
+def _decimation_factor(sr, fmax):
+    # Keep ~2.5x headroom over fmax after decimation
+    return max(1, int(sr // (2.5 * fmax)))
+
+
+def frame_audio(audio, frame_length, hop_length):
+    """Centered, zero-padded (n_frames, frame_length) view"""
+    pad = frame_length // 2
+    padded = np.pad(audio, (pad, pad))
+    if len(padded) < frame_length:
+        padded = np.pad(padded, (0, frame_length - len(padded)))
+    return sliding_window_view(padded, frame_length)[::hop_length]
+
+
+def yin_from_frames(frames, sr, fmin=FMIN, fmax=FMAX,
+                    threshold=YIN_THRESHOLD):
+    """
+    Vectorized YIN on (n_frames, frame_length) audio.
+    Returns (f0, cmnd_min) per frame; f0 is 0 where unvoiced.
+    """
+    n_frames, frame_length = frames.shape
+    min_period = max(1, int(np.floor(sr / fmax)))
+    max_period = min(int(np.ceil(sr / fmin)), frame_length // 2)
+    win = frame_length - max_period
+
+    frames = frames.astype(np.float32, copy=False)
+
+    # r(tau) = sum_j x[j] * x[j + tau], j < win  (cross-correlation by FFT)
+    n_fft = 1 << int(np.ceil(np.log2(frame_length + win)))
+    spec_full = np.fft.rfft(frames, n_fft, axis=1)
+    spec_head = np.fft.rfft(frames[:, :win], n_fft, axis=1)
+    acf = np.fft.irfft(spec_full * np.conj(spec_head), n_fft, axis=1)
+    acf = acf[:, :max_period + 1]
+
+    # d(tau) = E[0:win] + E[tau:tau+win] - 2 r(tau)
+    sq = np.concatenate(
+        [np.zeros((n_frames, 1), np.float32), np.cumsum(frames ** 2, axis=1)],
+        axis=1
+    )
+    taus = np.arange(max_period + 1)
+    energy = sq[:, taus + win] - sq[:, taus]
+    diff = energy[:, :1] + energy - 2.0 * acf
+    np.maximum(diff, 0.0, out=diff)
+
+    # Cumulative mean normalized difference
+    cmnd = np.ones_like(diff)
+    cumsum = np.cumsum(diff[:, 1:], axis=1)
+    cmnd[:, 1:] = diff[:, 1:] * taus[1:] / np.maximum(cumsum, 1e-12)
+
+    band = cmnd[:, min_period:max_period]
+
+    # First local minimum under the threshold, else the global minimum
+    local_min = np.zeros_like(band, dtype=bool)
+    local_min[:, 1:-1] = (band[:, 1:-1] <= band[:, :-2]) & (band[:, 1:-1] < band[:, 2:])
+    candidates = local_min & (band < threshold)
+    has_candidate = candidates.any(axis=1)
+    idx = np.where(
+        has_candidate, candidates.argmax(axis=1), band.argmin(axis=1)
+    )
+
+    rows = np.arange(n_frames)
+    best = band[rows, idx]
+
+    # Parabolic interpolation around the chosen lag
+    left = band[rows, np.clip(idx - 1, 0, band.shape[1] - 1)]
+    right = band[rows, np.clip(idx + 1, 0, band.shape[1] - 1)]
+    denom = left - 2.0 * best + right
+    safe = np.abs(denom) > 1e-12
+    shift = np.zeros_like(best)
+    shift[safe] = 0.5 * (left - right)[safe] / denom[safe]
+    period = min_period + idx + np.clip(shift, -1.0, 1.0)
+
+    f0 = sr / np.maximum(period, 1e-6)
+    voiced = (best < YIN_VOICING_THRESHOLD) & (f0 >= fmin) & (f0 <= fmax)
+    return np.where(voiced, f0, 0.0), best
+
+
+def yin(audio, sr, fmin=FMIN, fmax=FMAX):
+    """f0 per frame (0 = unvoiced) on the pyin frame grid"""
+    factor = _decimation_factor(sr, fmax)
+    if factor > 1:
+        from scipy.signal import resample_poly
+        audio = resample_poly(audio, 1, factor).astype(np.float32)
+        sr = sr / factor
+
+    frame_length = int(round(FRAME_SECONDS * sr))
+    hop_length = max(1, int(round(HOP_SECONDS * sr)))
+
+    frames = frame_audio(np.asarray(audio, np.float32), frame_length, hop_length)
+    f0, _ = yin_from_frames(frames, sr, fmin, fmax)
+
+    # Silence gate (pyin marks these unvoiced as well)
+    rms = np.sqrt(np.mean(frames.astype(np.float32) ** 2, axis=1))
+    f0[rms < YIN_SILENCE_RATIO * (rms.max() + 1e-12)] = 0.0
+    return f0
+
+
+def pyin(audio, sr, fmin=FMIN, fmax=FMAX):
+    import librosa
+
+    f0, _, _ = librosa.pyin(audio, fmin=fmin, fmax=fmax, sr=sr)
+    return np.nan_to_num(f0)
+
+
+ESTIMATORS = {"yin": yin, "pyin": pyin}
+
+
+def estimate_pitch(audio, sr, method=None):
+    """f0 track in Hz with 0 for unvoiced frames"""
+    return ESTIMATORS[method or PITCH_ESTIMATOR](audio, sr)
@@ -0,0 +1,246 @@
+"""
+Result cache + request coalescing in front of the inference pool.
+
+Retried uploads and repeated frames hash to the same key, so they are
+answered from memory instead of running decode -> detect -> CNN again.
+Identical requests that arrive while the first one is still on the
+pool all await that single computation.
+
+    key = content_key("face", image_bytes)
+    result = await result_cache.get_or_compute(key, lambda: infer(...))
+
+Keys are a 128-bit BLAKE2b of the upload plus whatever else the result
+depends on (the voice session id). The cache is an LRU bounded by the
+approximate size of the stored results (RESULT_CACHE_MAX_MB) with a
+TTL, so session-dependent voice results don't outlive their context.
+
+Optionally (RESULT_CACHE_PHASH=1), frames can also be matched by a
+64-bit difference hash (dHash) of a tiny grayscale thumbnail, which
+survives re-encoding and sensor noise: a frame within
+RESULT_CACHE_PHASH_DISTANCE bits of a cached one reuses its result.
+The thumbnail is too coarse to see an expression change on the same
+face, so this is off by default and only ever matches frames from the
+same client session. Failed results (no face, decode errors) are never
+cached.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+RESULT_CACHE = os.getenv("RESULT_CACHE", "1") == "1"
+RESULT_CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "16"))
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "60"))
+RESULT_CACHE_PHASH = os.getenv("RESULT_CACHE_PHASH", "0") == "1"
+# Max differing dHash bits for two frames to count as the same
+RESULT_CACHE_PHASH_DISTANCE = int(os.getenv("RESULT_CACHE_PHASH_DISTANCE", "0"))
+# Most recent entries compared by perceptual hash on an exact miss
+RESULT_CACHE_PHASH_SCAN = int(os.getenv("RESULT_CACHE_PHASH_SCAN", "256"))
+
+# Key, OrderedDict node and dict bookkeeping per entry (approximate)
+ENTRY_OVERHEAD = 256
+
+
+# ---------------- HASHING ----------------
+def content_key(kind, data, *extra):
+    """Exact key: kind + BLAKE2b of the bytes (or uint8 array) + extras"""
+    digest = hashlib.blake2b(memoryview(data), digest_size=16).digest()
+    return (kind, digest) + extra
+
+
+def frame_phash(data):
+    """
+    64-bit dHash of an encoded frame, or None if it can't be decoded.
+    Decodes at 1/8 scale in grayscale, so it costs a fraction of the
+    full-size decode it may save.
+    """
+    buf = np.frombuffer(data, np.uint8) if isinstance(data, bytes) else data
+    img = cv2.imdecode(buf, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if img is None:
+        return None
+
+    small = cv2.resize(img, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def phash_distance(a, b):
+    return (a ^ b).bit_count()
+
+
+def _result_size(result):
+    try:
+        return ENTRY_OVERHEAD + len(json.dumps(result))
+    except (TypeError, ValueError):
+        return ENTRY_OVERHEAD + len(repr(result))
+
+
+# ---------------- CACHE ----------------
+class ResultCache:
+    def __init__(self, max_bytes=int(RESULT_CACHE_MAX_MB * 1024 * 1024),
+                 ttl=RESULT_CACHE_TTL, phash_distance=RESULT_CACHE_PHASH_DISTANCE,
+                 phash_scan=RESULT_CACHE_PHASH_SCAN):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.phash_distance = phash_distance
+        self.phash_scan = phash_scan
+
+        # key -> (expires_at, size, result, phash, phash scope)
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._pending = {}          # key -> asyncio.Task (in-flight)
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "hits": 0,
+            "phash_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+
+    # ---------------- LOOKUP ----------------
+    def get(self, key, phash=None, scope=None):
+        """
+        Cached result for key, or for a perceptually matching frame
+        stored under the same scope (never across scopes)
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= now:
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return entry[2]
+                self._drop(key)
+                self.stats["expired"] += 1
+
+            if phash is None or scope is None:
+                return None
+
+            # Newest first
+            for i, (other, entry) in enumerate(reversed(self._entries.items())):
+                if i >= self.phash_scan:
+                    break
+                if entry[3] is None or entry[0] < now or entry[4] != scope:
+                    continue
+                if phash_distance(phash, entry[3]) <= self.phash_distance:
+                    self._entries.move_to_end(other)
+                    self.stats["phash_hits"] += 1
+                    return entry[2]
+
+        return None
+
+    def put(self, key, result, phash=None, scope=None):
+        size = _result_size(result)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (
+                time.monotonic() + self.ttl, size, result, phash, scope
+            )
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats["evictions"] += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    # ---------------- COALESCING ----------------
+    async def get_or_compute(self, key, compute, phash=None, scope=None):
+        """
+        compute: zero-arg coroutine function run once per key while it
+        is in flight. Errors (busy / timeout) reach every waiter and are
+        not cached, and neither are {"success": False} results.
+        """
+        cached = self.get(key, phash, scope)
+        if cached is not None:
+            return cached
+
+        task = self._pending.get(key)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.get_running_loop().create_task(
+                self._compute(key, compute, phash, scope)
+            )
+            self._pending[key] = task
+            # If every waiter went away, don't log the error as unretrieved
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        else:
+            self.stats["coalesced"] += 1
+
+        # A waiter that disconnects must not cancel the shared work
+        return await asyncio.shield(task)
+
+    async def _compute(self, key, compute, phash, scope):
+        try:
+            result = await compute()
+            # A failure may be transient (busy model, bad frame): recompute
+            if not (isinstance(result, dict) and result.get("success") is False):
+                self.put(key, result, phash, scope)
+            return result
+        finally:
+            self._pending.pop(key, None)
+
+    # ---------------- STATS ----------------
+    def get_stats(self):
+        with self._lock:
+            entries, size = len(self._entries), self._bytes
+        hits = self.stats["hits"] + self.stats["phash_hits"]
+        lookups = hits + self.stats["misses"] + self.stats["coalesced"]
+        return {
+            **self.stats,
+            "entries": entries,
+            "bytes": size,
+            "in_flight": len(self._pending),
+            # Coalesced requests also skipped their own computation
+            "hit_ratio": (hits + self.stats["coalesced"]) / lookups if lookups else 0.0,
+        }
+
+
+result_cache = ResultCache()
+
+
+async def cached_inference(kind, data, compute, *extra, perceptual=False,
+                           client=None):
+    """
+    get_or_compute() keyed on the upload. perceptual=True also matches
+    near-identical frames from the same client (session id) when
+    RESULT_CACHE_PHASH=1; without a client only exact bytes match.
+    RESULT_CACHE=0 -> always compute.
+    """
+    if not RESULT_CACHE:
+        return await compute()
+
+    key = content_key(kind, data, *extra)
+    phash = scope = None
+    if perceptual and RESULT_CACHE_PHASH and client is not None:
+        # Only worth the thumbnail decode once the exact key has missed
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
+        phash = await asyncio.to_thread(frame_phash, data)
+        scope = (kind, client) + extra
+    return await result_cache.get_or_compute(key, compute, phash, scope)
@@ -0,0 +1,198 @@
+"""
+Per-session voice steering state.
+
+Each client session keeps a fixed-size record: an EMA of the model's
+class probabilities (one float32 per label) plus the last emitted
+emotion. Requests without a session id are stateless.
+
+SESSION_STORE=memory -> LRU + TTL dict in this process (default)
+SESSION_STORE=redis  -> shared across uvicorn workers / inference
+                        processes via SESSION_REDIS_URL (needs the
+                        optional `redis` package)
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+SESSION_STORE = os.getenv("SESSION_STORE", "memory")
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))
+SESSION_REDIS_URL = os.getenv("SESSION_REDIS_URL", "redis://localhost:6379/0")
+SESSION_REDIS_PREFIX = os.getenv("SESSION_REDIS_PREFIX", "moodify:voice:")
+
+# Weight of the newest prediction in the probability EMA
+VOICE_EMA_ALPHA = float(os.getenv("VOICE_EMA_ALPHA", "0.5"))
+
+
+class SessionState:
+    __slots__ = ("ema", "last_emotion", "updates")
+
+    def __init__(self, ema=None, last_emotion=None, updates=0):
+        self.ema = ema                  # (n_labels,) float32 or None
+        self.last_emotion = last_emotion
+        self.updates = updates
+
+    def smooth(self, probs, alpha=VOICE_EMA_ALPHA):
+        """Folds one prediction into the EMA and returns the smoothed probs"""
+        probs = np.asarray(probs, np.float32)
+        if self.ema is None or self.ema.shape != probs.shape:
+            self.ema = probs.copy()
+        else:
+            self.ema = alpha * probs + (1.0 - alpha) * self.ema
+        self.updates += 1
+        return self.ema
+
+    def to_json(self):
+        return json.dumps({
+            "ema": None if self.ema is None else self.ema.tolist(),
+            "last_emotion": self.last_emotion,
+            "updates": self.updates,
+        })
+
+    @classmethod
+    def from_json(cls, raw):
+        data = json.loads(raw)
+        ema = data.get("ema")
+        return cls(
+            None if ema is None else np.asarray(ema, np.float32),
+            data.get("last_emotion"),
+            data.get("updates", 0)
+        )
+
+
+# ---------------- IN-MEMORY (LRU + TTL) ----------------
+class MemorySessionStore:
+    def __init__(self, max_sessions=SESSION_MAX, ttl=SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions = OrderedDict()   # id -> (expires_at, SessionState)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def update(self, session_id, fn):
+        """fn(state) -> result, applied atomically for this session"""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None and entry[0] < now:
+                self.stats["expired"] += 1
+                entry = None
+
+            if entry is None:
+                self.stats["misses"] += 1
+                state = SessionState()
+            else:
+                self.stats["hits"] += 1
+                state = entry[1]
+
+            result = fn(state)
+
+            self._sessions[session_id] = (now + self.ttl, state)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self.stats["evictions"] += 1
+
+        return result
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def get_stats(self):
+        with self._lock:
+            size = len(self._sessions)
+        return {**self.stats, "backend": "memory", "size": size}
+
+
+# ---------------- SHARED (REDIS) ----------------
+class RedisSessionStore:
+    def __init__(self, url=SESSION_REDIS_URL, ttl=SESSION_TTL,
+                 prefix=SESSION_REDIS_PREFIX, max_retries=5):
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError(
+                "SESSION_STORE=redis needs the `redis` package"
+            ) from e
+
+        self._redis = redis
+        self._client = redis.Redis.from_url(url)
+        self.ttl = int(ttl)
+        self.prefix = prefix
+        self.max_retries = max_retries
+        self.stats = {"hits": 0, "misses": 0, "conflicts": 0}
+
+    def update(self, session_id, fn):
+        """Optimistic WATCH / MULTI so concurrent workers don't clobber"""
+        key = self.prefix + session_id
+
+        for _ in range(self.max_retries):
+            with self._client.pipeline() as pipe:
+                try:
+                    pipe.watch(key)
+                    raw = pipe.get(key)
+                    if raw is None:
+                        self.stats["misses"] += 1
+                        state = SessionState()
+                    else:
+                        self.stats["hits"] += 1
+                        state = SessionState.from_json(raw)
+
+                    result = fn(state)
+
+                    pipe.multi()
+                    pipe.set(key, state.to_json(), ex=self.ttl)
+                    pipe.execute()
+                    return result
+                except self._redis.WatchError:
+                    self.stats["conflicts"] += 1
+
+        # Lost every race: plain read-modify-write, last writer wins
+        raw = self._client.get(key)
+        state = SessionState() if raw is None else SessionState.from_json(raw)
+        result = fn(state)
+        self._client.set(key, state.to_json(), ex=self.ttl)
+        return result
+
+    def delete(self, session_id):
+        self._client.delete(self.prefix + session_id)
+
+    def get_stats(self):
+        return {**self.stats, "backend": "redis"}
+
+
+# ---------------- STORE SELECTION ----------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    global _store
+
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                if SESSION_STORE == "redis":
+                    _store = RedisSessionStore()
+                else:
+                    _store = MemorySessionStore()
+    return _store
+
+
+def delete_session(session_id):
+    """Module-level so it can be sent to inference worker processes"""
+    get_session_store().delete(session_id)
+
+
+def update_session(session_id, fn):
+    """Runs fn(state) for session_id, or on a throwaway state if None"""
+    if not session_id:
+        return fn(SessionState())
+    return get_session_store().update(session_id, fn)
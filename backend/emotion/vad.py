@@ -0,0 +1,129 @@
+"""
+Energy / zero-crossing voice activity detection for voice uploads.
+
+    voiced, info = trim_silence(audio, sr)
+    info -> {"seconds", "voiced_seconds", "trimmed", "segments"}
+
+The clip is cut into non-overlapping VAD_FRAME_SECONDS frames. A frame
+is speech when its energy clears an adaptive threshold:
+
+    max(VAD_FLOOR_DB,               absolute floor (dBFS)
+        peak - VAD_RANGE_DB,        within range of the loudest frame
+        noise + VAD_SNR_DB)         above the noise floor (5th percentile)
+
+so stationary noise with no louder events yields no speech at all.
+
+Quieter frames with a high zero-crossing rate (fricatives: s, sh, f)
+count as speech only next to an energetic frame, so broadband noise
+can't pass on ZCR alone. The frame mask is then cleaned up with 1-D
+morphology: bursts shorter than VAD_MIN_BURST_SECONDS (clicks) are
+dropped, pauses shorter than VAD_MAX_GAP_SECONDS are kept (prosody,
+MFCC deltas), and each segment is padded by VAD_PAD_SECONDS.
+
+Everything is a handful of numpy passes over ~50 frames per second,
+far cheaper than the MFCC / pitch work it saves on silent audio.
+"""
+
+import os
+
+import numpy as np
+from scipy.ndimage import binary_dilation
+
+VAD_FRAME_SECONDS = 0.02
+VAD_FLOOR_DB = float(os.getenv("VAD_FLOOR_DB", "-50"))
+VAD_RANGE_DB = float(os.getenv("VAD_RANGE_DB", "40"))
+VAD_SNR_DB = float(os.getenv("VAD_SNR_DB", "6"))
+# Fricatives: ZCR above this, within VAD_FRICATIVE_DB under the threshold
+VAD_ZCR = 0.3
+VAD_FRICATIVE_DB = 10.0
+VAD_MIN_BURST_SECONDS = 0.06
+VAD_MAX_GAP_SECONDS = float(os.getenv("VAD_MAX_GAP_SECONDS", "0.3"))
+VAD_PAD_SECONDS = 0.1
+
+
+# ---------------- MASK OPS ----------------
+def _dilate(mask, k):
+    """Each frame becomes True if any frame within k of it is True"""
+    if k <= 0 or mask.size == 0:
+        return mask
+    # Same length as mask even when the window is longer than the clip
+    return binary_dilation(mask, structure=np.ones(2 * k + 1, bool))
+
+
+def _erode(mask, k):
+    # Outside the clip counts as True, so speech at the edges survives
+    return ~_dilate(~mask, k)
+
+
+# ---------------- DETECT ----------------
+def frame_stats(audio, frame_length):
+    """(energy dBFS, zero-crossing rate) per non-overlapping frame"""
+    n = len(audio) // frame_length
+    frames = audio[:n * frame_length].reshape(n, frame_length)
+
+    power = np.einsum("ij,ij->i", frames, frames) / frame_length
+    energy_db = 10.0 * np.log10(np.maximum(power, 1e-12))
+
+    sign = np.signbit(frames)
+    zcr = np.count_nonzero(sign[:, 1:] != sign[:, :-1], axis=1) / frame_length
+    return energy_db, zcr
+
+
+def speech_mask(audio, sr):
+    """Per-frame speech mask and the frame length it was computed on"""
+    frame_length = max(1, int(round(VAD_FRAME_SECONDS * sr)))
+    energy_db, zcr = frame_stats(audio, frame_length)
+    # Shorter than one pause-bridging window: too little to call speech
+    if energy_db.size * VAD_FRAME_SECONDS < VAD_MAX_GAP_SECONDS:
+        return np.zeros(energy_db.size, bool), frame_length
+
+    peak = float(np.max(energy_db))
+    noise = float(np.percentile(energy_db, 5))
+    threshold = max(
+        VAD_FLOOR_DB,
+        peak - VAD_RANGE_DB,
+        noise + VAD_SNR_DB
+    )
+
+    def frames(seconds):
+        return int(round(seconds / VAD_FRAME_SECONDS))
+
+    loud = energy_db > threshold
+    fricative = (zcr > VAD_ZCR) & (energy_db > threshold - VAD_FRICATIVE_DB)
+    mask = loud | (fricative & _dilate(loud, frames(VAD_PAD_SECONDS)))
+
+    # Opening drops clicks, closing bridges short pauses, then pad
+    burst = frames(VAD_MIN_BURST_SECONDS) // 2
+    mask = _dilate(_erode(mask, burst), burst)
+    gap = frames(VAD_MAX_GAP_SECONDS) // 2
+    mask = _erode(_dilate(mask, gap), gap)
+    return _dilate(mask, frames(VAD_PAD_SECONDS)), frame_length
+
+
+def trim_silence(audio, sr):
+    """
+    audio -> (speech-only audio, info). Voiced segments are concatenated
+    in order; the tail shorter than one frame follows the last frame.
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    mask, frame_length = speech_mask(audio, sr)
+
+    if not mask.any():
+        voiced = audio[:0]
+        segments = 0
+    else:
+        samples = np.repeat(mask, frame_length)
+        if len(samples) < len(audio):
+            tail = np.full(len(audio) - len(samples), mask[-1])
+            samples = np.concatenate([samples, tail])
+        voiced = audio[samples]
+        segments = int(np.count_nonzero(np.diff(mask.astype(np.int8)) == 1) + mask[0])
+
+    seconds = len(audio) / sr
+    voiced_seconds = len(voiced) / sr
+    return voiced, {
+        "seconds": seconds,
+        "voiced_seconds": voiced_seconds,
+        "trimmed": 1.0 - voiced_seconds / seconds if seconds else 0.0,
+        "segments": segments,
+    }
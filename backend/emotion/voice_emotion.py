@@ -1,145 +1,228 @@
-import io
+import logging
+import os
 import numpy as np
-import librosa
-import soundfile as sf
 from fastapi import UploadFile
-from scipy.stats import entropy
 
-from ml_model.load_model import model, labels
+from metrics import stage
+from emotion.audio_ingest import MAX_VOICE_SECONDS, decode_audio, resample_audio
+from emotion.features import compute_voice_features
+from emotion.pitch import estimate_pitch
+from emotion.session_state import update_session
+from emotion.vad import trim_silence
+from emotion.voice_stream import VoiceStream, stream_features
+from ml_model.load_model import get_voice_model
 
 TARGET_SR = 22050
 N_MFCC = 40
+# Minimum rolling window for streamed audio (raw seconds)
 MIN_DURATION = 2.5
+# Uploads need this much speech left after silence trimming
+MIN_VOICED_SECONDS = float(os.getenv("MIN_VOICED_SECONDS", "1.0"))
 
-# ---------- MEMORY (prevents sticking) ----------
-LAST_EMOTION = None
-STREAK = 0
-MAX_STREAK = 3   # after this → neutral allowed
+logger = logging.getLogger(__name__)
 
 
-# ---------- FEATURE EXTRACTION ----------
-def extract_features(audio, sr):
-    audio = audio / (np.max(np.abs(audio)) + 1e-6)
+# ---------- HELPERS ----------
+def entropy(probs):
+    # Same as scipy.stats.entropy (natural log), without importing
+    # scipy.stats (~1.5s) at startup
+    p = np.asarray(probs, dtype="float64")
+    p = p / p.sum()
+    p = p[p > 0]
+    return float(-np.sum(p * np.log(p)))
 
-    mfcc = librosa.feature.mfcc(y=audio, sr=sr, n_mfcc=N_MFCC)
-    delta = librosa.feature.delta(mfcc)
-    delta2 = librosa.feature.delta(mfcc, order=2)
 
-    return np.hstack([
-        np.mean(mfcc, axis=1),
-        np.std(mfcc, axis=1),
-        np.mean(delta, axis=1),
-        np.mean(delta2, axis=1)
-    ])
+# ---------- FEATURE EXTRACTION ----------
+def extract_features(audio, sr):
+    return compute_voice_features(audio, sr, n_mfcc=N_MFCC)["vector"]
 
 
 # ---------- STEERING ----------
-def steer_emotion(preds, audio, sr):
-    global LAST_EMOTION, STREAK
-
-    rms = librosa.feature.rms(y=audio)[0]
-    rms_mean, rms_std = np.mean(rms), np.std(rms)
-
-    f0, _, _ = librosa.pyin(
-        audio,
-        fmin=librosa.note_to_hz("C2"),
-        fmax=librosa.note_to_hz("C7")
+def voice_cues(audio, sr, features=None):
+    """Prosody summary the soft rules look at -> plain dict of floats"""
+    # RMS / centroid come from the same framing + STFT as the MFCCs
+    if features is None:
+        features = compute_voice_features(audio, sr, n_mfcc=N_MFCC)
+
+    rms = features["rms"]
+
+    with stage("voice_pitch"):
+        f0 = estimate_pitch(audio, sr)
+
+    cues = {
+        "rms_mean": float(np.mean(rms)),
+        "rms_std": float(np.std(rms)),
+        "pitch_mean": float(np.mean(f0)),
+        "pitch_std": float(np.std(f0)),
+        "centroid": float(features["centroid"]),
+    }
+
+    logger.debug(
+        "🎚️ RMS μ=%.4f σ=%.4f | Pitch μ=%.1f σ=%.1f | Centroid=%.0f",
+        cues["rms_mean"], cues["rms_std"], cues["pitch_mean"],
+        cues["pitch_std"], cues["centroid"]
     )
-    f0 = np.nan_to_num(f0)
-    pitch_mean, pitch_std = np.mean(f0), np.std(f0)
+    return cues
 
-    centroid = np.mean(
-        librosa.feature.spectral_centroid(y=audio, sr=sr)
-    )
 
-    print(
-        f"🎚️ RMS μ={rms_mean:.4f} σ={rms_std:.4f} | "
-        f"Pitch μ={pitch_mean:.1f} σ={pitch_std:.1f} | "
-        f"Centroid={centroid:.0f}"
-    )
+def steer_from_cues(preds, cues, session_id=None):
+    rms_mean, rms_std = cues["rms_mean"], cues["rms_std"]
+    pitch_mean, pitch_std = cues["pitch_mean"], cues["pitch_std"]
+    centroid = cues["centroid"]
 
-    probs = preds.copy()
+    _, labels = get_voice_model()
     label_list = labels.tolist()
 
-    # ---------- LOW CONFIDENCE ----------
-    ent = entropy(probs)
-    if ent > 1.5:
-        print("⚠️ High uncertainty → neutral")
-        emotion = "neutral"
-    else:
-        emotion = label_list[int(np.argmax(probs))]
+    def apply(state):
+        # ---------- TEMPORAL SMOOTHING (per session) ----------
+        probs = state.smooth(preds)
+
+        # ---------- LOW CONFIDENCE ----------
+        ent = entropy(probs)
+        if ent > 1.5:
+            logger.debug("⚠️ High uncertainty → neutral")
+            emotion = "neutral"
+        else:
+            emotion = label_list[int(np.argmax(probs))]
 
-    # ---------- SOFT RULES ----------
-    if rms_mean < 0.03 and pitch_mean < 130:
-        emotion = "sad"
+        # ---------- SOFT RULES ----------
+        if rms_mean < 0.03 and pitch_mean < 130:
+            emotion = "sad"
 
-    elif pitch_mean > 180 and centroid > 2500:
-        emotion = "happy"
+        elif pitch_mean > 180 and centroid > 2500:
+            emotion = "happy"
 
-    elif pitch_std > 80 and rms_std > 0.05 and rms_mean > 0.05:
-        emotion = "angry"
+        elif pitch_std > 80 and rms_std > 0.05 and rms_mean > 0.05:
+            emotion = "angry"
 
-    elif pitch_mean > 200 and rms_mean < 0.04:
-        emotion = "fearful"
+        elif pitch_mean > 200 and rms_mean < 0.04:
+            emotion = "fearful"
 
-    # ---------- STICKINESS CONTROL ----------
-    if emotion == LAST_EMOTION:
-        STREAK += 1
-        if STREAK >= MAX_STREAK:
-            print("🔄 Emotion stuck → reset to neutral")
-            emotion = "neutral"
-            STREAK = 0
-    else:
-        STREAK = 0
+        state.last_emotion = emotion
+        return emotion, float(np.max(probs))
 
-    LAST_EMOTION = emotion
-    confidence = float(np.max(probs))
+    return update_session(session_id, apply)
 
-    return emotion, confidence
 
+def steer_emotion(preds, audio, sr, features=None, session_id=None):
+    return steer_from_cues(preds, voice_cues(audio, sr, features), session_id)
 
-# ---------- API ----------
-def detect_voice_emotion(audio_file: UploadFile):
-    try:
-        audio_bytes = audio_file.file.read()
 
-        audio, sr = sf.read(io.BytesIO(audio_bytes))
-        if audio.ndim > 1:
-            audio = np.mean(audio, axis=1)
+# ---------- API ----------
+def load_voice_audio(audio_bytes, max_seconds=MAX_VOICE_SECONDS):
+    """
+    Upload bytes -> (mono float32 audio at TARGET_SR, TARGET_SR), cut
+    to the first max_seconds (see emotion/audio_ingest.py)
+    """
+    with stage("voice_decode"):
+        audio, sr = decode_audio(audio_bytes, max_seconds, TARGET_SR)
+
+    if sr != TARGET_SR:
+        with stage("voice_resample"):
+            audio = resample_audio(audio, sr, TARGET_SR)
+        sr = TARGET_SR
+
+    return audio, sr
+
+
+def detect_voice_emotion(audio_file: UploadFile, session_id=None):
+    return detect_voice_emotion_bytes(audio_file.file.read(), session_id)
+
+
+def load_voiced_audio(audio_bytes):
+    """
+    load_voice_audio() + silence trimming (emotion/vad.py) ->
+    (speech-only audio, sr, {"seconds", "voiced_seconds", "trimmed", ...})
+    """
+    audio, sr = load_voice_audio(audio_bytes)
+    with stage("voice_vad"):
+        voiced, vad = trim_silence(audio, sr)
+
+    logger.debug(
+        "🎧 Duration: %.2fs, voiced %.2fs (%.0f%% trimmed)",
+        vad["seconds"], vad["voiced_seconds"], 100 * vad["trimmed"]
+    )
+    return voiced, sr, vad
 
-        if sr != TARGET_SR:
-            audio = librosa.resample(audio, sr, TARGET_SR)
-            sr = TARGET_SR
 
-        duration = len(audio) / sr
-        print(f"🎧 Duration: {duration:.2f}s")
+def detect_voice_emotion_bytes(audio_bytes: bytes, session_id=None):
+    try:
+        audio, sr, vad = load_voiced_audio(audio_bytes)
+        speech = {
+            "voiced_seconds": round(vad["voiced_seconds"], 3),
+            "trimmed": round(vad["trimmed"], 3)
+        }
 
-        if duration < MIN_DURATION:
+        if vad["voiced_seconds"] < MIN_VOICED_SECONDS:
             return {
                 "success": False,
                 "emotion": "neutral",
-                "confidence": 0.0
+                "confidence": 0.0,
+                **speech
             }
 
-        features = extract_features(audio, sr).reshape(1, -1)
-        preds = model.predict(features, verbose=0)[0]
+        with stage("voice_features"):
+            features = compute_voice_features(audio, sr, n_mfcc=N_MFCC)
+
+        model, _ = get_voice_model()
+        with stage("voice_model"):
+            preds = model.predict(features["vector"].reshape(1, -1), verbose=0)[0]
 
-        print("📊 Model preds:", preds)
+        logger.debug("📊 Model preds: %s", preds)
 
-        emotion, confidence = steer_emotion(preds, audio, sr)
+        emotion, confidence = steer_emotion(
+            preds, audio, sr, features, session_id
+        )
 
-        print(f"🎯 Final voice emotion: {emotion}")
+        logger.debug("🎯 Final voice emotion: %s", emotion)
 
         return {
             "success": True,
             "emotion": emotion,
-            "confidence": confidence
+            "confidence": confidence,
+            **speech
         }
 
     except Exception as e:
-        print("❌ Voice emotion error:", e)
+        logger.error("❌ Voice emotion error: %s", e)
         return {
             "success": False,
             "emotion": "neutral",
             "confidence": 0.0
         }
+
+
+# ---------- STREAMING ----------
+def start_voice_stream(input_sr=TARGET_SR):
+    return VoiceStream(TARGET_SR, MIN_DURATION, input_sr=input_sr)
+
+
+def analyze_voice_snapshot(snapshot, session_id=None):
+    """Model + steering on a VoiceStream.snapshot() (rolling window)"""
+    try:
+        with stage("voice_features"):
+            features = stream_features(snapshot, N_MFCC)
+
+        model, _ = get_voice_model()
+        with stage("voice_model"):
+            preds = model.predict(features["vector"].reshape(1, -1), verbose=0)[0]
+
+        emotion, confidence = steer_emotion(
+            preds, snapshot["audio"], snapshot["sr"], features, session_id
+        )
+
+        return {
+            "success": True,
+            "emotion": emotion,
+            "confidence": confidence,
+            "seconds": snapshot["seconds"]
+        }
+
+    except Exception as e:
+        logger.error("❌ Voice stream error: %s", e)
+        return {
+            "success": False,
+            "emotion": "neutral",
+            "confidence": 0.0,
+            "seconds": snapshot.get("seconds", 0.0)
+        }
@@ -0,0 +1,140 @@
+"""
+Incremental voice emotion for streamed PCM.
+
+Audio arrives in small chunks. Every complete STFT frame (same 2048/512
+framing as emotion/features.py) is turned into its mel power, RMS and
+centroid exactly once and kept in fixed-size rolling buffers, so an
+update never re-decodes or re-transforms the whole clip.
+
+VoiceStream.push() is cheap and runs on the event loop; when an update
+is due, snapshot() hands a small picklable dict to analyze_snapshot(),
+which runs the model + steering on the inference pool.
+"""
+
+import os
+from collections import deque
+
+import numpy as np
+import scipy.fft
+
+from emotion.features import (
+    HOP_LENGTH,
+    N_FFT,
+    N_MELS,
+    _fft_freqs,
+    _hann,
+    _mel_basis,
+    feature_vector,
+    power_to_db,
+)
+
+STREAM_WINDOW_SECONDS = float(os.getenv("VOICE_STREAM_WINDOW", "4.0"))
+STREAM_HOP_SECONDS = float(os.getenv("VOICE_STREAM_HOP", "1.0"))
+
+
+class VoiceStream:
+    def __init__(self, sr, min_seconds, window_seconds=STREAM_WINDOW_SECONDS,
+                 hop_seconds=STREAM_HOP_SECONDS, input_sr=None):
+        self.sr = sr
+        self.input_sr = input_sr or sr
+        self.min_samples = int(min_seconds * sr)
+        self.window_samples = max(int(window_seconds * sr), self.min_samples)
+        self.hop_samples = max(1, int(hop_seconds * sr))
+
+        n_frames = 1 + self.window_samples // HOP_LENGTH
+        self._mel = deque(maxlen=n_frames)        # (N_MELS,) raw mel power
+        self._rms = deque(maxlen=n_frames)
+        self._centroid = deque(maxlen=n_frames)
+        self._peak = deque(maxlen=n_frames)       # per-hop |x| max
+
+        # Rolling raw audio for pitch; zero prefix = librosa center padding
+        self._audio = np.zeros(self.window_samples, np.float32)
+        self._audio_len = 0
+        self._pending = np.zeros(N_FFT // 2, np.float32)
+
+        self.total_samples = 0
+        self._next_update = self.min_samples
+
+    # ---------------- INGEST ----------------
+    def push(self, samples):
+        samples = np.asarray(samples, dtype=np.float32).ravel()
+        if samples.size == 0:
+            return
+
+        if self.input_sr != self.sr:
+            # Per-chunk polyphase resampling (tiny edge effects per chunk)
+            from math import gcd
+            from scipy.signal import resample_poly
+
+            g = gcd(int(self.input_sr), int(self.sr))
+            samples = resample_poly(
+                samples, int(self.sr) // g, int(self.input_sr) // g
+            ).astype(np.float32)
+
+        self.total_samples += samples.size
+        self._append_audio(samples)
+
+        buf = np.concatenate([self._pending, samples])
+        n_new = 0 if len(buf) < N_FFT else 1 + (len(buf) - N_FFT) // HOP_LENGTH
+
+        if n_new:
+            idx = np.arange(N_FFT)[None, :] + HOP_LENGTH * np.arange(n_new)[:, None]
+            self._add_frames(buf[idx])
+
+        self._pending = buf[n_new * HOP_LENGTH:]
+
+    def _append_audio(self, samples):
+        samples = samples[-self.window_samples:]
+        n = samples.size
+        self._audio = np.roll(self._audio, -n)
+        self._audio[-n:] = samples
+        self._audio_len = min(self._audio_len + n, self.window_samples)
+
+    def _add_frames(self, frames):
+        spectrum = scipy.fft.rfft(frames * _hann(N_FFT), axis=1)
+        magnitude = np.abs(spectrum)
+
+        mel = (magnitude ** 2) @ _mel_basis(self.sr, N_FFT, N_MELS).T
+        rms = np.sqrt(np.mean(frames ** 2, axis=1))
+
+        norm = magnitude.sum(axis=1)
+        norm[norm < np.finfo(np.float32).tiny] = 1.0
+        centroid = (magnitude @ _fft_freqs(self.sr, N_FFT)) / norm
+
+        hop_peak = np.abs(frames[:, -HOP_LENGTH:]).max(axis=1)
+
+        self._mel.extend(mel)
+        self._rms.extend(rms)
+        self._centroid.extend(centroid)
+        self._peak.extend(hop_peak)
+
+    # ---------------- UPDATES ----------------
+    def update_due(self):
+        return self.total_samples >= self._next_update and len(self._mel) > 0
+
+    def snapshot(self):
+        """Picklable state for analyze_snapshot(); schedules the next hop"""
+        self._next_update = self.total_samples + self.hop_samples
+
+        return {
+            "sr": self.sr,
+            "mel": np.stack(self._mel),
+            "rms": np.asarray(self._rms, np.float32),
+            "centroid": float(np.mean(self._centroid)),
+            "peak": float(max(self._peak)),
+            "audio": self._audio[-self._audio_len:].copy(),
+            "seconds": self.total_samples / self.sr,
+        }
+
+
+def stream_features(snapshot, n_mfcc):
+    """Same dict as compute_voice_features(), from rolling frame state"""
+    peak = snapshot["peak"] + 1e-6
+    mel = snapshot["mel"].T / np.float32(peak ** 2)
+    mfcc = scipy.fft.dct(power_to_db(mel), axis=0, type=2, norm="ortho")[:n_mfcc]
+
+    return {
+        "vector": feature_vector(mfcc),
+        "rms": snapshot["rms"],
+        "centroid": snapshot["centroid"],
+    }
@@ -0,0 +1,72 @@
+"""
+Exports the Keras .h5 models to the NumPy runtime format and checks
+that both backends agree.
+
+    python export_models.py            # export + parity check
+    INFERENCE_BACKEND=numpy uvicorn main:app
+"""
+
+import os
+import sys
+
+import numpy as np
+from keras.models import load_model
+
+from ml_model.backend import exported_path
+from ml_model.numpy_runtime import export_keras_model, load_numpy_model
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+MODELS = [
+    os.path.join(BASE_DIR, "model", "face_emotion_model.h5"),
+    os.path.join(BASE_DIR, "model", "vocalvibe_model.h5"),
+]
+
+PARITY_SAMPLES = 64
+PARITY_ATOL = 1e-4
+
+
+def check_parity(keras_model, numpy_model):
+    shape = (PARITY_SAMPLES,) + tuple(keras_model.input_shape[1:])
+    rng = np.random.default_rng(0)
+
+    # Face inputs are [0, 1] pixels, voice inputs are unbounded MFCC stats
+    if len(shape) == 4:
+        x = rng.random(shape, dtype=np.float32)
+    else:
+        x = rng.normal(0, 20, shape).astype("float32")
+
+    expected = keras_model.predict(x, verbose=0)
+    actual = numpy_model.predict(x)
+
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agree = float(np.mean(expected.argmax(1) == actual.argmax(1)))
+    return max_diff, agree
+
+
+def main():
+    ok = True
+
+    for h5_path in MODELS:
+        if not os.path.exists(h5_path):
+            print(f"⚠️ Skipping missing model: {h5_path}")
+            continue
+
+        out_path = exported_path(h5_path)
+        keras_model = load_model(h5_path, compile=False)
+        export_keras_model(keras_model, out_path)
+
+        max_diff, agree = check_parity(keras_model, load_numpy_model(out_path))
+        passed = max_diff <= PARITY_ATOL and agree == 1.0
+        ok = ok and passed
+
+        print(
+            f"{'✅' if passed else '❌'} {os.path.basename(out_path)}: "
+            f"max |Δ|={max_diff:.2e}, argmax agreement={agree:.2%}"
+        )
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
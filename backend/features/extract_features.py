@@ -0,0 +1,198 @@
+"""
+Voice training features: parallel extraction + content-addressed store.
+
+    X, y = load_data()          # (n, 4 * N_MFCC) float32, labels
+
+Every clip goes through voice_emotion.load_voiced_audio() (decode +
+silence trimming) and voice_emotion.extract_features(), the exact
+serving path, so training and inference vectors can't drift apart.
+
+Vectors are cached on disk under
+
+    <store>/<config>/<hh>/<content hash>.npy
+
+where <config> hashes TARGET_SR, N_MFCC and FEATURE_VERSION and the
+content hash is BLAKE2b of the audio file's bytes. A manifest maps
+(path, size, mtime) -> content hash, so unchanged files are neither
+re-read nor re-hashed; renamed or copied clips still hit the store by
+content. Only new or changed clips are extracted, on a process pool.
+
+Datasets are either RAVDESS (emotion code in the file name,
+03-01-05-...wav) or one folder per label.
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from emotion.audio_ingest import AUDIO_EXTS
+from emotion.features import FEATURE_VERSION
+from emotion.voice_emotion import (
+    N_MFCC,
+    TARGET_SR,
+    extract_features,
+    load_voiced_audio,
+)
+
+DATASET_PATH = os.getenv("VOICE_DATASET_PATH", "datasets/ravdess")
+FEATURE_STORE = os.getenv("VOICE_FEATURE_STORE", "datasets/cache/voice_features")
+
+# RAVDESS file names: modality-channel-EMOTION-intensity-...
+RAVDESS_EMOTIONS = {
+    "01": "neutral",
+    "02": "calm",
+    "03": "happy",
+    "04": "sad",
+    "05": "angry",
+    "06": "fearful",
+    "07": "disgust",
+    "08": "surprised"
+}
+
+
+# ---------------- DATASET ----------------
+def clip_label(path, dataset_path):
+    parts = os.path.basename(path).split("-")
+    if len(parts) == 7 and parts[2] in RAVDESS_EMOTIONS:
+        return RAVDESS_EMOTIONS[parts[2]]
+
+    # Folder-per-label layout: <dataset>/<label>/.../clip.wav
+    rel = os.path.relpath(path, dataset_path).split(os.sep)
+    return rel[0] if len(rel) > 1 else None
+
+
+def list_clips(dataset_path):
+    """Sorted [(path, label)] for every labelled clip under dataset_path"""
+    if not os.path.isdir(dataset_path):
+        raise FileNotFoundError(f"❌ Dataset not found: {dataset_path}")
+
+    clips = []
+    for root, dirs, files in os.walk(dataset_path):
+        dirs.sort()
+        for name in sorted(files):
+            if not name.lower().endswith(AUDIO_EXTS):
+                continue
+            path = os.path.join(root, name)
+            label = clip_label(path, dataset_path)
+            if label is not None:
+                clips.append((path, label))
+    return clips
+
+
+# ---------------- STORE ----------------
+def feature_config():
+    return {"target_sr": TARGET_SR, "n_mfcc": N_MFCC, "version": FEATURE_VERSION}
+
+
+def config_dir(store_dir):
+    key = hashlib.blake2b(
+        json.dumps(feature_config(), sort_keys=True).encode(), digest_size=8
+    ).hexdigest()
+    return os.path.join(store_dir, key)
+
+
+def vector_path(store, digest):
+    return os.path.join(store, digest[:2], digest + ".npy")
+
+
+def _save_vector(path, vector):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, vector)
+    os.replace(tmp, path)
+
+
+def _extract(args):
+    """Pool worker: (path, store) -> (path, content hash, vector or None)"""
+    path, store = args
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+    cached = vector_path(store, digest)
+    if os.path.exists(cached):
+        return path, digest, np.load(cached)
+
+    try:
+        audio, sr, vad = load_voiced_audio(data)
+        if vad["voiced_seconds"] == 0:
+            raise ValueError("no speech found")
+        vector = extract_features(audio, sr).astype(np.float32)
+    except Exception as e:
+        print(f"⚠️ Skipping {path}: {e}")
+        return path, digest, None
+
+    _save_vector(cached, vector)
+    return path, digest, vector
+
+
+def _load_manifest(store):
+    try:
+        with open(os.path.join(store, "manifest.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_manifest(store, manifest):
+    os.makedirs(store, exist_ok=True)
+    path = os.path.join(store, "manifest.json")
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f)
+    os.replace(path + ".tmp", path)
+
+
+# ---------------- PUBLIC ----------------
+def extract_dataset(clips, store_dir=FEATURE_STORE, workers=None):
+    """
+    [(path, label)] -> (X, y). Clips whose stat matches the manifest
+    and whose vector is stored are loaded directly; the rest are hashed
+    and extracted on a process pool. Unreadable clips are skipped.
+    """
+    store = config_dir(store_dir)
+    manifest = _load_manifest(store)
+
+    vectors, stamps = {}, {}
+    todo = []
+    for path, _ in clips:
+        st = os.stat(path)
+        stamp = stamps[path] = [st.st_size, st.st_mtime_ns]
+        entry = manifest.get(path)
+        if entry is not None and entry[:2] == stamp:
+            cached = vector_path(store, entry[2])
+            if os.path.exists(cached):
+                vectors[path] = np.load(cached)
+                continue
+        todo.append(path)
+
+    print(f"🎧 {len(clips)} clips: {len(clips) - len(todo)} cached, {len(todo)} to extract")
+
+    if todo:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(
+                _extract, [(p, store) for p in todo],
+                chunksize=max(1, len(todo) // (workers * 4))
+            )
+            for done, (path, digest, vector) in enumerate(results, 1):
+                manifest[path] = stamps[path] + [digest]
+                if vector is not None:
+                    vectors[path] = vector
+                if done % 200 == 0:
+                    print(f"   {done}/{len(todo)}")
+
+        _save_manifest(store, manifest)
+
+    kept = [(p, label) for p, label in clips if p in vectors]
+    X = np.array([vectors[p] for p, _ in kept], dtype=np.float32)
+    y = np.array([label for _, label in kept])
+    return X.reshape(len(kept), 4 * N_MFCC), y
+
+
+def load_data(dataset_path=DATASET_PATH, store_dir=FEATURE_STORE, workers=None):
+    """(X, y) for every labelled clip in dataset_path"""
+    return extract_dataset(list_clips(dataset_path), store_dir, workers)
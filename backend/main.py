@@ -1,21 +1,163 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import (
+    FastAPI, UploadFile, File, Header, HTTPException, WebSocket,
+    WebSocketDisconnect
+)
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+import asyncio
+import json
 import logging
+import os
+import time
+import uuid
+from typing import Optional
+
+import numpy as np
+from pydantic import BaseModel
 
-from emotion.face_emotion import detect_emotion
-from emotion.voice_emotion import detect_voice_emotion
-from emotion.emotion_fusion import fuse_emotions
-from recommender.spotify import get_spotify_recommendations
-from recommender.spotify_auth import get_access_token
+from emotion.face_emotion import (
+    detect_emotion_bytes,
+    detect_emotions_bytes,
+    upload_buffer,
+    start_camera_session,
+    analyze_camera_frame,
+)
+from emotion.voice_emotion import (
+    detect_voice_emotion_bytes,
+    start_voice_stream,
+    analyze_voice_snapshot,
+    TARGET_SR,
+)
+from emotion.audio_ingest import is_audio_type
+from emotion.inference_pool import (
+    run_inference,
+    get_executor,
+    shutdown_executor,
+    get_pool_stats,
+    warm_models,
+    models_loaded,
+    INFERENCE_EXECUTOR,
+    INFERENCE_WORKERS,
+    POOL_STATS,
+    InferenceBusy,
+    InferenceTimeout,
+)
+from emotion.emotion_fusion import fuse_emotions, fusion_mix
+from emotion.result_cache import (
+    cached_inference,
+    frame_phash,
+    phash_distance,
+    result_cache,
+    RESULT_CACHE_PHASH,
+    RESULT_CACHE_PHASH_DISTANCE,
+)
+from emotion.batch_jobs import (
+    start_job as start_batch_job,
+    get_job as get_batch_job,
+    BATCH_SIZE,
+    BATCH_WORKERS,
+)
+from emotion.session_state import (
+    delete_session,
+    get_session_store,
+    SESSION_STORE,
+)
+from recommender.spotify import (
+    get_spotify_recommendations_async,
+    warm_recommendation_cache_async,
+    get_cache_stats,
+    CACHE_STATS,
+)
+from recommender.spotify_auth import (
+    get_access_token_async,
+    get_token_stats,
+    TOKEN_STATS,
+)
+from recommender.track_index import (
+    get_index_stats,
+    INDEX_STATS,
+    get_track_index,
+    recommend_local,
+    recommend_tracks_async,
+    warm_track_index,
+)
+from recommender.http_client import close_async_client
+from metrics import (
+    REQUESTS,
+    REQUEST_SECONDS,
+    VOICE_TRIMMED,
+    finish_request_timings,
+    record,
+    render_metrics,
+    request_elapsed,
+    server_timing_header,
+    start_request_timings,
+)
+from emotion import face_emotion
 
 # ---------------- Logging Setup ----------------
+# LOG_LEVEL=DEBUG brings back the per-request model / Spotify details
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format="%(asctime)s - %(levelname)s - %(message)s"
 )
 
+# A request sending `X-Server-Timing: 1` (or ?server_timing=1) gets a
+# Server-Timing header with its per-stage durations (upload, face_detect,
+# voice_pitch, ...). SERVER_TIMING=0 ignores the opt-in entirely.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+
+# ---------------- Startup ----------------
+WARM_SPOTIFY_CACHE = os.getenv("SPOTIFY_WARM_CACHE", "1") == "1"
+# ML_ENABLED=0 -> recommender-only worker, models are never loaded
+ML_ENABLED = os.getenv("ML_ENABLED", "1") == "1"
+# WARM_MODELS=1 -> load models at startup instead of on first request
+WARM_MODELS = os.getenv("WARM_MODELS", "0") == "1"
+
+model_warmup = None
+
+
+async def warm_inference_models():
+    if INFERENCE_EXECUTOR == "process":
+        # Each worker loads its models in its initializer
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, warm_models)
+            for _ in range(INFERENCE_WORKERS)
+        ))
+    else:
+        await asyncio.to_thread(warm_models)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global model_warmup
+
+    if ML_ENABLED:
+        get_executor()
+        if WARM_MODELS:
+            model_warmup = asyncio.create_task(warm_inference_models())
+
+    # mmap + per-emotion candidate pools; no-op without a catalogue
+    await asyncio.to_thread(warm_track_index)
+
+    warmup = None
+    if WARM_SPOTIFY_CACHE and get_track_index() is None:
+        # Don't block startup on Spotify round trips
+        warmup = asyncio.create_task(warm_recommendation_cache_async())
+
+    yield
+
+    for task in (warmup, model_warmup):
+        if task is not None and not task.done():
+            task.cancel()
+    await close_async_client()
+    shutdown_executor()
+
 # ---------------- App Init ----------------
-app = FastAPI(title="Moodify-v2-Neuro Backend")
+app = FastAPI(title="Moodify-v2-Neuro Backend", lifespan=lifespan)
 
 # ---------------- CORS ----------------
 app.add_middleware(
@@ -26,33 +168,207 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ---------------- METRICS ----------------
+def wants_server_timing(request):
+    return (
+        request.headers.get("x-server-timing") == "1"
+        or request.query_params.get("server_timing") == "1"
+    )
+
+
+@app.middleware("http")
+async def observe_requests(request, call_next):
+    token = start_request_timings()
+    start = time.perf_counter()
+    status = 500
+
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        total = time.perf_counter() - start
+        entries = finish_request_timings(token)
+
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        REQUESTS.inc(endpoint=endpoint, outcome=str(status))
+        REQUEST_SECONDS.observe(total, endpoint=endpoint)
+
+    if SERVER_TIMING and wants_server_timing(request):
+        response.headers["Server-Timing"] = server_timing_header(entries, total)
+    return response
+
+
+def record_upload():
+    """Request body receive + multipart parsing + reading the files"""
+    elapsed = request_elapsed()
+    if elapsed is not None:
+        record("upload", elapsed)
+
+
+def record_voice_trim(result):
+    """Share of a voice upload the VAD dropped as silence -> /metrics"""
+    if "trimmed" in result:
+        VOICE_TRIMMED.observe(result["trimmed"])
+
+
+@app.get("/metrics")
+def prometheus_metrics():
+    # (prefix, stats, help, keys that are monotonic counters)
+    stats = [
+        ("moodify_spotify_cache", get_cache_stats(),
+         "Spotify recommendation cache", CACHE_STATS.keys()),
+        ("moodify_spotify_token", get_token_stats(),
+         "Spotify token cache", TOKEN_STATS.keys()),
+        ("moodify_track_index", get_index_stats(),
+         "Local track catalogue", INDEX_STATS.keys()),
+    ]
+    if ML_ENABLED:
+        stats.append((
+            "moodify_result_cache", result_cache.get_stats(),
+            "Inference result cache", result_cache.stats.keys()
+        ))
+        stats.append((
+            "moodify_inference_pool", get_pool_stats(),
+            "Inference pool", POOL_STATS.keys()
+        ))
+        if INFERENCE_EXECUTOR != "process":
+            stats.append((
+                "moodify_model_loaded", models_loaded(),
+                "1 once the model is loaded", ()
+            ))
+        if INFERENCE_EXECUTOR != "process" or SESSION_STORE != "memory":
+            store = get_session_store()
+            stats.append((
+                "moodify_voice_sessions", store.get_stats(),
+                "Voice steering session store", store.stats.keys()
+            ))
+        if face_emotion.face_batcher is not None:
+            stats.append((
+                "moodify_face_batcher", face_emotion.face_batcher.get_stats(),
+                "Face CNN micro-batcher", ("batches", "items")
+            ))
+
+    return PlainTextResponse(
+        render_metrics(stats),
+        media_type="text/plain; version=0.0.4"
+    )
+
+# ---------------- INFERENCE ----------------
+async def infer(fn, *args):
+    """Runs a model call on the inference pool with backpressure"""
+    if not ML_ENABLED:
+        raise HTTPException(
+            status_code=503,
+            detail="Emotion analysis is disabled on this worker"
+        )
+
+    try:
+        return await run_inference(fn, *args)
+    except InferenceBusy:
+        raise HTTPException(
+            status_code=429,
+            detail="Inference workers are busy, retry shortly",
+            headers={"Retry-After": "1"}
+        )
+    except InferenceTimeout:
+        raise HTTPException(
+            status_code=504,
+            detail="Inference timed out"
+        )
+
+async def infer_cached(kind, fn, data, *args, perceptual=False, client=None):
+    """
+    infer(fn, data, *args) behind the result cache: retries and
+    concurrent duplicates of the same upload (+ args) run once
+    """
+    return await cached_inference(
+        kind, data, lambda: infer(fn, data, *args), *args,
+        perceptual=perceptual, client=client
+    )
+
+async def read_image(image: UploadFile):
+    """Upload as a uint8 array for the face pipeline (picklable)"""
+    if getattr(image.file, "_rolled", True):
+        # Spooled to disk -> blocking read, keep it off the event loop
+        return await asyncio.to_thread(upload_buffer, image.file)
+    return upload_buffer(image.file)
+
+def session_key(session_id: Optional[str]):
+    """Client-supplied session id (X-Session-Id), capped in size"""
+    if not session_id:
+        return None
+    return session_id.strip()[:128] or None
+
 # ---------------- ROOT ----------------
 @app.get("/")
 def root():
     return {"status": "Moodify-v2-Neuro backend running 🚀"}
 
+# ---------------- READINESS ----------------
+@app.get("/ready")
+def ready():
+    if not ML_ENABLED:
+        return {"ready": True, "ml_enabled": False, "models": {}}
+
+    if INFERENCE_EXECUTOR == "process":
+        # Models live in the worker processes
+        loaded = model_warmup is not None and model_warmup.done()
+        models = {"workers_warm": loaded}
+    else:
+        models = models_loaded()
+
+    warming = model_warmup is not None and not model_warmup.done()
+    is_ready = not warming and (not WARM_MODELS or all(models.values()))
+
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={
+            "ready": is_ready,
+            "ml_enabled": True,
+            "warm_models": WARM_MODELS,
+            "models": models,
+            "inference_pool": get_pool_stats()
+        }
+    )
+
 # ---------------- SPOTIFY AUTH TEST ----------------
 @app.get("/spotify-test")
-def spotify_test():
-    token = get_access_token()
+async def spotify_test():
+    token = await get_access_token_async()
     return {
         "success": True,
         "message": "Spotify auth working ✅",
-        "token_length": len(token)
+        "token_length": len(token),
+        "token_cache": get_token_stats(),
+        "recommendation_cache": get_cache_stats()
     }
 
 # ======================================================
 # 🎭 FACE EMOTION + SONGS
 # ======================================================
 @app.post("/analyze-emotion")
-async def analyze_emotion(image: UploadFile = File(...)):
+async def analyze_emotion(
+    image: UploadFile = File(...),
+    multi: bool = False,
+    x_session_id: Optional[str] = Header(None)
+):
     if image.content_type not in ["image/jpeg", "image/png"]:
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported image format: {image.content_type}"
         )
 
-    result = detect_emotion(image)
+    image_bytes = await read_image(image)
+    record_upload()
+
+    if multi:
+        return await analyze_room_emotion(image_bytes, session_key(x_session_id))
+
+    result = await infer_cached(
+        "face", detect_emotion_bytes, image_bytes,
+        perceptual=True, client=session_key(x_session_id)
+    )
 
     if not result.get("success"):
         return {
@@ -60,7 +376,9 @@ async def analyze_emotion(image: UploadFile = File(...)):
             "message": "Face not detected"
         }
 
-    songs = get_spotify_recommendations(result["emotion"])
+    songs = await recommend_tracks_async(
+        result["emotion"], user_id=session_key(x_session_id)
+    )
 
     logging.info(
         f"FACE emotion: {result['emotion']} "
@@ -75,18 +393,166 @@ async def analyze_emotion(image: UploadFile = File(...)):
         "songs": songs
     }
 
+
+async def analyze_room_emotion(image_bytes: bytes, user_id: Optional[str] = None):
+    """?multi=true: every face in one batch, songs for the room mood"""
+    result = await infer_cached(
+        "faces", detect_emotions_bytes, image_bytes,
+        perceptual=True, client=user_id
+    )
+
+    if not result.get("success"):
+        return {
+            "success": False,
+            "message": "Face not detected"
+        }
+
+    room = result["room"]
+    songs = await recommend_tracks_async(room["emotion"], user_id=user_id)
+
+    logging.info(
+        f"ROOM emotion: {room['emotion']} "
+        f"(confidence={room['confidence']:.2f}, faces={len(result['faces'])})"
+    )
+
+    return {
+        "success": True,
+        "source": "room",
+        "emotion": room["emotion"],
+        "confidence": room["confidence"],
+        "face_count": len(result["faces"]),
+        "faces": result["faces"],
+        "songs": songs
+    }
+
+# ======================================================
+# 📹 STREAMING CAMERA EMOTION (WEBSOCKET)
+# ======================================================
+# client -> binary JPEG/PNG frames, as fast as it likes
+# server -> {"type": "emotion", success, emotion, confidence, box,
+#            detector_ran, dropped} for the newest frame only; frames
+#            that arrive while one is being analyzed replace each other
+#            (+ "reused": true when a duplicate frame was skipped)
+#
+# With RESULT_CACHE_PHASH=1, a still camera's repeated picture is not
+# re-analyzed: a frame whose perceptual hash matches the last analyzed
+# one on this socket reuses its result, up to CAMERA_MAX_REUSE times in
+# a row so the tracker (and expression changes) still get fresh frames
+CAMERA_MAX_REUSE = int(os.getenv("CAMERA_MAX_REUSE", "5"))
+
+
+@app.websocket("/ws/camera")
+async def camera_stream(websocket: WebSocket):
+    await websocket.accept()
+
+    if not ML_ENABLED:
+        await websocket.close(code=1013)
+        return
+
+    tracker = start_camera_session()
+    latest = {"frame": None, "dropped": 0, "closed": False}
+    previous = {"phash": None, "result": None, "reused": 0}
+    frame_ready = asyncio.Event()
+
+    async def receive_frames():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+
+                data = message.get("bytes")
+                if not data:
+                    continue
+
+                # Server is behind -> the unprocessed frame is stale
+                if latest["frame"] is not None:
+                    latest["dropped"] += 1
+                latest["frame"] = data
+                frame_ready.set()
+        finally:
+            latest["closed"] = True
+            frame_ready.set()
+
+    receiver = asyncio.create_task(receive_frames())
+
+    try:
+        while True:
+            await frame_ready.wait()
+            frame_ready.clear()
+            if latest["closed"]:
+                break
+
+            data, latest["frame"] = latest["frame"], None
+            if data is None:
+                continue
+            dropped, latest["dropped"] = latest["dropped"], 0
+
+            phash = None
+            if RESULT_CACHE_PHASH:
+                phash = await asyncio.to_thread(frame_phash, data)
+                if (
+                    phash is not None
+                    and previous["phash"] is not None
+                    and previous["reused"] < CAMERA_MAX_REUSE
+                    and phash_distance(phash, previous["phash"])
+                    <= RESULT_CACHE_PHASH_DISTANCE
+                ):
+                    previous["reused"] += 1
+                    await websocket.send_json({
+                        "type": "emotion",
+                        **previous["result"],
+                        "detector_ran": False,
+                        "dropped": dropped,
+                        "reused": True
+                    })
+                    continue
+
+            try:
+                result = await run_inference(
+                    analyze_camera_frame, tracker, data, local=True
+                )
+            except InferenceBusy:
+                await websocket.send_json({"type": "busy"})
+                continue
+            except InferenceTimeout:
+                await websocket.send_json(
+                    {"type": "error", "detail": "Inference timed out"}
+                )
+                continue
+
+            previous.update(phash=phash, result=result, reused=0)
+            await websocket.send_json(
+                {"type": "emotion", **result, "dropped": dropped}
+            )
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
 # ======================================================
 # 🎤 VOICE EMOTION + SONGS
 # ======================================================
 @app.post("/analyze-voice")
-async def analyze_voice(audio: UploadFile = File(...)):
-    if not audio.content_type.startswith("audio/"):
+async def analyze_voice(
+    audio: UploadFile = File(...),
+    x_session_id: Optional[str] = Header(None)
+):
+    if not is_audio_type(audio.content_type):
         raise HTTPException(
             status_code=400,
             detail=f"Unsupported audio format: {audio.content_type}"
         )
 
-    result = detect_voice_emotion(audio)
+    audio_bytes = await audio.read()
+    record_upload()
+
+    # Keyed on the session too: the result depends on its steering state
+    result = await infer_cached(
+        "voice", detect_voice_emotion_bytes, audio_bytes, session_key(x_session_id)
+    )
+    record_voice_trim(result)
 
     if not result.get("success"):
         return {
@@ -94,7 +560,9 @@ async def analyze_voice(audio: UploadFile = File(...)):
             "message": "Voice emotion detection failed"
         }
 
-    songs = get_spotify_recommendations(result["emotion"])
+    songs = await recommend_tracks_async(
+        result["emotion"], user_id=session_key(x_session_id)
+    )
 
     logging.info(
         f"VOICE emotion: {result['emotion']} "
@@ -106,35 +574,215 @@ async def analyze_voice(audio: UploadFile = File(...)):
         "source": "voice",
         "emotion": result["emotion"],
         "confidence": result["confidence"],
+        "trimmed": result["trimmed"],
         "songs": songs
     }
 
+# ======================================================
+# 🎙️ STREAMING VOICE EMOTION (WEBSOCKET)
+# ======================================================
+# Protocol:
+#   client -> text   {"sample_rate": 22050, "format": "f32" | "s16"}  (optional)
+#   client -> binary mono PCM chunks (little endian)
+#   client -> text   {"event": "end"}  -> final update, then close
+#   ?session_id=...  keeps steering state across connections; without
+#                    it the connection gets its own short-lived session
+#   server -> text   {"type": "emotion", success, emotion, confidence, seconds}
+#                    {"type": "busy"} | {"type": "error", "detail": ...}
+def parse_voice_control(text):
+    """
+    JSON control frame -> dict with a validated sample_rate / format.
+    Raises ValueError / TypeError on anything malformed.
+    """
+    control = json.loads(text)
+    if not isinstance(control, dict):
+        raise TypeError("expected a JSON object")
+
+    if control.get("event") != "end":
+        sample_rate = int(control.get("sample_rate", TARGET_SR))
+        if sample_rate <= 0:
+            raise ValueError(f"sample_rate must be positive, got {sample_rate}")
+        sample_format = control.get("format", "f32")
+        if sample_format not in ("f32", "s16"):
+            raise ValueError(f"unknown format {sample_format!r}")
+        control["sample_rate"], control["format"] = sample_rate, sample_format
+
+    return control
+
+
+async def drop_voice_session(session_id):
+    """Deletes an ephemeral stream's steering state when it disconnects"""
+    if INFERENCE_EXECUTOR == "process" and SESSION_STORE == "memory":
+        # The state lives in the worker processes' own stores. One delete
+        # per worker; any worker that misses it drops the entry after
+        # SESSION_TTL like any idle session.
+        loop = asyncio.get_running_loop()
+        executor = get_executor()
+        await asyncio.gather(*(
+            loop.run_in_executor(executor, delete_session, session_id)
+            for _ in range(INFERENCE_WORKERS)
+        ), return_exceptions=True)
+    else:
+        # Redis delete is a network round trip
+        await asyncio.to_thread(delete_session, session_id)
+
+
+@app.websocket("/ws/voice")
+async def voice_stream(websocket: WebSocket):
+    await websocket.accept()
+
+    if not ML_ENABLED:
+        await websocket.close(code=1013)
+        return
+
+    stream = start_voice_stream()
+    sample_format = "f32"
+    analysis = None
+
+    session_id = session_key(websocket.query_params.get("session_id"))
+    ephemeral = session_id is None
+    if ephemeral:
+        session_id = uuid.uuid4().hex
+
+    async def analyze(snapshot):
+        try:
+            result = await run_inference(
+                analyze_voice_snapshot, snapshot, session_id
+            )
+            await websocket.send_json({"type": "emotion", **result})
+        except InferenceBusy:
+            await websocket.send_json({"type": "busy"})
+        except InferenceTimeout:
+            await websocket.send_json(
+                {"type": "error", "detail": "Inference timed out"}
+            )
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("text"):
+                try:
+                    control = parse_voice_control(message["text"])
+                except (ValueError, TypeError) as e:
+                    await websocket.send_json(
+                        {"type": "error", "detail": f"Invalid control message: {e}"}
+                    )
+                    continue
+
+                if control.get("event") == "end":
+                    if analysis is not None:
+                        await analysis
+                    if stream.total_samples >= stream.min_samples:
+                        await analyze(stream.snapshot())
+                    await websocket.close()
+                    break
+
+                stream = start_voice_stream(control["sample_rate"])
+                sample_format = control["format"]
+                continue
+
+            data = message.get("bytes")
+            if not data:
+                continue
+
+            if sample_format == "s16":
+                samples = np.frombuffer(
+                    data, dtype="<i2", count=len(data) // 2
+                ).astype(np.float32) / 32768.0
+            else:
+                samples = np.frombuffer(data, dtype="<f4", count=len(data) // 4)
+
+            stream.push(samples)
+
+            # One analysis in flight per stream; later hops catch up
+            if stream.update_due() and (analysis is None or analysis.done()):
+                analysis = asyncio.create_task(analyze(stream.snapshot()))
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        if analysis is not None and not analysis.done():
+            analysis.cancel()
+        if ephemeral:
+            await drop_voice_session(session_id)
+
 # ======================================================
 # 🔥 FUSED EMOTION + SONGS (OPTIONAL)
 # ======================================================
+def prefetch_songs(prefetch, emotion):
+    """Shared Spotify lookup task per emotion label"""
+    task = prefetch.get(emotion)
+    if task is None:
+        task = asyncio.create_task(get_spotify_recommendations_async(emotion))
+        prefetch[emotion] = task
+    return task
+
+
+def release_prefetch(prefetch):
+    # Unused speculative lookups still fill the cache; just make sure
+    # their failures are not reported as "never retrieved"
+    for task in prefetch.values():
+        task.add_done_callback(
+            lambda t: t.cancelled() or t.exception()
+        )
+
+
+async def infer_and_prefetch(prefetch, kind, fn, *args):
+    result = await infer_cached(kind, fn, *args)
+    # With a local catalogue songs take microseconds; only prefetch
+    # when Spotify is where they will come from
+    if result.get("success") and get_track_index() is None:
+        prefetch_songs(prefetch, result["emotion"])
+    return result
+
+
 @app.post("/analyze-fused-emotion")
 async def analyze_fused_emotion(
     image: UploadFile = File(...),
-    audio: UploadFile = File(...)
+    audio: UploadFile = File(...),
+    x_session_id: Optional[str] = Header(None)
 ):
     if image.content_type not in ["image/jpeg", "image/png"]:
         raise HTTPException(status_code=400, detail="Invalid image format")
 
-    if not audio.content_type.startswith("audio/"):
+    if not is_audio_type(audio.content_type):
         raise HTTPException(status_code=400, detail="Invalid audio format")
 
-    # Reset file pointers
-    image.file.seek(0)
-    audio.file.seek(0)
+    image_bytes = await read_image(image)
+    audio_bytes = await audio.read()
+    record_upload()
 
-    face_result = detect_emotion(image)
-
-    audio.file.seek(0)
-    voice_result = detect_voice_emotion(audio)
+    # Face and voice run side by side on the pool; each one starts the
+    # Spotify lookup for its own label as soon as it finishes, so the
+    # fused label's songs are usually ready (or in flight) by the time
+    # fuse_emotions decides
+    prefetch = {}
+    try:
+        face_result, voice_result = await asyncio.gather(
+            infer_and_prefetch(prefetch, "face", detect_emotion_bytes, image_bytes),
+            infer_and_prefetch(
+                prefetch, "voice", detect_voice_emotion_bytes, audio_bytes,
+                session_key(x_session_id)
+            )
+        )
 
-    fused = fuse_emotions(face_result, voice_result)
+        record_voice_trim(voice_result)
+        fused = fuse_emotions(face_result, voice_result)
 
-    songs = get_spotify_recommendations(fused["emotion"])
+        # Catalogue: nearest tracks to the confidence-weighted blend of
+        # both moods. Miss -> Spotify search for the fused label
+        songs = recommend_local(
+            fused["emotion"],
+            user_id=session_key(x_session_id),
+            mix=fusion_mix(face_result, voice_result)
+        )
+        if songs is None:
+            songs = await prefetch_songs(prefetch, fused["emotion"])
+    finally:
+        release_prefetch(prefetch)
 
     logging.info(
         f"FUSED emotion: {fused['emotion']} "
@@ -153,9 +801,14 @@ async def analyze_fused_emotion(
 # 🎵 DIRECT MUSIC REQUEST (MANUAL)
 # ======================================================
 @app.get("/recommend")
-def recommend_music(emotion: str = "neutral"):
+async def recommend_music(
+    emotion: str = "neutral",
+    x_session_id: Optional[str] = Header(None)
+):
     try:
-        tracks = get_spotify_recommendations(emotion)
+        tracks = await recommend_tracks_async(
+            emotion, user_id=session_key(x_session_id)
+        )
         return {
             "success": True,
             "emotion": emotion,
@@ -167,3 +820,73 @@ def recommend_music(emotion: str = "neutral"):
             status_code=500,
             detail="Spotify recommendation failed"
         )
+
+# ======================================================
+# 📦 BATCH JOBS (OFFLINE BULK ANALYSIS)
+# ======================================================
+# BATCH_ROOT=/data/media enables the API; sources and outputs must live
+# under it. Unset -> 503 (use batch_analyze.py from a shell instead).
+BATCH_ROOT = os.getenv("BATCH_ROOT")
+
+
+class BatchJobRequest(BaseModel):
+    source: str
+    output: str
+    format: Optional[str] = None
+    kind: str = "all"
+    workers: int = BATCH_WORKERS
+    batch_size: int = BATCH_SIZE
+
+
+def batch_path(path: str):
+    """Relative path under BATCH_ROOT; refuses anything that escapes it"""
+    root = os.path.realpath(BATCH_ROOT)
+    full = os.path.realpath(os.path.join(root, path))
+    if os.path.commonpath([root, full]) != root:
+        raise HTTPException(status_code=400, detail=f"Path outside BATCH_ROOT: {path}")
+    return full
+
+
+@app.post("/batch-jobs")
+def create_batch_job(body: BatchJobRequest):
+    if not ML_ENABLED or not BATCH_ROOT:
+        raise HTTPException(
+            status_code=503,
+            detail="Batch jobs are disabled on this worker"
+        )
+    if body.kind not in ("all", "image", "audio"):
+        raise HTTPException(status_code=400, detail=f"Unknown kind: {body.kind}")
+    if body.format not in (None, "jsonl", "parquet"):
+        raise HTTPException(status_code=400, detail=f"Unknown format: {body.format}")
+
+    source = batch_path(body.source)
+    if not os.path.exists(source):
+        raise HTTPException(status_code=404, detail=f"No such source: {body.source}")
+
+    job = start_batch_job(
+        source,
+        batch_path(body.output),
+        fmt=body.format,
+        workers=min(max(1, body.workers), BATCH_WORKERS),
+        batch_size=min(max(1, body.batch_size), 4 * BATCH_SIZE),
+        kinds=("image", "audio") if body.kind == "all" else (body.kind,)
+    )
+    logging.info(f"📦 Batch job {job.id} started: {body.source} → {body.output}")
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@app.get("/batch-jobs/{job_id}")
+def batch_job_status(job_id: str):
+    job = get_batch_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    return job.to_dict()
+
+
+@app.delete("/batch-jobs/{job_id}")
+def cancel_batch_job(job_id: str):
+    job = get_batch_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown batch job")
+    job.cancel()
+    return job.to_dict()
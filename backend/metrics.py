@@ -0,0 +1,246 @@
+"""
+Per-stage latency histograms and request counters, rendered in the
+Prometheus text exposition format for GET /metrics.
+
+    with stage("face_detect"):
+        ...
+
+records the duration into moodify_stage_seconds{stage="face_detect"}
+and, when a request is being traced, into that request's timing list
+(used for the optional Server-Timing header).
+
+Work submitted to the inference pool runs under call_with_timings(),
+which collects its stage timings instead of observing them and hands
+them back with the result. The caller records them, so process workers
+report into the parent's histograms and the request's Server-Timing.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Seconds; covers sub-ms numpy steps up to slow Spotify calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+class _Timings:
+    def __init__(self, defer=False):
+        self.entries = []      # [(stage, seconds)]
+        self.defer = defer     # True inside pool calls: parent observes
+        self.started = time.perf_counter()
+
+
+_timings = ContextVar("moodify_timings", default=None)
+
+
+def _escape(value):
+    return (
+        str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    )
+
+
+def _format_labels(labels):
+    labels = list(labels)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text, label_names=()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0, **labels):
+        key = tuple(labels[n] for n in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            labels = _format_labels(zip(self.label_names, key))
+            lines.append(f"{self.name}{labels} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, label_names=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}      # labels -> [bucket counts..., sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels[n] for n in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help}",
+            f"# TYPE {self.name} histogram"
+        ]
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+
+        for key, series in items:
+            base = list(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                labels = _format_labels(base + [("le", f"{bound:g}")])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(base + [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(base)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_format_labels(base)} {series[-1]}")
+        return lines
+
+
+STAGE_SECONDS = Histogram(
+    "moodify_stage_seconds",
+    "Time spent per pipeline stage",
+    ("stage",)
+)
+REQUEST_SECONDS = Histogram(
+    "moodify_request_seconds",
+    "HTTP request latency by endpoint",
+    ("endpoint",)
+)
+REQUESTS = Counter(
+    "moodify_requests_total",
+    "HTTP requests by endpoint and outcome",
+    ("endpoint", "outcome")
+)
+VOICE_TRIMMED = Histogram(
+    "moodify_voice_trimmed_ratio",
+    "Fraction of each voice upload trimmed as silence",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+)
+
+
+# ---------------- STAGE TIMERS ----------------
+def record(name, seconds):
+    timings = _timings.get()
+    if timings is None or not timings.defer:
+        STAGE_SECONDS.observe(seconds, stage=name)
+    if timings is not None:
+        timings.entries.append((name, seconds))
+
+
+@contextmanager
+def stage(name):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def call_with_timings(fn, *args):
+    """Runs fn(*args) in a pool worker -> (result, [(stage, seconds)])"""
+    token = _timings.set(_Timings(defer=True))
+    try:
+        result = fn(*args)
+        return result, _timings.get().entries
+    finally:
+        _timings.reset(token)
+
+
+def record_all(entries):
+    for name, seconds in entries:
+        record(name, seconds)
+
+
+# ---------------- REQUEST TRACE ----------------
+def start_request_timings():
+    """Begins collecting stage timings for the current request"""
+    return _timings.set(_Timings())
+
+
+def request_elapsed():
+    """Seconds since start_request_timings(), or None outside a request"""
+    timings = _timings.get()
+    if timings is None:
+        return None
+    return time.perf_counter() - timings.started
+
+
+def finish_request_timings(token):
+    """Stops collecting -> [(stage, seconds)] in call order"""
+    entries = _timings.get().entries
+    _timings.reset(token)
+    return entries
+
+
+def server_timing_header(entries, total=None):
+    """Server-Timing value; repeated stages are summed"""
+    merged = {}
+    for name, seconds in entries:
+        merged[name] = merged.get(name, 0.0) + seconds
+
+    parts = [f"{name};dur={seconds * 1000.0:.2f}" for name, seconds in merged.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000.0:.2f}")
+    return ", ".join(parts)
+
+
+# ---------------- EXPOSITION ----------------
+def _metric_name(*parts):
+    return "_".join(p.replace("-", "_").replace(".", "_") for p in parts if p)
+
+
+def render_stats(prefix, values, help_text, counters=()):
+    """
+    Flat dict of numbers (e.g. get_cache_stats()) -> exposition lines.
+
+    Keys in `counters` only ever go up (hits, misses, rejected, ...) and
+    are exported as counters with a _total suffix, so rate() works and
+    restarts are detected; everything else is a gauge.
+    """
+    lines = []
+    for key, value in values.items():
+        if isinstance(value, bool):
+            value = int(value)
+        if not isinstance(value, (int, float)):
+            continue
+        if key in counters:
+            name, kind = _metric_name(prefix, key, "total"), "counter"
+        else:
+            name, kind = _metric_name(prefix, key), "gauge"
+        lines += [
+            f"# HELP {name} {help_text}",
+            f"# TYPE {name} {kind}",
+            f"{name} {value:g}"
+        ]
+    return lines
+
+
+def render_metrics(stats=()):
+    """stats: iterable of (prefix, dict, help, counter keys) -> Prometheus text"""
+    lines = []
+    for metric in (REQUESTS, REQUEST_SECONDS, STAGE_SECONDS, VOICE_TRIMMED):
+        lines += metric.render()
+    for prefix, values, help_text, counters in stats:
+        lines += render_stats(prefix, values, help_text, counters)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,31 @@
+import os
+
+# keras  -> load the .h5 with TensorFlow/Keras
+# numpy  -> load the exported .npz (see export_models.py), no TF import
+# tflite -> load the quantized .tflite (see quantize_models.py)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "keras")
+# int8 | float16, which quantize_models.py variant the tflite backend loads
+INFERENCE_QUANT = os.getenv("INFERENCE_QUANT", "int8")
+TFLITE_THREADS = int(os.getenv("TFLITE_THREADS", "1"))
+
+
+def exported_path(h5_path):
+    return os.path.splitext(h5_path)[0] + ".npz"
+
+
+def quantized_path(h5_path, mode=INFERENCE_QUANT):
+    return f"{os.path.splitext(h5_path)[0]}.{mode}.tflite"
+
+
+def load_inference_model(h5_path):
+    """Returns an object with Keras-style predict(x, verbose=0)"""
+    if INFERENCE_BACKEND == "numpy":
+        from ml_model.numpy_runtime import load_numpy_model
+        return load_numpy_model(exported_path(h5_path))
+
+    if INFERENCE_BACKEND == "tflite":
+        from ml_model.tflite_runtime import load_tflite_model
+        return load_tflite_model(quantized_path(h5_path), TFLITE_THREADS)
+
+    from keras.models import load_model
+    return load_model(h5_path, compile=False)
@@ -0,0 +1,271 @@
+"""
+FER-style image folders -> sharded uint8 cache -> streaming tf.data.
+
+    cache = build_face_cache("datasets/fer2013/train", EMOTIONS, CACHE_DIR)
+    train_idx, val_idx = cache.split(0.2, seed=42)
+    train_ds = make_dataset(cache, train_idx, 64, shuffle=True, augment=True)
+
+build_face_cache() decodes + resizes every image once, in parallel, into
+shard-NNNNN.npy files (rows in a fixed, seeded random order, so every
+shard holds a mix of all classes rather than one folder's worth) of (n, size, size) uint8 and matching int16 label
+files, written through np.lib.format.open_memmap so memory stays at one
+chunk per thread. The cache records a fingerprint of the source tree
+(paths, sizes, mtimes) and is rebuilt only when that changes.
+
+Training reads the shards memory-mapped: 1 byte per pixel on disk and
+in the page cache, float32 only per batch inside the tf.data map.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# 2: rows are globally permuted before sharding
+CACHE_VERSION = 2
+SHARD_SIZE = 8192
+SHARD_SEED = 0
+DECODE_CHUNK = 256
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+# ---------------- SOURCE ----------------
+def list_images(dataset_path, emotions):
+    """Sorted [(path, emotion)] for every image in dataset_path/<emotion>/"""
+    files = []
+    for emotion in emotions:
+        folder = os.path.join(dataset_path, emotion)
+        if not os.path.exists(folder):
+            raise FileNotFoundError(f"❌ Folder not found: {folder}")
+
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(IMAGE_EXTS):
+                files.append((os.path.join(folder, name), emotion))
+    return files
+
+
+def source_fingerprint(files, img_size, classes, seed=SHARD_SEED):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(json.dumps([CACHE_VERSION, img_size, classes, seed]).encode())
+    for path, emotion in files:
+        st = os.stat(path)
+        h.update(f"{path}\0{emotion}\0{st.st_size}\0{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+# ---------------- BUILD ----------------
+def _decode_chunk(paths, out, img_size):
+    """Decodes paths into out[i]; returns a bool mask of readable images"""
+    ok = np.zeros(len(paths), dtype=bool)
+    for i, path in enumerate(paths):
+        img = cv2.imread(path, cv2.IMREAD_GRAYSCALE)
+        if img is None:
+            continue
+        if img.shape != (img_size, img_size):
+            img = cv2.resize(img, (img_size, img_size))
+        out[i] = img
+        ok[i] = True
+    return ok
+
+
+def build_face_cache(dataset_path, emotions, cache_dir, img_size=64,
+                     shard_size=SHARD_SIZE, workers=None, seed=SHARD_SEED):
+    """Returns the FaceCache for dataset_path, (re)building it if stale"""
+    classes = sorted(emotions)
+    files = list_images(dataset_path, emotions)
+    fingerprint = source_fingerprint(files, img_size, classes, seed)
+
+    try:
+        cache = FaceCache(cache_dir)
+        if cache.fingerprint == fingerprint:
+            print(f"✅ Using cached dataset: {cache_dir} ({cache.count} images)")
+            return cache
+    except (FileNotFoundError, ValueError, KeyError):
+        pass
+
+    print(f"🧱 Building dataset cache: {len(files)} images → {cache_dir}")
+    workers = workers or os.cpu_count() or 1
+    label_of = {c: i for i, c in enumerate(classes)}
+
+    # list_images() is sorted by class; batches() only shuffles within a
+    # shard, so without this each batch would hold one or two classes
+    order = np.random.default_rng(seed).permutation(len(files))
+    files = [files[i] for i in order]
+
+    tmp_dir = cache_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    shards = []
+    # cv2.imread / resize release the GIL, so threads use every core
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for start in range(0, len(files), shard_size):
+            part = files[start:start + shard_size]
+            name = f"shard-{len(shards):05d}"
+
+            images = np.lib.format.open_memmap(
+                os.path.join(tmp_dir, name + ".npy"), mode="w+",
+                dtype=np.uint8, shape=(len(part), img_size, img_size)
+            )
+            futures = [
+                pool.submit(
+                    _decode_chunk,
+                    [p for p, _ in part[i:i + DECODE_CHUNK]],
+                    images[i:i + DECODE_CHUNK],
+                    img_size
+                )
+                for i in range(0, len(part), DECODE_CHUNK)
+            ]
+            valid = np.concatenate([f.result() for f in futures])
+            images.flush()
+            del images
+
+            # Unreadable files keep their slot, labelled -1 and never served
+            labels = np.array([label_of[e] for _, e in part], dtype=np.int16)
+            labels[~valid] = -1
+            np.save(os.path.join(tmp_dir, name + "-labels.npy"), labels)
+
+            shards.append({"name": name, "count": len(part)})
+            print(f"   {start + len(part)}/{len(files)}")
+
+    with open(os.path.join(tmp_dir, "index.json"), "w") as f:
+        json.dump({
+            "version": CACHE_VERSION,
+            "img_size": img_size,
+            "classes": classes,
+            "fingerprint": fingerprint,
+            "shards": shards
+        }, f)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    return FaceCache(cache_dir)
+
+
+# ---------------- READ ----------------
+class FaceCache:
+    def __init__(self, cache_dir):
+        with open(os.path.join(cache_dir, "index.json")) as f:
+            index = json.load(f)
+        if index["version"] != CACHE_VERSION:
+            raise ValueError(f"Unsupported dataset cache version: {index['version']}")
+
+        self.cache_dir = cache_dir
+        self.img_size = index["img_size"]
+        self.classes = np.array(index["classes"])
+        self.fingerprint = index["fingerprint"]
+
+        self.shards = [
+            np.load(os.path.join(cache_dir, s["name"] + ".npy"), mmap_mode="r")
+            for s in index["shards"]
+        ]
+        self.labels = np.concatenate([
+            np.load(os.path.join(cache_dir, s["name"] + "-labels.npy"))
+            for s in index["shards"]
+        ]) if index["shards"] else np.zeros(0, np.int16)
+
+        # Global row -> (shard, row in shard)
+        sizes = [len(s) for s in self.shards]
+        self.offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        self.count = int(np.sum(self.labels >= 0))
+
+    def valid_indices(self):
+        return np.flatnonzero(self.labels >= 0)
+
+    def split(self, test_size=0.2, seed=42):
+        """Stratified (train, val) global indices"""
+        from sklearn.model_selection import train_test_split
+
+        idx = self.valid_indices()
+        return train_test_split(
+            idx, test_size=test_size, random_state=seed, stratify=self.labels[idx]
+        )
+
+    def batches(self, indices, batch_size, shuffle=False, seed=None):
+        """
+        Yields (uint8 images (b, size, size, 1), int labels) batches.
+        Shuffled epochs visit shards in random order and rows in random
+        order within each shard, so reads stay local to one memory-mapped
+        file at a time even when the cache is larger than RAM.
+        """
+        rng = np.random.default_rng(seed)
+        indices = np.sort(np.asarray(indices))
+        shard_of = np.searchsorted(self.offsets, indices, side="right") - 1
+
+        order = list(range(len(self.shards)))
+        if shuffle:
+            rng.shuffle(order)
+
+        pending_x, pending_y = [], []
+        for shard in order:
+            rows = indices[shard_of == shard] - self.offsets[shard]
+            if shuffle:
+                rng.shuffle(rows)
+
+            for start in range(0, len(rows), batch_size):
+                # Sorted for sequential reads; order inside a batch is moot
+                chunk = np.sort(rows[start:start + batch_size])
+                pending_x.append(self.shards[shard][chunk])
+                pending_y.append(self.labels[chunk + self.offsets[shard]])
+
+                if sum(len(y) for y in pending_y) >= batch_size:
+                    x, y = np.concatenate(pending_x), np.concatenate(pending_y)
+                    yield x[:batch_size, ..., None], y[:batch_size]
+                    pending_x, pending_y = [x[batch_size:]], [y[batch_size:]]
+
+        if pending_y and sum(len(y) for y in pending_y):
+            yield np.concatenate(pending_x)[..., None], np.concatenate(pending_y)
+
+
+# ---------------- STREAM ----------------
+def make_dataset(cache, indices, batch_size, shuffle=False, augment=False,
+                 seed=None):
+    """
+    tf.data pipeline over cache.batches(): uint8 batches from the
+    memory-mapped shards, normalized (and augmented) in a parallel map,
+    prefetched while the previous batch trains. A fresh shuffle per
+    epoch comes from re-running the generator.
+    """
+    import tensorflow as tf
+
+    size = cache.img_size
+    n_classes = len(cache.classes)
+    epoch = [0]
+
+    def generate():
+        epoch[0] += 1
+        yield from cache.batches(
+            indices, batch_size, shuffle=shuffle,
+            seed=None if seed is None else seed + epoch[0]
+        )
+
+    ds = tf.data.Dataset.from_generator(
+        generate,
+        output_signature=(
+            tf.TensorSpec((None, size, size, 1), tf.uint8),
+            tf.TensorSpec((None,), tf.int16),
+        )
+    )
+
+    def prepare(x, y):
+        x = tf.cast(x, tf.float32) / 255.0
+        if augment:
+            x = tf.image.random_flip_left_right(x)
+            # Up to ±10% brightness / contrast jitter, drawn per image:
+            # tf.image.random_brightness / random_contrast would draw one
+            # value for the whole batch
+            shape = (tf.shape(x)[0], 1, 1, 1)
+            x = x + tf.random.uniform(shape, -0.1, 0.1)
+            mean = tf.reduce_mean(x, axis=(1, 2), keepdims=True)
+            x = (x - mean) * tf.random.uniform(shape, 0.9, 1.1) + mean
+            x = tf.clip_by_value(x, 0.0, 1.0)
+        return x, tf.one_hot(tf.cast(y, tf.int32), n_classes)
+
+    return (
+        ds.map(prepare, num_parallel_calls=tf.data.AUTOTUNE)
+        .prefetch(tf.data.AUTOTUNE)
+    )
@@ -1,13 +1,44 @@
+import logging
 import os
-from keras.models import load_model
+import threading
 import numpy as np
 
+from ml_model.backend import load_inference_model
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 MODEL_PATH = os.path.join(BASE_DIR, "model", "vocalvibe_model.h5")
 LABEL_PATH = os.path.join(BASE_DIR, "model", "label_classes.npy")
 
-model = load_model(MODEL_PATH, compile=False)
-labels = np.load(LABEL_PATH, allow_pickle=True)
-print("MODEL PATH:", MODEL_PATH)
-print("MODEL EXISTS:", os.path.exists(MODEL_PATH))
+_model = None
+_labels = None
+_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def get_voice_model():
+    """Returns (model, labels), loading them on first use"""
+    global _model, _labels
+
+    if _model is None:
+        with _lock:
+            if _model is None:
+                logger.info("MODEL PATH: %s", MODEL_PATH)
+                logger.info("MODEL EXISTS: %s", os.path.exists(MODEL_PATH))
+                _labels = np.load(LABEL_PATH, allow_pickle=True)
+                _model = load_inference_model(MODEL_PATH)
+    return _model, _labels
+
+
+def voice_model_loaded():
+    return _model is not None
+
+
+def __getattr__(name):
+    # Keeps `from ml_model.load_model import model, labels` working
+    if name == "model":
+        return get_voice_model()[0]
+    if name == "labels":
+        return get_voice_model()[1]
+    raise AttributeError(name)
@@ -0,0 +1,173 @@
+"""
+NumPy-only forward pass for the small Keras Sequential models we serve
+(face CNN: Conv2D / MaxPooling2D / Flatten / Dense, voice MLP: Dense).
+
+export_keras_model() dumps layer specs + weights into one .npz file;
+NumpyModel loads it without importing TensorFlow and exposes the same
+predict(x, verbose=0) call the rest of the backend uses.
+"""
+
+import json
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SUPPORTED_LAYERS = {
+    "InputLayer", "Conv2D", "MaxPooling2D", "Flatten", "Dense", "Dropout"
+}
+
+
+# ---------------- ACTIVATIONS ----------------
+def _relu(x):
+    return np.maximum(x, 0, out=x)
+
+
+def _softmax(x):
+    x = x - x.max(axis=-1, keepdims=True)
+    np.exp(x, out=x)
+    x /= x.sum(axis=-1, keepdims=True)
+    return x
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": _relu,
+    "softmax": _softmax,
+}
+
+
+# ---------------- LAYERS ----------------
+def _pad_same(x, kh, kw, sh, sw, value=0.0):
+    h, w = x.shape[1:3]
+    out_h, out_w = -(-h // sh), -(-w // sw)
+    pad_h = max((out_h - 1) * sh + kh - h, 0)
+    pad_w = max((out_w - 1) * sw + kw - w, 0)
+    return np.pad(x, (
+        (0, 0),
+        (pad_h // 2, pad_h - pad_h // 2),
+        (pad_w // 2, pad_w - pad_w // 2),
+        (0, 0),
+    ), constant_values=value)
+
+
+def conv2d(x, kernel, bias, strides=(1, 1), padding="valid"):
+    """NHWC convolution as im2col + one matmul"""
+    kh, kw, cin, cout = kernel.shape
+    sh, sw = strides
+
+    if padding == "same":
+        x = _pad_same(x, kh, kw, sh, sw)
+
+    # (N, H', W', C, kh, kw) view, no copy yet
+    windows = sliding_window_view(x, (kh, kw), axis=(1, 2))[:, ::sh, ::sw]
+    n, oh, ow = windows.shape[:3]
+
+    cols = windows.transpose(0, 1, 2, 4, 5, 3).reshape(n * oh * ow, kh * kw * cin)
+    out = cols @ kernel.reshape(kh * kw * cin, cout)
+    out += bias
+    return out.reshape(n, oh, ow, cout)
+
+
+def max_pool2d(x, pool_size=(2, 2), strides=None, padding="valid"):
+    ph, pw = pool_size
+    sh, sw = strides or pool_size
+    n, h, w, c = x.shape
+
+    if padding == "same":
+        x = _pad_same(x, ph, pw, sh, sw, value=-np.inf)
+        n, h, w, c = x.shape
+
+    if (ph, pw) == (sh, sw) and padding == "valid":
+        oh, ow = h // ph, w // pw
+        x = x[:, :oh * ph, :ow * pw]
+        return x.reshape(n, oh, ph, ow, pw, c).max(axis=(2, 4))
+
+    windows = sliding_window_view(x, (ph, pw), axis=(1, 2))[:, ::sh, ::sw]
+    return windows.max(axis=(-2, -1))
+
+
+# ---------------- MODEL ----------------
+class NumpyModel:
+    def __init__(self, layers):
+        self.layers = layers
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path, allow_pickle=False)
+        spec = json.loads(str(data["__spec__"]))
+
+        layers = []
+        for i, layer in enumerate(spec):
+            weights = [
+                data[f"layer{i}_w{j}"].astype("float32")
+                for j in range(layer["n_weights"])
+            ]
+            layers.append((layer["type"], layer["config"], weights))
+        return cls(layers)
+
+    def predict(self, x, verbose=0, batch_size=None):
+        x = np.asarray(x, dtype="float32")
+
+        for kind, config, weights in self.layers:
+            if kind == "Conv2D":
+                x = conv2d(
+                    x, weights[0], weights[1] if len(weights) > 1 else 0.0,
+                    strides=tuple(config.get("strides", (1, 1))),
+                    padding=config.get("padding", "valid")
+                )
+                x = ACTIVATIONS[config.get("activation", "linear")](x)
+
+            elif kind == "MaxPooling2D":
+                x = max_pool2d(
+                    x,
+                    pool_size=tuple(config.get("pool_size", (2, 2))),
+                    strides=config.get("strides"),
+                    padding=config.get("padding", "valid")
+                )
+
+            elif kind == "Flatten":
+                x = x.reshape(x.shape[0], -1)
+
+            elif kind == "Dense":
+                x = x @ weights[0]
+                if len(weights) > 1:
+                    x += weights[1]
+                x = ACTIVATIONS[config.get("activation", "linear")](x)
+
+            # InputLayer / Dropout are identity at inference time
+
+        return x
+
+    __call__ = predict
+
+
+def load_numpy_model(path):
+    return NumpyModel.load(path)
+
+
+# ---------------- EXPORT ----------------
+def export_keras_model(model, path):
+    """Writes a Keras Sequential model to the .npz format above"""
+    spec, arrays = [], {}
+
+    for i, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        if kind not in SUPPORTED_LAYERS:
+            raise ValueError(f"Unsupported layer for NumPy export: {kind}")
+
+        config = layer.get_config()
+        keep = {
+            k: config[k]
+            for k in ("activation", "strides", "padding", "pool_size")
+            if k in config
+        }
+        if kind == "Conv2D" and tuple(config.get("dilation_rate", (1, 1))) != (1, 1):
+            raise ValueError("Dilated convolutions are not supported")
+
+        weights = layer.get_weights()
+        for j, w in enumerate(weights):
+            arrays[f"layer{i}_w{j}"] = np.asarray(w, dtype="float32")
+
+        spec.append({"type": kind, "config": keep, "n_weights": len(weights)})
+
+    np.savez(path, __spec__=np.array(json.dumps(spec)), **arrays)
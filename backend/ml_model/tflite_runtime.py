@@ -0,0 +1,89 @@
+"""
+TensorFlow Lite runtime for the quantized models from quantize_models.py.
+
+    INFERENCE_BACKEND=tflite INFERENCE_QUANT=int8 uvicorn main:app
+
+TFLiteModel exposes the same predict(x, verbose=0) call as Keras and
+NumpyModel. Models keep float32 inputs / outputs (quantize / dequantize
+ops live inside the graph), so callers don't change.
+
+Interpreters are not thread-safe and are sized for one batch shape, so
+each thread keeps its own interpreter per batch size it has seen.
+
+Needs `tflite-runtime` (small, inference only) or full `tensorflow`.
+"""
+
+import threading
+
+import numpy as np
+
+
+def _interpreter_class():
+    try:
+        from tflite_runtime.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tensorflow.lite import Interpreter
+        except ImportError as e:
+            raise RuntimeError(
+                "INFERENCE_BACKEND=tflite needs `tflite-runtime` or `tensorflow`"
+            ) from e
+    return Interpreter
+
+
+class TFLiteModel:
+    def __init__(self, model_content, num_threads=1):
+        self._content = model_content
+        self._num_threads = num_threads
+        self._Interpreter = _interpreter_class()
+        self._local = threading.local()
+
+        probe = self._new_interpreter(1)
+        inp = probe.get_input_details()[0]
+        out = probe.get_output_details()[0]
+        self.input_shape = (None,) + tuple(inp["shape"][1:])
+        self.output_shape = (None,) + tuple(out["shape"][1:])
+
+    @classmethod
+    def load(cls, path, num_threads=1):
+        with open(path, "rb") as f:
+            return cls(f.read(), num_threads)
+
+    def _new_interpreter(self, batch):
+        interpreter = self._Interpreter(
+            model_content=self._content, num_threads=self._num_threads
+        )
+        inp = interpreter.get_input_details()[0]
+        if inp["shape"][0] != batch:
+            interpreter.resize_tensor_input(
+                inp["index"], [batch] + list(inp["shape"][1:])
+            )
+        interpreter.allocate_tensors()
+        return interpreter
+
+    def _interpreter(self, batch):
+        cache = getattr(self._local, "interpreters", None)
+        if cache is None:
+            cache = self._local.interpreters = {}
+
+        interpreter = cache.get(batch)
+        if interpreter is None:
+            interpreter = cache[batch] = self._new_interpreter(batch)
+        return interpreter
+
+    def predict(self, x, verbose=0, batch_size=None):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        interpreter = self._interpreter(len(x))
+
+        interpreter.set_tensor(interpreter.get_input_details()[0]["index"], x)
+        interpreter.invoke()
+        # Copy: the output buffer is reused by the next invoke()
+        return interpreter.get_tensor(
+            interpreter.get_output_details()[0]["index"]
+        ).copy()
+
+    __call__ = predict
+
+
+def load_tflite_model(path, num_threads=1):
+    return TFLiteModel.load(path, num_threads)
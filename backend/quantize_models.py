@@ -0,0 +1,274 @@
+"""
+Post-training quantization of the face CNN and voice MLP to TFLite,
+gated on accuracy.
+
+    python quantize_models.py                     # int8, both models
+    python quantize_models.py --mode float16 --max-drop 0.005
+    INFERENCE_BACKEND=tflite INFERENCE_QUANT=int8 uvicorn main:app
+
+int8 calibrates activation ranges on --calib-samples training inputs
+(full integer kernels, float32 model I/O); float16 halves the weights
+and needs no calibration. Each variant is then evaluated against the
+float Keras model on the held-out split:
+
+    accuracy (float vs quantized), argmax agreement, p50 latency at
+    batch 1 and batch --batch, model size on disk, and resident memory
+    (process RSS growth across load + first predict, Linux only)
+
+and is written next to the .h5 only if accuracy drops by at most
+--max-drop. The exit code is non-zero if any model fails the gate.
+
+Calibration / evaluation data come from the training caches
+(train_face_emotion_model.py's uint8 shards, train_model.py's feature
+store), split exactly like training did. --synthetic uses random
+inputs instead and gates on agreement with the float model.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from ml_model.backend import quantized_path
+from ml_model.tflite_runtime import TFLiteModel
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+FACE_MODEL = os.path.join(BASE_DIR, "model", "face_emotion_model.h5")
+VOICE_MODEL = os.path.join(BASE_DIR, "model", "vocalvibe_model.h5")
+VOICE_LABELS = os.path.join(BASE_DIR, "model", "label_classes.npy")
+FACE_DATASET_CACHE = os.getenv("FACE_DATASET_CACHE", "datasets/cache/fer2013_64")
+
+
+# ---------------- DATA ----------------
+def face_data(n_calib, n_eval, rng):
+    from ml_model.face_dataset import FaceCache
+
+    cache = FaceCache(FACE_DATASET_CACHE)
+    train_idx, val_idx = cache.split(test_size=0.2, seed=42)
+    calib_idx = rng.choice(train_idx, min(n_calib, len(train_idx)), replace=False)
+    eval_idx = rng.choice(val_idx, min(n_eval, len(val_idx)), replace=False)
+
+    def load(indices):
+        xs, ys = zip(*cache.batches(indices, 256))
+        x, y = np.concatenate(xs), np.concatenate(ys)
+        return x.astype(np.float32) / 255.0, y.astype(np.int64)
+
+    calib, _ = load(calib_idx)
+    x_eval, y_eval = load(eval_idx)
+    return calib, x_eval, y_eval
+
+
+def voice_data(n_calib, n_eval, rng):
+    from sklearn.model_selection import train_test_split
+    from features.extract_features import load_data
+
+    X, y = load_data()
+    classes = list(np.load(VOICE_LABELS, allow_pickle=True))
+    y = np.array([classes.index(label) for label in y])
+
+    X_train, X_test, _, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    calib = X_train[rng.choice(len(X_train), min(n_calib, len(X_train)), replace=False)]
+    pick = rng.choice(len(X_test), min(n_eval, len(X_test)), replace=False)
+    return calib, X_test[pick], y_test[pick]
+
+
+def synthetic_data(keras_model, n_calib, n_eval, rng):
+    # Face inputs are [0, 1] pixels, voice inputs are unbounded MFCC stats
+    shape = tuple(keras_model.input_shape[1:])
+    if len(shape) == 3:
+        make = lambda n: rng.random((n,) + shape, dtype=np.float32)
+    else:
+        make = lambda n: rng.normal(0, 20, (n,) + shape).astype(np.float32)
+    return make(n_calib), make(n_eval), None
+
+
+# ---------------- CONVERT ----------------
+def convert(keras_model, calib, mode):
+    import tensorflow as tf
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(keras_model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if mode == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    else:
+        def representative():
+            for i in range(len(calib)):
+                yield [calib[i:i + 1]]
+
+        converter.representative_dataset = representative
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    return converter.convert()
+
+
+# ---------------- MEMORY ----------------
+def rss_kb():
+    """Current resident set size; NaN where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return float("nan")
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024.0
+
+
+def load_measured(load):
+    """
+    load() plus one batch-1 predict, and the RSS they added in KB.
+
+    Most of a model's memory is native (TF graph, interpreter arenas),
+    which tracemalloc can't see, and tensors are allocated on first
+    invoke rather than at load.
+    """
+    gc.collect()
+    before = rss_kb()
+    model = load()
+    model.predict(np.zeros((1,) + tuple(model.input_shape[1:]), np.float32), verbose=0)
+    return model, rss_kb() - before
+
+
+# ---------------- EVALUATE ----------------
+def predict_batched(model, x, batch):
+    return np.concatenate([
+        model.predict(x[i:i + batch], verbose=0) for i in range(0, len(x), batch)
+    ])
+
+
+def p50_ms(fn, runs):
+    fn()   # warm-up
+    times = []
+    for _ in range(runs):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return float(np.median(times) * 1000.0)
+
+
+def evaluate(keras_model, quant_model, x_eval, y_eval, batch, runs):
+    float_pred = predict_batched(keras_model, x_eval, batch).argmax(1)
+    quant_pred = predict_batched(quant_model, x_eval, batch).argmax(1)
+
+    if y_eval is None:
+        # No labels: the float model's answers are the reference
+        float_acc, quant_acc = 1.0, float(np.mean(quant_pred == float_pred))
+    else:
+        float_acc = float(np.mean(float_pred == y_eval))
+        quant_acc = float(np.mean(quant_pred == y_eval))
+
+    one, many = x_eval[:1], x_eval[:batch]
+    return {
+        "eval_samples": len(x_eval),
+        "float_accuracy": float_acc,
+        "quant_accuracy": quant_acc,
+        "accuracy_drop": float_acc - quant_acc,
+        "agreement": float(np.mean(quant_pred == float_pred)),
+        "float_p50_ms_b1": p50_ms(lambda: keras_model.predict(one, verbose=0), runs),
+        "quant_p50_ms_b1": p50_ms(lambda: quant_model.predict(one), runs),
+        f"float_p50_ms_b{batch}": p50_ms(lambda: keras_model.predict(many, verbose=0), runs),
+        f"quant_p50_ms_b{batch}": p50_ms(lambda: quant_model.predict(many), runs),
+    }
+
+
+def quantize(name, h5_path, data_fn, args, rng):
+    # Imported up front so the framework itself isn't counted as model memory
+    import tensorflow  # noqa: F401
+    from keras.models import load_model
+
+    keras_model, float_mem_kb = load_measured(
+        lambda: load_model(h5_path, compile=False)
+    )
+
+    if args.synthetic:
+        calib, x_eval, y_eval = synthetic_data(
+            keras_model, args.calib_samples, args.eval_samples, rng
+        )
+    else:
+        calib, x_eval, y_eval = data_fn(args.calib_samples, args.eval_samples, rng)
+
+    content = convert(keras_model, calib, args.mode)
+    quant_model, quant_mem_kb = load_measured(lambda: TFLiteModel(content))
+
+    report = {
+        "model": name,
+        "mode": args.mode,
+        "calib_samples": len(calib),
+        **evaluate(keras_model, quant_model, x_eval, y_eval, args.batch, args.runs),
+        "float_file_kb": os.path.getsize(h5_path) / 1024.0,
+        "quant_file_kb": len(content) / 1024.0,
+        "float_param_kb": keras_model.count_params() * 4 / 1024.0,
+        "float_rss_kb": float_mem_kb,
+        "quant_rss_kb": quant_mem_kb,
+    }
+    report["passed"] = report["accuracy_drop"] <= args.max_drop
+
+    if report["passed"]:
+        out_path = quantized_path(h5_path, args.mode)
+        with open(out_path, "wb") as f:
+            f.write(content)
+        report["output"] = out_path
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mode", choices=("int8", "float16"), default="int8")
+    parser.add_argument("--models", default="face,voice")
+    parser.add_argument("--max-drop", type=float, default=0.01,
+                        help="max accuracy drop (absolute, 0.01 = 1 point)")
+    parser.add_argument("--calib-samples", type=int, default=500)
+    parser.add_argument("--eval-samples", type=int, default=2000)
+    parser.add_argument("--batch", type=int, default=16)
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--synthetic", action="store_true",
+                        help="random inputs, gate on float/quant agreement")
+    parser.add_argument("--report", help="write the JSON report here")
+    args = parser.parse_args()
+
+    models = {
+        "face": (FACE_MODEL, face_data),
+        "voice": (VOICE_MODEL, voice_data),
+    }
+    rng = np.random.default_rng(0)
+    reports, ok = [], True
+
+    for name in args.models.split(","):
+        h5_path, data_fn = models[name]
+        if not os.path.exists(h5_path):
+            print(f"⚠️ Skipping missing model: {h5_path}")
+            continue
+
+        r = quantize(name, h5_path, data_fn, args, rng)
+        reports.append(r)
+        ok = ok and r["passed"]
+
+        print(
+            f"{'✅' if r['passed'] else '❌'} {name} {args.mode}: "
+            f"accuracy {r['float_accuracy']:.2%} → {r['quant_accuracy']:.2%} "
+            f"(Δ={-r['accuracy_drop']:+.2%}, agreement={r['agreement']:.2%}) | "
+            f"b1 {r['float_p50_ms_b1']:.3f} → {r['quant_p50_ms_b1']:.3f} ms | "
+            f"b{args.batch} {r[f'float_p50_ms_b{args.batch}']:.3f} → "
+            f"{r[f'quant_p50_ms_b{args.batch}']:.3f} ms | "
+            f"{r['float_file_kb']:.0f} → {r['quant_file_kb']:.0f} KB on disk, "
+            f"{r['float_rss_kb']:.0f} → {r['quant_rss_kb']:.0f} KB RSS"
+        )
+        if not r["passed"]:
+            print(f"   accuracy drop above --max-drop {args.max_drop:.2%}, not written")
+
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
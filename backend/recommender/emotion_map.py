@@ -33,5 +33,39 @@ emotion_to_features = {
         "energy": 0.7,
         "danceability": 0.7,
         "tempo": 130
+    },
+    "fear": {
+        "valence": 0.3,
+        "energy": 0.4,
+        "danceability": 0.3,
+        "tempo": 90
+    },
+    "disgust": {
+        "valence": 0.3,
+        "energy": 0.7,
+        "danceability": 0.5,
+        "tempo": 110
+    },
+    "calm": {
+        "valence": 0.6,
+        "energy": 0.2,
+        "danceability": 0.4,
+        "tempo": 80
     }
 }
+
+# Voice model labels that name the same mood as a face label
+EMOTION_ALIASES = {
+    "fearful": "fear",
+    "surprised": "surprise"
+}
+
+
+def canonical_emotion(emotion):
+    """Model label -> key of emotion_to_features; unknown labels read as neutral"""
+    emotion = EMOTION_ALIASES.get(emotion, emotion)
+    return emotion if emotion in emotion_to_features else "neutral"
+
+
+def target_features(emotion):
+    return emotion_to_features[canonical_emotion(emotion)]
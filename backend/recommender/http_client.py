@@ -0,0 +1,139 @@
+"""
+Shared HTTP clients for the Spotify recommender.
+
+One keep-alive connection pool per process (async for the API,
+sync for scripts / background threads), with timeouts, bounded
+concurrency and retry/backoff on 429 and 5xx responses.
+"""
+
+import asyncio
+import os
+import random
+import time
+from email.utils import parsedate_to_datetime
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+HTTP_TIMEOUT = float(os.getenv("SPOTIFY_HTTP_TIMEOUT", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("SPOTIFY_HTTP_CONNECT_TIMEOUT", "3"))
+HTTP_MAX_CONNECTIONS = int(os.getenv("SPOTIFY_HTTP_MAX_CONNECTIONS", "20"))
+HTTP_MAX_KEEPALIVE = int(os.getenv("SPOTIFY_HTTP_MAX_KEEPALIVE", "10"))
+HTTP_MAX_CONCURRENCY = int(os.getenv("SPOTIFY_HTTP_MAX_CONCURRENCY", "8"))
+HTTP_MAX_RETRIES = int(os.getenv("SPOTIFY_HTTP_MAX_RETRIES", "3"))
+HTTP_BACKOFF_BASE = float(os.getenv("SPOTIFY_HTTP_BACKOFF_BASE", "0.25"))
+HTTP_MAX_RETRY_AFTER = float(os.getenv("SPOTIFY_HTTP_MAX_RETRY_AFTER", "10"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+_client = None
+_semaphore = None
+_session = None
+
+
+# ---------------- RETRY POLICY ----------------
+def _retry_delay(response, attempt: int) -> float:
+    """Honours Retry-After (seconds or HTTP date), else exponential backoff."""
+    # Not `if response`: a requests.Response is falsy for every 4xx / 5xx
+    retry_after = (
+        response.headers.get("Retry-After") if response is not None else None
+    )
+
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(max(delay, 0.0), HTTP_MAX_RETRY_AFTER)
+
+    backoff = HTTP_BACKOFF_BASE * (2 ** attempt)
+    return backoff + random.uniform(0, backoff)
+
+
+# ---------------- ASYNC CLIENT ----------------
+def get_async_client() -> httpx.AsyncClient:
+    global _client, _semaphore
+
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE
+            )
+        )
+        _semaphore = asyncio.Semaphore(HTTP_MAX_CONCURRENCY)
+
+    return _client
+
+
+async def request_async(method: str, url: str, **kwargs) -> httpx.Response:
+    client = get_async_client()
+
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        response = None
+        try:
+            async with _semaphore:
+                response = await client.request(method, url, **kwargs)
+        except httpx.TransportError:
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+        else:
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt == HTTP_MAX_RETRIES
+            ):
+                return response
+
+        # Sleep outside the semaphore so other requests keep flowing
+        await asyncio.sleep(_retry_delay(response, attempt))
+
+
+async def close_async_client():
+    global _client
+
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+# ---------------- SYNC SESSION ----------------
+def get_session() -> requests.Session:
+    global _session
+
+    if _session is None:
+        _session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_MAX_KEEPALIVE,
+            pool_maxsize=HTTP_MAX_CONNECTIONS
+        )
+        _session.mount("https://", adapter)
+        _session.mount("http://", adapter)
+
+    return _session
+
+
+def request_sync(method: str, url: str, **kwargs) -> requests.Response:
+    session = get_session()
+    kwargs.setdefault("timeout", (HTTP_CONNECT_TIMEOUT, HTTP_TIMEOUT))
+
+    for attempt in range(HTTP_MAX_RETRIES + 1):
+        response = None
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == HTTP_MAX_RETRIES:
+                raise
+        else:
+            if (
+                response.status_code not in RETRY_STATUSES
+                or attempt == HTTP_MAX_RETRIES
+            ):
+                return response
+
+        time.sleep(_retry_delay(response, attempt))
@@ -1,7 +1,24 @@
-import requests
-from recommender.spotify_auth import get_access_token
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 
-SEARCH_URL = "https://api.spotify.com/v1/search"
+from metrics import stage
+from recommender.http_client import request_async, request_sync
+from recommender.spotify_auth import (
+    get_access_token,
+    get_access_token_async,
+    invalidate_access_token,
+)
+
+logger = logging.getLogger(__name__)
+
+SEARCH_URL = os.getenv(
+    "SPOTIFY_SEARCH_URL", "https://api.spotify.com/v1/search"
+)
+MARKET = os.getenv("SPOTIFY_MARKET", "US")
 
 EMOTION_QUERIES = {
     "happy": "happy upbeat pop",
@@ -10,31 +27,60 @@ EMOTION_QUERIES = {
     "neutral": "chill indie",
     "surprise": "energetic dance"
 }
+DEFAULT_QUERY = "chill pop"
 
-def get_spotify_recommendations(emotion: str, limit: int = 10):
-    token = get_access_token()
+# ---------------- RECOMMENDATION CACHE ----------------
+# Fresh for CACHE_TTL seconds, then served stale (while refreshing in
+# the background) until CACHE_MAX_STALE seconds after expiry.
+CACHE_TTL = float(os.getenv("SPOTIFY_CACHE_TTL", "600"))
+CACHE_MAX_STALE = float(os.getenv("SPOTIFY_CACHE_MAX_STALE", "3600"))
+CACHE_MAX_ENTRIES = int(os.getenv("SPOTIFY_CACHE_MAX_ENTRIES", "256"))
 
-    headers = {
-        "Authorization": f"Bearer {token}"
-    }
+_cache = OrderedDict()   # (query, limit, market) -> (expires_at, tracks)
+_cache_lock = threading.Lock()
+_refreshing = set()
+_pending = {}            # key -> in-flight asyncio.Task (async misses)
+_background_tasks = set()
 
-    query = EMOTION_QUERIES.get(emotion, "chill pop")
+CACHE_STATS = {
+    "hits": 0,
+    "stale_hits": 0,
+    "misses": 0,
+    "refreshes": 0,
+    "refresh_failures": 0,
+    "evictions": 0,
+}
 
-    params = {
-        "q": query,
-        "type": "track",
-        "limit": limit,
-        "market": "US"
-    }
 
-    response = requests.get(SEARCH_URL, headers=headers, params=params)
+def _cache_get(key):
+    """Returns (tracks, is_fresh) or None if missing / too stale."""
+    now = time.monotonic()
 
-    print("🎧 Spotify SEARCH status:", response.status_code)
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+
+        expires_at, tracks = entry
+        if now >= expires_at + CACHE_MAX_STALE:
+            del _cache[key]
+            return None
+
+        _cache.move_to_end(key)
+        return tracks, now < expires_at
 
-    response.raise_for_status()
 
-    tracks = response.json()["tracks"]["items"]
+def _cache_put(key, tracks):
+    with _cache_lock:
+        _cache[key] = (time.monotonic() + CACHE_TTL, tracks)
+        _cache.move_to_end(key)
 
+        while len(_cache) > CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+            CACHE_STATS["evictions"] += 1
+
+
+def _parse_tracks(payload):
     return [
         {
             "name": track["name"],
@@ -42,5 +88,202 @@ def get_spotify_recommendations(emotion: str, limit: int = 10):
             "preview_url": track["preview_url"],
             "spotify_url": track["external_urls"]["spotify"]
         }
-        for track in tracks
+        for track in payload["tracks"]["items"]
     ]
+
+
+def _search_params(query: str, limit: int, market: str):
+    return {
+        "q": query,
+        "type": "track",
+        "limit": limit,
+        "market": market
+    }
+
+
+def _handle_search_response(response):
+    logger.debug("🎧 Spotify SEARCH status: %s", response.status_code)
+
+    if response.status_code == 401:
+        invalidate_access_token()
+
+    response.raise_for_status()
+
+    return _parse_tracks(response.json())
+
+
+def _search_tracks(query: str, limit: int, market: str):
+    token = get_access_token()
+
+    with stage("spotify_search"):
+        response = request_sync(
+            "GET",
+            SEARCH_URL,
+            headers={"Authorization": f"Bearer {token}"},
+            params=_search_params(query, limit, market)
+        )
+
+    return _handle_search_response(response)
+
+
+async def _search_tracks_async(query: str, limit: int, market: str):
+    token = await get_access_token_async()
+
+    with stage("spotify_search"):
+        response = await request_async(
+            "GET",
+            SEARCH_URL,
+            headers={"Authorization": f"Bearer {token}"},
+            params=_search_params(query, limit, market)
+        )
+
+    return _handle_search_response(response)
+
+
+def _refresh_entry(key):
+    try:
+        _cache_put(key, _search_tracks(*key))
+        CACHE_STATS["refreshes"] += 1
+    except Exception as e:
+        CACHE_STATS["refresh_failures"] += 1
+        logger.error("❌ Spotify cache refresh failed: %s", e)
+    finally:
+        with _cache_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh(key):
+    with _cache_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    threading.Thread(
+        target=_refresh_entry,
+        args=(key,),
+        name="spotify-cache-refresh",
+        daemon=True
+    ).start()
+
+
+async def _refresh_entry_async(key):
+    try:
+        _cache_put(key, await _search_tracks_async(*key))
+        CACHE_STATS["refreshes"] += 1
+    except Exception as e:
+        CACHE_STATS["refresh_failures"] += 1
+        logger.error("❌ Spotify cache refresh failed: %s", e)
+    finally:
+        with _cache_lock:
+            _refreshing.discard(key)
+
+
+def _schedule_refresh_async(key):
+    with _cache_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+
+    task = asyncio.get_running_loop().create_task(_refresh_entry_async(key))
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+async def _fetch_and_store_async(key):
+    try:
+        tracks = await _search_tracks_async(*key)
+        _cache_put(key, tracks)
+        return tracks
+    finally:
+        _pending.pop(key, None)
+
+
+def get_spotify_recommendations(
+    emotion: str,
+    limit: int = 10,
+    market: str = MARKET
+):
+    query = EMOTION_QUERIES.get(emotion, DEFAULT_QUERY)
+    key = (query, limit, market)
+
+    cached = _cache_get(key)
+    if cached is not None:
+        tracks, fresh = cached
+        if fresh:
+            CACHE_STATS["hits"] += 1
+        else:
+            CACHE_STATS["stale_hits"] += 1
+            _schedule_refresh(key)
+        return tracks
+
+    CACHE_STATS["misses"] += 1
+    tracks = _search_tracks(query, limit, market)
+    _cache_put(key, tracks)
+    return tracks
+
+
+async def get_spotify_recommendations_async(
+    emotion: str,
+    limit: int = 10,
+    market: str = MARKET
+):
+    """Event-loop friendly variant used by the API endpoints."""
+    query = EMOTION_QUERIES.get(emotion, DEFAULT_QUERY)
+    key = (query, limit, market)
+
+    cached = _cache_get(key)
+    if cached is not None:
+        tracks, fresh = cached
+        if fresh:
+            CACHE_STATS["hits"] += 1
+        else:
+            CACHE_STATS["stale_hits"] += 1
+            _schedule_refresh_async(key)
+        return tracks
+
+    CACHE_STATS["misses"] += 1
+
+    # Concurrent misses for the same key share one Spotify request
+    task = _pending.get(key)
+    if task is None:
+        task = asyncio.get_running_loop().create_task(
+            _fetch_and_store_async(key)
+        )
+        _pending[key] = task
+
+    return await asyncio.shield(task)
+
+
+def warm_recommendation_cache(limit: int = 10, market: str = MARKET):
+    """Pre-fetches every mapped emotion query (used at startup)."""
+    for query in set(EMOTION_QUERIES.values()) | {DEFAULT_QUERY}:
+        key = (query, limit, market)
+        try:
+            _cache_put(key, _search_tracks(*key))
+        except Exception as e:
+            logger.warning("⚠️ Spotify cache warm-up failed for '%s': %s", query, e)
+
+
+async def warm_recommendation_cache_async(
+    limit: int = 10,
+    market: str = MARKET
+):
+    queries = sorted(set(EMOTION_QUERIES.values()) | {DEFAULT_QUERY})
+    results = await asyncio.gather(
+        *(_search_tracks_async(q, limit, market) for q in queries),
+        return_exceptions=True
+    )
+
+    for query, tracks in zip(queries, results):
+        if isinstance(tracks, Exception):
+            logger.warning(
+                "⚠️ Spotify cache warm-up failed for '%s': %s", query, tracks
+            )
+        else:
+            _cache_put((query, limit, market), tracks)
+
+
+def get_cache_stats():
+    with _cache_lock:
+        size = len(_cache)
+    return {**CACHE_STATS, "size": size}
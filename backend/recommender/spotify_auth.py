@@ -1,16 +1,45 @@
+import asyncio
 import base64
 import os
-import requests
+import threading
+import time
 from dotenv import load_dotenv
 
+from metrics import stage
+from recommender.http_client import request_sync
+
 load_dotenv()
 
 CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID")
 CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET")
 
-TOKEN_URL = "https://accounts.spotify.com/api/token"
+TOKEN_URL = os.getenv(
+    "SPOTIFY_TOKEN_URL", "https://accounts.spotify.com/api/token"
+)
 
-def get_access_token():
+# Refresh this many seconds before the token actually expires
+TOKEN_REFRESH_MARGIN = float(os.getenv("SPOTIFY_TOKEN_REFRESH_MARGIN", "60"))
+TOKEN_TIMEOUT = float(os.getenv("SPOTIFY_TOKEN_TIMEOUT", "10"))
+
+# ---------------- TOKEN CACHE (process-wide) ----------------
+_token = None
+_expires_at = 0.0
+# TOKEN_REFRESH_MARGIN, clamped to half the current token's lifetime
+_refresh_margin = 0.0
+_lock = threading.Lock()
+_refresh_guard = threading.Lock()
+_refresh_thread = None
+
+TOKEN_STATS = {
+    "hits": 0,
+    "misses": 0,
+    "refreshes": 0,
+    "background_refreshes": 0,
+    "failures": 0,
+}
+
+
+def _request_token():
     auth_str = f"{CLIENT_ID}:{CLIENT_SECRET}"
     b64_auth = base64.b64encode(auth_str.encode()).decode()
 
@@ -21,7 +50,121 @@ def get_access_token():
 
     data = {"grant_type": "client_credentials"}
 
-    response = requests.post(TOKEN_URL, headers=headers, data=data)
+    with stage("spotify_auth"):
+        response = request_sync(
+            "POST", TOKEN_URL, headers=headers, data=data, timeout=TOKEN_TIMEOUT
+        )
     response.raise_for_status()
 
-    return response.json()["access_token"]
+    payload = response.json()
+    return payload["access_token"], float(payload.get("expires_in", 3600))
+
+
+def _refresh_locked():
+    """Fetch a new token and store it. Caller must hold _lock."""
+    global _token, _expires_at, _refresh_margin
+
+    try:
+        token, expires_in = _request_token()
+    except Exception:
+        TOKEN_STATS["failures"] += 1
+        raise
+
+    _token = token
+    _expires_at = time.monotonic() + expires_in
+    # A short-lived token would otherwise sit inside the refresh window
+    # for its whole life and every hit would schedule a refresh
+    _refresh_margin = min(TOKEN_REFRESH_MARGIN, expires_in / 2)
+    TOKEN_STATS["refreshes"] += 1
+    return _token
+
+
+def _background_refresh():
+    global _refresh_thread
+
+    try:
+        with _lock:
+            # Another caller may have refreshed while we waited
+            if time.monotonic() < _expires_at - _refresh_margin:
+                return
+            _refresh_locked()
+            TOKEN_STATS["background_refreshes"] += 1
+    except Exception:
+        # The current token is still valid; the next caller retries
+        pass
+    finally:
+        _refresh_thread = None
+
+
+def _schedule_background_refresh():
+    global _refresh_thread
+
+    with _refresh_guard:
+        if _refresh_thread is not None:
+            return
+        _refresh_thread = threading.Thread(
+            target=_background_refresh,
+            name="spotify-token-refresh",
+            daemon=True
+        )
+        _refresh_thread.start()
+
+
+def _cached_token():
+    now = time.monotonic()
+    token, expires_at, margin = _token, _expires_at, _refresh_margin
+
+    if token is not None and now < expires_at:
+        TOKEN_STATS["hits"] += 1
+        if now >= expires_at - margin:
+            _schedule_background_refresh()
+        return token
+
+    return None
+
+
+def get_access_token():
+    """
+    Returns a cached client-credentials token.
+
+    Tokens close to expiry are served while a single background
+    refresh runs; expired tokens block until one caller refreshes.
+    """
+    token = _cached_token()
+    if token is not None:
+        return token
+
+    with _lock:
+        # Concurrent callers share the refresh done by the first one
+        if _token is not None and time.monotonic() < _expires_at:
+            TOKEN_STATS["hits"] += 1
+            return _token
+
+        TOKEN_STATS["misses"] += 1
+        return _refresh_locked()
+
+
+async def get_access_token_async():
+    """Same cache; a blocking refresh runs off the event loop."""
+    token = _cached_token()
+    if token is not None:
+        return token
+
+    return await asyncio.to_thread(get_access_token)
+
+
+def invalidate_access_token():
+    """Drops the cached token (e.g. after a 401 from the API)."""
+    global _token, _expires_at
+
+    with _lock:
+        _token = None
+        _expires_at = 0.0
+
+
+def get_token_stats():
+    return {
+        **TOKEN_STATS,
+        "cached": _token is not None,
+        "expires_in": max(0.0, _expires_at - time.monotonic()),
+    }
@@ -0,0 +1,359 @@
+"""
+Local track catalogue: emotion_map targets -> nearest tracks, no network.
+
+Built offline with build_track_index.py into a directory of
+
+    features.npy   (4, N) float32, one row per column: valence, energy,
+                   danceability, tempo / TEMPO_SCALE (memory-mapped)
+    artists.npy    (N,) int32 artist codes, for the per-artist cap
+    offsets.npy    (N + 1,) int64 byte offsets into tracks.jsonl
+    tracks.jsonl   one {name, artist, preview_url, spotify_url} per line
+    meta.json      count, tempo_scale, version
+
+Nothing but the header of each file is read at load. Every emotion
+gets a candidate pool (its POOL_SIZE nearest tracks, computed once);
+a query re-ranks the pool union of the emotions involved, drops the
+user's recently served tracks and caps tracks per artist, so serving
+touches a few thousand rows instead of the whole catalogue.
+
+TRACK_INDEX_PATH unset or missing -> every request goes to Spotify, as
+before. A query that can't fill `limit` tracks is a catalogue miss and
+falls back to Spotify too.
+"""
+
+import json
+import logging
+import mmap
+import os
+import shutil
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from recommender.emotion_map import (
+    canonical_emotion,
+    emotion_to_features,
+    target_features,
+)
+from recommender.spotify import get_spotify_recommendations_async
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TRACK_INDEX_PATH = os.getenv(
+    "TRACK_INDEX_PATH", os.path.join(BASE_DIR, "data", "track_index")
+)
+# Nearest tracks kept per emotion; queries only look inside these
+TRACK_POOL_SIZE = int(os.getenv("TRACK_POOL_SIZE", "2000"))
+# Max tracks by one artist in a single recommendation
+TRACK_ARTIST_CAP = int(os.getenv("TRACK_ARTIST_CAP", "2"))
+# Recently served tracks excluded per user (X-Session-Id)
+TRACK_RECENT_MAX = int(os.getenv("TRACK_RECENT_MAX", "200"))
+TRACK_RECENT_USERS = int(os.getenv("TRACK_RECENT_USERS", "10000"))
+TRACK_RECENT_TTL = float(os.getenv("TRACK_RECENT_TTL", "86400"))
+
+FEATURES = ("valence", "energy", "danceability", "tempo")
+TEMPO_SCALE = 200.0
+INDEX_VERSION = 1
+
+
+def target_vector(emotion, tempo_scale=TEMPO_SCALE):
+    target = target_features(emotion)
+    return np.array([
+        target["valence"],
+        target["energy"],
+        target["danceability"],
+        target["tempo"] / tempo_scale
+    ], dtype=np.float32)
+
+
+# ---------------- BUILD (OFFLINE) ----------------
+def build_track_index(tracks, out_dir, tempo_scale=TEMPO_SCALE):
+    """
+    tracks: iterable of dicts with name, artist, spotify_url,
+    preview_url and the four FEATURES. Written to a temp directory and
+    swapped in, so a running server never sees a half-built index.
+    Returns the number of tracks written.
+    """
+    tmp_dir = out_dir.rstrip(os.sep) + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    columns = [[] for _ in FEATURES]
+    artists, offsets = [], [0]
+    artist_codes = {}
+    seen = set()
+
+    with open(os.path.join(tmp_dir, "tracks.jsonl"), "wb") as f:
+        for track in tracks:
+            url = track["spotify_url"]
+            if url in seen:
+                continue
+            seen.add(url)
+
+            for column, name in zip(columns, FEATURES):
+                column.append(float(track[name]))
+            columns[-1][-1] /= tempo_scale
+
+            artist = track["artist"]
+            artists.append(artist_codes.setdefault(artist, len(artist_codes)))
+
+            line = json.dumps({
+                "name": track["name"],
+                "artist": artist,
+                "preview_url": track.get("preview_url"),
+                "spotify_url": url
+            }).encode() + b"\n"
+            f.write(line)
+            offsets.append(offsets[-1] + len(line))
+
+    np.save(os.path.join(tmp_dir, "features.npy"), np.array(columns, np.float32))
+    np.save(os.path.join(tmp_dir, "artists.npy"), np.array(artists, np.int32))
+    np.save(os.path.join(tmp_dir, "offsets.npy"), np.array(offsets, np.int64))
+    with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+        json.dump({
+            "count": len(artists),
+            "features": FEATURES,
+            "tempo_scale": tempo_scale,
+            "version": INDEX_VERSION
+        }, f)
+
+    old_dir = out_dir.rstrip(os.sep) + ".old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(out_dir):
+        os.replace(out_dir, old_dir)
+    os.replace(tmp_dir, out_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    return len(artists)
+
+
+# ---------------- SERVE ----------------
+class TrackIndex:
+    def __init__(self, path, pool_size=TRACK_POOL_SIZE):
+        with open(os.path.join(path, "meta.json")) as f:
+            meta = json.load(f)
+        if meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported track index version: {meta.get('version')}")
+
+        self.path = path
+        self.count = int(meta["count"])
+        self.tempo_scale = float(meta["tempo_scale"])
+        self.pool_size = min(pool_size, self.count)
+
+        self.features = np.load(os.path.join(path, "features.npy"), mmap_mode="r")
+        self.artists = np.load(os.path.join(path, "artists.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(path, "offsets.npy"), mmap_mode="r")
+
+        self._tracks_file = open(os.path.join(path, "tracks.jsonl"), "rb")
+        self._tracks = (
+            mmap.mmap(self._tracks_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if self.count else b""
+        )
+
+        self._pools = {}            # emotion -> (rows, features) nearest first
+        self._pools_lock = threading.Lock()
+
+    def close(self):
+        if isinstance(self._tracks, mmap.mmap):
+            self._tracks.close()
+        self._tracks_file.close()
+
+    def _distances(self, features, target):
+        return np.sum((features - target[:, None]) ** 2, axis=0)
+
+    def pool(self, emotion):
+        """Row ids of the pool_size tracks nearest to emotion's target"""
+        emotion = canonical_emotion(emotion)
+        cached = self._pools.get(emotion)
+        if cached is not None:
+            return cached
+
+        with self._pools_lock:
+            if emotion not in self._pools:
+                # One full scan per emotion, then only the pool is touched
+                d = self._distances(
+                    self.features, target_vector(emotion, self.tempo_scale)
+                )
+                rows = np.argpartition(d, self.pool_size - 1)[:self.pool_size]
+                rows = rows[np.argsort(d[rows], kind="stable")]
+                self._pools[emotion] = (rows, np.ascontiguousarray(self.features[:, rows]))
+            return self._pools[emotion]
+
+    def warm(self, emotions):
+        for emotion in emotions:
+            self.pool(emotion)
+
+    def track(self, row):
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return json.loads(self._tracks[start:end])
+
+    def query(self, mix, limit=10, exclude=(), artist_cap=TRACK_ARTIST_CAP):
+        """
+        mix: {emotion: weight}. Ranks by distance to the weighted mean
+        of the emotions' targets -> row ids (fewer than limit if the
+        pools run dry after exclusions).
+        """
+        if not self.count or not mix:
+            return []
+
+        pools = [self.pool(emotion) for emotion in mix]
+        if len(pools) == 1:
+            # A pool is already ranked by distance to its own target
+            return self._pick(pools[0][0], limit, exclude, artist_cap)
+
+        total = float(sum(mix.values())) or 1.0
+        target = sum(
+            target_vector(emotion, self.tempo_scale) * (weight / total)
+            for emotion, weight in mix.items()
+        )
+        # Overlapping pools repeat rows; _pick skips the duplicates
+        rows = np.concatenate([p[0] for p in pools])
+        d = self._distances(np.concatenate([p[1] for p in pools], axis=1), target)
+
+        # Rank only the head; a full sort is needed just when exclusions,
+        # duplicates and the artist cap eat through it
+        head = min(len(d), len(pools) * 4 * limit + len(exclude))
+        if head < len(d):
+            top = np.argpartition(d, head - 1)[:head]
+            picked = self._pick(
+                rows[top[np.argsort(d[top])]], limit, exclude, artist_cap
+            )
+            if len(picked) == limit:
+                return picked
+
+        return self._pick(rows[np.argsort(d)], limit, exclude, artist_cap)
+
+    def _pick(self, ranked, limit, exclude, artist_cap):
+        picked, per_artist, seen = [], {}, set()
+        for row in ranked:
+            row = int(row)
+            if row in exclude or row in seen:
+                continue
+            seen.add(row)
+            artist = int(self.artists[row])
+            if per_artist.get(artist, 0) >= artist_cap:
+                continue
+            per_artist[artist] = per_artist.get(artist, 0) + 1
+            picked.append(row)
+            if len(picked) == limit:
+                break
+        return picked
+
+
+class RecentTracks:
+    """Per-user ring of recently served row ids (LRU + TTL over users)"""
+
+    def __init__(self, per_user=TRACK_RECENT_MAX, max_users=TRACK_RECENT_USERS,
+                 ttl=TRACK_RECENT_TTL):
+        self.per_user = per_user
+        self.max_users = max_users
+        self.ttl = ttl
+        self._users = OrderedDict()   # user -> (expires_at, deque of rows)
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None or entry[0] < time.monotonic():
+                return frozenset()
+            return frozenset(entry[1])
+
+    def add(self, user_id, rows):
+        with self._lock:
+            entry = self._users.get(user_id)
+            recent = entry[1] if entry else deque(maxlen=self.per_user)
+            recent.extend(rows)
+
+            self._users[user_id] = (time.monotonic() + self.ttl, recent)
+            self._users.move_to_end(user_id)
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+
+    def __len__(self):
+        return len(self._users)
+
+
+_index = None
+_index_loaded = False
+_index_lock = threading.Lock()
+_recent = RecentTracks()
+
+INDEX_STATS = {
+    "queries": 0,
+    "hits": 0,
+    "misses": 0,
+}
+
+
+def get_track_index():
+    """Loaded TrackIndex, or None when TRACK_INDEX_PATH has no index"""
+    global _index, _index_loaded
+
+    if _index_loaded:
+        return _index
+
+    with _index_lock:
+        if not _index_loaded:
+            if os.path.exists(os.path.join(TRACK_INDEX_PATH, "meta.json")):
+                try:
+                    _index = TrackIndex(TRACK_INDEX_PATH)
+                    logger.info(
+                        "🎼 Track index: %d tracks from %s", _index.count, TRACK_INDEX_PATH
+                    )
+                except Exception as e:
+                    logger.error("❌ Track index load failed: %s", e)
+            _index_loaded = True
+    return _index
+
+
+def warm_track_index():
+    """Loads the index and builds every emotion's pool (used at startup)"""
+    index = get_track_index()
+    if index is not None and index.count:
+        index.warm(emotion_to_features)
+
+
+def recommend_local(emotion=None, limit=10, user_id=None, mix=None):
+    """
+    Tracks from the local catalogue for one emotion, or for a blend
+    {emotion: weight} (e.g. fused face/voice confidences). Returns None
+    on a catalogue miss so the caller can fall back to Spotify.
+    """
+    index = get_track_index()
+    if index is None:
+        return None
+
+    INDEX_STATS["queries"] += 1
+    exclude = _recent.get(user_id) if user_id else frozenset()
+    rows = index.query(mix or {emotion: 1.0}, limit, exclude)
+
+    if len(rows) < limit:
+        INDEX_STATS["misses"] += 1
+        return None
+
+    INDEX_STATS["hits"] += 1
+    if user_id:
+        _recent.add(user_id, rows)
+    return [index.track(row) for row in rows]
+
+
+async def recommend_tracks_async(emotion, limit=10, user_id=None, mix=None):
+    """Local catalogue first, Spotify search only for catalogue misses"""
+    tracks = recommend_local(emotion, limit, user_id, mix)
+    if tracks is not None:
+        return tracks
+    return await get_spotify_recommendations_async(emotion, limit)
+
+
+def get_index_stats():
+    index = _index
+    return {
+        **INDEX_STATS,
+        "tracks": index.count if index is not None else 0,
+        "pools": len(index._pools) if index is not None else 0,
+        "users": len(_recent),
+    }
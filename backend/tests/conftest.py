@@ -0,0 +1,17 @@
+import pytest
+
+from mock_spotify import MockSpotify
+from run_suite import stand_in_attrs
+
+
+@pytest.fixture
+def spotify():
+    with MockSpotify(latency_ms=0) as mock:
+        yield mock
+
+
+@pytest.fixture
+def stand_ins(monkeypatch):
+    """Stand-in face / voice models, restored after the test"""
+    for module, name, value in stand_in_attrs():
+        monkeypatch.setattr(module, name, value)
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pytest
+
+from fixtures import face_image, jpeg_bytes
+from emotion import batch_jobs
+
+
+@pytest.fixture(autouse=True)
+def stand_in_models(stand_ins):
+    pass
+
+
+def slow_source(count, delay=0.05):
+    image = jpeg_bytes(face_image(160, 120))
+
+    def iter_source(path, kinds, skip):
+        for i in range(count):
+            time.sleep(delay)
+            yield f"img{i}.jpg", "image", image
+
+    return iter_source
+
+
+def worker_threads():
+    return [t for t in threading.enumerate() if t.name.startswith("batch-")]
+
+
+def test_cancel_releases_worker_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_jobs, "iter_source", slow_source(1000))
+    job = batch_jobs.BatchJob("src", str(tmp_path / "out.jsonl"),
+                              workers=4, batch_size=1)
+
+    result = job.run(progress=lambda stats: job.cancel())
+
+    assert result["status"] == "cancelled"
+    deadline = time.monotonic() + 2.0
+    while worker_threads() and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert worker_threads() == []
+
+
+def test_completed_job_writes_every_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(batch_jobs, "iter_source", slow_source(5, delay=0))
+    job = batch_jobs.BatchJob("src", str(tmp_path / "out.jsonl"), workers=2)
+
+    result = job.run()
+
+    assert result["status"] == "completed"
+    assert result["stats"]["processed"] == 5
+    assert len((tmp_path / "out.jsonl").read_text().splitlines()) == 5
+
+
+def test_finished_jobs_are_evicted(monkeypatch):
+    monkeypatch.setattr(batch_jobs, "_jobs", {})
+    monkeypatch.setattr(batch_jobs, "BATCH_MAX_JOBS", 2)
+    monkeypatch.setattr(batch_jobs, "BATCH_JOB_TTL", 60.0)
+
+    now = time.monotonic()
+    jobs = [batch_jobs.BatchJob("src", f"out{i}.jsonl") for i in range(4)]
+    jobs[0].finished_at = now - 120     # past the TTL
+    jobs[1].finished_at = now - 10
+    jobs[2].finished_at = now - 5
+    # jobs[3] is still running
+    batch_jobs._jobs.update({job.id: job for job in jobs})
+
+    ids = {job["id"] for job in batch_jobs.list_jobs()}
+
+    assert ids == {jobs[2].id, jobs[3].id}
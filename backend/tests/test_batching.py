@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from emotion.batching import MicroBatcher
+
+
+def test_rows_go_back_to_their_callers():
+    batcher = MicroBatcher(lambda xs: xs * 2, max_batch_size=4, max_wait_ms=20)
+    try:
+        outs = batcher.predict_many([np.full(3, i, np.float32) for i in range(6)])
+    finally:
+        batcher.close()
+
+    for i, out in enumerate(outs):
+        np.testing.assert_array_equal(out, np.full(3, 2 * i))
+
+
+def test_mismatched_shapes_fail_the_batch_not_the_thread():
+    batcher = MicroBatcher(lambda xs: xs, max_batch_size=8, max_wait_ms=50)
+    try:
+        bad = [batcher.submit(np.zeros(3)), batcher.submit(np.zeros(4))]
+        for future in bad:
+            with pytest.raises(ValueError):
+                future.result(timeout=5)
+
+        # The worker is still alive and serves the next batch
+        out = batcher.submit(np.ones(3)).result(timeout=5)
+        np.testing.assert_array_equal(out, np.ones(3))
+    finally:
+        batcher.close()
@@ -0,0 +1,53 @@
+import cv2
+import numpy as np
+import pytest
+
+from ml_model.face_dataset import build_face_cache
+
+EMOTIONS = ["angry", "happy", "neutral", "sad"]
+PER_CLASS = 48
+
+
+@pytest.fixture
+def face_tree(tmp_path):
+    # Class-sorted folders, like FER2013 on disk
+    rng = np.random.default_rng(0)
+    for emotion in EMOTIONS:
+        folder = tmp_path / "train" / emotion
+        folder.mkdir(parents=True)
+        for i in range(PER_CLASS):
+            img = rng.integers(0, 256, (16, 16), dtype=np.uint8)
+            cv2.imwrite(str(folder / f"{i:04d}.png"), img)
+    return tmp_path
+
+
+def test_shuffled_batches_mix_classes(face_tree):
+    cache = build_face_cache(
+        str(face_tree / "train"), EMOTIONS, str(face_tree / "cache"),
+        img_size=16, shard_size=64, workers=2
+    )
+    assert cache.count == len(EMOTIONS) * PER_CLASS
+
+    # Each 64-row shard holds a mix, not one or two neighbouring folders
+    for shard in range(len(cache.shards)):
+        labels = cache.labels[cache.offsets[shard]:cache.offsets[shard + 1]]
+        assert len(np.unique(labels)) == len(EMOTIONS)
+
+    batches = list(cache.batches(cache.valid_indices(), 16, shuffle=True, seed=1))
+    assert sum(len(y) for _, y in batches) == cache.count
+    for x, y in batches:
+        assert x.shape[1:] == (16, 16, 1)
+        assert len(np.unique(y)) >= 3
+        # No class dominates a batch (expected share is 1/4)
+        assert np.bincount(y, minlength=len(EMOTIONS)).max() <= 10
+
+
+def test_cache_is_reused_until_the_seed_changes(face_tree):
+    args = (str(face_tree / "train"), EMOTIONS, str(face_tree / "cache"))
+    first = build_face_cache(*args, img_size=16, shard_size=64)
+    again = build_face_cache(*args, img_size=16, shard_size=64)
+    reseeded = build_face_cache(*args, img_size=16, shard_size=64, seed=1)
+
+    assert again.fingerprint == first.fingerprint
+    np.testing.assert_array_equal(again.labels, first.labels)
+    assert reseeded.fingerprint != first.fingerprint
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from emotion.face_tracker import FaceTracker
+from fixtures import face_image, jpeg_bytes
+
+SIZE = 60
+
+
+def scene(x, y, seed=0):
+    """Smooth background with a textured 'face' patch at (x, y)"""
+    rng = np.random.default_rng(seed)
+    gradient = np.linspace(60, 120, 320, dtype=np.float32)
+    img = np.broadcast_to(gradient, (240, 320)).copy()
+    patch = rng.integers(0, 256, (SIZE // 4, SIZE // 4)).astype(np.float32)
+    img[y:y + SIZE, x:x + SIZE] = np.kron(patch, np.ones((4, 4)))
+    return np.repeat(img.astype(np.uint8)[..., None], 3, axis=2)
+
+
+class Detector:
+    """detect_fn that knows where the patch really is"""
+
+    def __init__(self):
+        self.box = None
+        self.calls = 0
+
+    def __call__(self, img):
+        self.calls += 1
+        return self.box, 0.99
+
+
+def run(tracker, detector, positions, seed=0):
+    out = []
+    for x, y in positions:
+        detector.box = (x, y, x + SIZE, y + SIZE)
+        out.append(tracker.update(scene(x, y, seed)))
+    return out
+
+
+def test_shifted_face_is_followed_without_the_detector():
+    detector = Detector()
+    tracker = FaceTracker(detector, detect_every=100)
+    positions = [(100 + 3 * i, 80 + 2 * i) for i in range(10)]
+
+    results = run(tracker, detector, positions)
+
+    assert detector.calls == 1
+    for (box, ran), (x, y) in zip(results[1:], positions[1:]):
+        assert not ran
+        assert abs(box[0] - x) <= 2 and abs(box[1] - y) <= 2
+        assert (box[2] - box[0], box[3] - box[1]) == (SIZE, SIZE)
+
+
+def test_detector_reruns_every_n_frames():
+    detector = Detector()
+    tracker = FaceTracker(detector, detect_every=3)
+
+    results = run(tracker, detector, [(100 + i, 80) for i in range(9)])
+
+    assert [ran for _, ran in results] == [
+        True, False, False, False, True, False, False, False, True
+    ]
+    assert tracker.stats["detections"] == detector.calls == 3
+
+
+def test_lost_track_falls_back_to_the_detector():
+    detector = Detector()
+    tracker = FaceTracker(detector, detect_every=100)
+    run(tracker, detector, [(100, 80)])
+
+    # A different texture: no template match above min_score
+    (box, ran), = run(tracker, detector, [(102, 80)], seed=1)
+
+    assert ran and box == (102, 80, 102 + SIZE, 80 + SIZE)
+    assert tracker.stats["lost"] == 1
+
+
+# ---------------- /ws/camera ----------------
+@pytest.fixture
+def client(monkeypatch, stand_ins):
+    monkeypatch.setattr(main, "WARM_SPOTIFY_CACHE", False)
+    with TestClient(main.app) as c:
+        yield c
+
+
+def test_still_frames_are_reused_up_to_the_cap(client, monkeypatch):
+    monkeypatch.setattr(main, "RESULT_CACHE_PHASH", True)
+    monkeypatch.setattr(main, "CAMERA_MAX_REUSE", 2)
+    frame = jpeg_bytes(face_image(320, 240))
+
+    replies = []
+    with client.websocket_connect("/ws/camera") as ws:
+        for _ in range(7):
+            # One frame at a time, so none is dropped as stale
+            ws.send_bytes(frame)
+            replies.append(ws.receive_json())
+
+    assert all(r["type"] == "emotion" and r["dropped"] == 0 for r in replies)
+    assert [r.get("reused", False) for r in replies] == [
+        False, True, True, False, True, True, False
+    ]
@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+import pytest
+
+from recommender import http_client
+
+
+@pytest.fixture(autouse=True)
+def fast_backoff(monkeypatch):
+    # Backoff without Retry-After is ~ms, so only Retry-After sleeps long
+    monkeypatch.setattr(http_client, "HTTP_BACKOFF_BASE", 0.001)
+
+
+def request_async(method, url):
+    async def run():
+        try:
+            return await http_client.request_async(method, url)
+        finally:
+            await http_client.close_async_client()
+
+    return asyncio.run(run())
+
+
+def test_sync_honours_retry_after(spotify):
+    spotify.fail("search", 429, retry_after="1")
+
+    start = time.perf_counter()
+    response = http_client.request_sync("GET", spotify.search_url)
+
+    assert response.status_code == 200
+    assert spotify.calls["search"] == 2
+    assert time.perf_counter() - start >= 1.0
+
+
+def test_async_honours_retry_after(spotify):
+    spotify.fail("search", 429, retry_after="1")
+
+    start = time.perf_counter()
+    response = request_async("GET", spotify.search_url)
+
+    assert response.status_code == 200
+    assert spotify.calls["search"] == 2
+    assert time.perf_counter() - start >= 1.0
+
+
+def test_retry_after_is_capped(spotify, monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_MAX_RETRY_AFTER", 0.2)
+    spotify.fail("search", 503, retry_after="30")
+
+    start = time.perf_counter()
+    response = http_client.request_sync("GET", spotify.search_url)
+
+    assert response.status_code == 200
+    assert time.perf_counter() - start < 5.0
+
+
+def test_5xx_is_retried_until_success(spotify):
+    spotify.fail("search", 502, times=2)
+
+    assert http_client.request_sync("GET", spotify.search_url).status_code == 200
+    assert spotify.calls["search"] == 3
+
+
+def test_last_error_is_returned_once_retries_run_out(spotify):
+    spotify.fail("search", 500, times=http_client.HTTP_MAX_RETRIES + 1)
+
+    assert request_async("GET", spotify.search_url).status_code == 500
+    assert spotify.calls["search"] == http_client.HTTP_MAX_RETRIES + 1
+
+
+def test_client_errors_are_not_retried(spotify):
+    spotify.fail("search", 400)
+
+    assert http_client.request_sync("GET", spotify.search_url).status_code == 400
+    assert spotify.calls["search"] == 1
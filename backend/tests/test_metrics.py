@@ -0,0 +1,22 @@
+from metrics import render_stats
+
+
+def test_monotonic_keys_are_counters_with_total_suffix():
+    lines = render_stats(
+        "moodify_spotify_token",
+        {"hits": 3, "misses": 1, "cached": True, "expires_in": 12.5},
+        "Spotify token cache",
+        counters=("hits", "misses"),
+    )
+
+    assert "# TYPE moodify_spotify_token_hits_total counter" in lines
+    assert "moodify_spotify_token_hits_total 3" in lines
+    assert "moodify_spotify_token_misses_total 1" in lines
+    assert "# TYPE moodify_spotify_token_cached gauge" in lines
+    assert "moodify_spotify_token_cached 1" in lines
+    assert "moodify_spotify_token_expires_in 12.5" in lines
+
+
+def test_non_numeric_values_are_skipped():
+    lines = render_stats("moodify_inference_pool", {"executor": "thread"}, "Pool")
+    assert lines == []
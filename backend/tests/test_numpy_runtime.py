@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from ml_model.numpy_runtime import (
+    NumpyModel,
+    conv2d,
+    export_keras_model,
+    load_numpy_model,
+    max_pool2d,
+)
+
+
+# ---------------- LAYERS (no TensorFlow needed) ----------------
+def naive_conv2d(x, kernel, bias, stride):
+    kh, kw, _, cout = kernel.shape
+    n, h, w, _ = x.shape
+    oh, ow = (h - kh) // stride + 1, (w - kw) // stride + 1
+    out = np.zeros((n, oh, ow, cout), np.float32)
+    for i in range(oh):
+        for j in range(ow):
+            patch = x[:, i * stride:i * stride + kh, j * stride:j * stride + kw]
+            out[:, i, j] = np.tensordot(patch, kernel, axes=3) + bias
+    return out
+
+
+@pytest.mark.parametrize("stride", [1, 2])
+def test_conv2d_matches_direct_convolution(stride):
+    rng = np.random.default_rng(0)
+    x = rng.random((2, 9, 11, 3), dtype=np.float32)
+    kernel = rng.normal(size=(3, 3, 3, 4)).astype(np.float32)
+    bias = rng.normal(size=4).astype(np.float32)
+
+    np.testing.assert_allclose(
+        conv2d(x, kernel, bias, strides=(stride, stride)),
+        naive_conv2d(x, kernel, bias, stride),
+        rtol=1e-5, atol=1e-5
+    )
+
+
+def test_same_padding_keeps_spatial_size():
+    x = np.ones((1, 7, 7, 1), np.float32)
+    out = conv2d(x, np.ones((3, 3, 1, 1), np.float32), 0.0, padding="same")
+    assert out.shape == (1, 7, 7, 1)
+    # Corners only see the 2x2 in-bounds part of the kernel
+    assert out[0, 0, 0, 0] == 4.0 and out[0, 3, 3, 0] == 9.0
+
+
+def test_max_pool_drops_ragged_edge():
+    x = np.arange(25, dtype=np.float32).reshape(1, 5, 5, 1)
+    out = max_pool2d(x)
+    np.testing.assert_array_equal(out[0, :, :, 0], [[6, 8], [16, 18]])
+
+
+def test_model_applies_layers_in_order():
+    dense = np.eye(3, dtype=np.float32)
+    model = NumpyModel([
+        ("Dense", {"activation": "relu"}, [dense, -np.ones(3, np.float32)]),
+        ("Dropout", {}, []),
+        ("Dense", {"activation": "softmax"}, [dense]),
+    ])
+    out = model.predict(np.array([[1.0, 2.0, 3.0]]))
+
+    expected = np.exp([0.0, 1.0, 2.0])
+    np.testing.assert_allclose(out[0], expected / expected.sum(), rtol=1e-6)
+
+
+# ---------------- KERAS PARITY ----------------
+def face_cnn(keras):
+    # train_face_emotion_model.py, plus a strided / "same" block
+    layers = keras.layers
+    return keras.Sequential([
+        keras.Input((64, 64, 1)),
+        layers.Conv2D(32, (3, 3), activation="relu"),
+        layers.MaxPooling2D(2, 2),
+        layers.Dropout(0.25),
+        layers.Conv2D(64, (3, 3), activation="relu"),
+        layers.MaxPooling2D(2, 2),
+        layers.Conv2D(64, (3, 3), strides=2, padding="same", activation="relu"),
+        layers.MaxPooling2D(2, 2, padding="same"),
+        layers.Flatten(),
+        layers.Dense(128, activation="relu"),
+        layers.Dropout(0.5),
+        layers.Dense(7, activation="softmax"),
+    ])
+
+
+def voice_mlp(keras):
+    # train_model.py
+    layers = keras.layers
+    return keras.Sequential([
+        keras.Input((160,)),
+        layers.Dense(256, activation="relu"),
+        layers.Dropout(0.4),
+        layers.Dense(128, activation="relu"),
+        layers.Dropout(0.3),
+        layers.Dense(8, activation="softmax"),
+    ])
+
+
+@pytest.mark.parametrize("build", [face_cnn, voice_mlp])
+def test_export_matches_keras(build, tmp_path):
+    pytest.importorskip("tensorflow")
+    import keras
+    from export_models import PARITY_ATOL, check_parity
+
+    keras_model = build(keras)
+    path = tmp_path / "model.npz"
+    export_keras_model(keras_model, path)
+
+    max_diff, agree = check_parity(keras_model, load_numpy_model(path))
+    assert max_diff <= PARITY_ATOL
+    assert agree == 1.0
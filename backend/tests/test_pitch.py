@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from bench_pitch import CASES, MEAN_TOL_HZ, SR, STD_TOL_HZ
+from emotion.pitch import pyin, yin
+from fixtures import speech_clip
+
+SIGNALS = {
+    **CASES,
+    "speech clip 150 Hz": speech_clip(3.0, sr=SR, f0=150.0, seed=0),
+    "speech clip 240 Hz": speech_clip(3.0, sr=SR, f0=240.0, seed=1),
+}
+
+
+@pytest.mark.parametrize("name", list(SIGNALS))
+def test_yin_matches_pyin_statistics(name):
+    # steer_emotion only uses f0 mean / std, so that is what must agree
+    y = SIGNALS[name]
+    ref, fast = pyin(y, SR), yin(y, SR)
+
+    assert len(fast) == len(ref)
+    assert abs(fast.mean() - ref.mean()) <= MEAN_TOL_HZ
+    assert abs(fast.std() - ref.std()) <= STD_TOL_HZ
+
+
+def test_silence_is_unvoiced():
+    assert not yin(np.zeros(SR, np.float32), SR).any()
@@ -0,0 +1,46 @@
+import asyncio
+
+from emotion.result_cache import ResultCache
+
+
+def compute_counter(result):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        return dict(result)
+
+    return compute, calls
+
+
+def test_failed_results_are_not_cached():
+    cache = ResultCache()
+    compute, calls = compute_counter({"success": False, "emotion": "neutral"})
+
+    async def run():
+        await cache.get_or_compute(("face", b"k"), compute)
+        await cache.get_or_compute(("face", b"k"), compute)
+
+    asyncio.run(run())
+    assert len(calls) == 2
+
+
+def test_successful_results_are_cached():
+    cache = ResultCache()
+    compute, calls = compute_counter({"success": True, "emotion": "happy"})
+
+    async def run():
+        await cache.get_or_compute(("face", b"k"), compute)
+        return await cache.get_or_compute(("face", b"k"), compute)
+
+    assert asyncio.run(run())["emotion"] == "happy"
+    assert len(calls) == 1
+
+
+def test_perceptual_matches_stay_within_their_scope():
+    cache = ResultCache(phash_distance=0)
+    cache.put(("face", b"a"), {"success": True}, phash=42, scope=("face", "alice"))
+
+    assert cache.get(("face", b"b"), phash=42, scope=("face", "alice")) is not None
+    assert cache.get(("face", b"b"), phash=42, scope=("face", "bob")) is None
+    assert cache.get(("face", b"b"), phash=42) is None
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from recommender import http_client, spotify_auth
+
+
+@pytest.fixture
+def token_server(spotify, monkeypatch):
+    monkeypatch.setattr(spotify_auth, "TOKEN_URL", spotify.token_url)
+    monkeypatch.setattr(http_client, "HTTP_BACKOFF_BASE", 0.001)
+    spotify_auth.invalidate_access_token()
+    for name in spotify_auth.TOKEN_STATS:
+        spotify_auth.TOKEN_STATS[name] = 0
+    yield spotify
+    wait_for_background_refresh()
+    spotify_auth.invalidate_access_token()
+
+
+def wait_for_background_refresh():
+    thread = spotify_auth._refresh_thread
+    if thread is not None:
+        thread.join(5)
+
+
+def test_token_is_cached(token_server):
+    assert spotify_auth.get_access_token() == "mock-token"
+    assert spotify_auth.get_access_token() == "mock-token"
+    assert asyncio.run(spotify_auth.get_access_token_async()) == "mock-token"
+
+    assert token_server.calls["token"] == 1
+    assert spotify_auth.TOKEN_STATS["hits"] == 2
+
+
+def test_expired_token_is_fetched_again(token_server):
+    token_server.token_ttl = 0.3
+    spotify_auth.get_access_token()
+    time.sleep(0.4)
+    spotify_auth.get_access_token()
+
+    assert token_server.calls["token"] == 2
+    assert spotify_auth.TOKEN_STATS["misses"] == 2
+
+
+def test_concurrent_callers_share_one_refresh(token_server):
+    token_server.latency = 0.1
+    barrier = threading.Barrier(16)
+    tokens = []
+
+    def call():
+        barrier.wait()
+        tokens.append(spotify_auth.get_access_token())
+
+    threads = [threading.Thread(target=call) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert tokens == ["mock-token"] * 16
+    assert token_server.calls["token"] == 1
+
+
+def test_short_lived_token_does_not_refresh_on_every_hit(token_server, monkeypatch):
+    # Margin 60 s > lifetime 10 s: clamped to 5 s, so no refresh yet
+    monkeypatch.setattr(spotify_auth, "TOKEN_REFRESH_MARGIN", 60.0)
+    token_server.token_ttl = 10
+    for _ in range(20):
+        spotify_auth.get_access_token()
+    wait_for_background_refresh()
+
+    assert token_server.calls["token"] == 1
+    assert spotify_auth.TOKEN_STATS["background_refreshes"] == 0
+
+
+def test_token_near_expiry_is_served_while_refreshing(token_server, monkeypatch):
+    monkeypatch.setattr(spotify_auth, "TOKEN_REFRESH_MARGIN", 60.0)
+    token_server.token_ttl = 0.4
+    spotify_auth.get_access_token()
+    time.sleep(0.25)   # inside the clamped 0.2 s margin, not expired
+
+    assert spotify_auth.get_access_token() == "mock-token"
+    wait_for_background_refresh()
+    assert token_server.calls["token"] == 2
+    assert spotify_auth.TOKEN_STATS["background_refreshes"] == 1
+
+
+def test_failed_fetch_is_counted_and_raised(token_server):
+    token_server.fail("token", 401)
+
+    with pytest.raises(Exception):
+        spotify_auth.get_access_token()
+    assert spotify_auth.TOKEN_STATS["failures"] == 1
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from recommender import http_client, spotify as spotify_cache, spotify_auth
+
+
+@pytest.fixture
+def search_server(spotify, monkeypatch):
+    monkeypatch.setattr(spotify_auth, "TOKEN_URL", spotify.token_url)
+    monkeypatch.setattr(spotify_cache, "SEARCH_URL", spotify.search_url)
+    monkeypatch.setattr(spotify_cache, "_cache", spotify_cache.OrderedDict())
+    monkeypatch.setattr(spotify_cache, "_refreshing", set())
+    monkeypatch.setattr(spotify_cache, "_pending", {})
+    for name in spotify_cache.CACHE_STATS:
+        monkeypatch.setitem(spotify_cache.CACHE_STATS, name, 0)
+    spotify_auth.invalidate_access_token()
+    yield spotify
+    spotify_auth.invalidate_access_token()
+
+
+def run(coro):
+    """asyncio.run() that also closes the shared client in the same loop"""
+    async def main():
+        try:
+            return await coro
+        finally:
+            await asyncio.gather(*spotify_cache._background_tasks)
+            await http_client.close_async_client()
+
+    return asyncio.run(main())
+
+
+def recommend(*emotions):
+    async def all_at_once():
+        results = await asyncio.gather(*(
+            spotify_cache.get_spotify_recommendations_async(e) for e in emotions
+        ))
+        return results if len(emotions) > 1 else results[0]
+
+    return run(all_at_once())
+
+
+def test_fresh_hit_makes_no_call(search_server):
+    first = recommend("happy")
+    second = recommend("happy")
+
+    assert second == first
+    assert search_server.calls["search"] == 1
+    assert spotify_cache.CACHE_STATS["hits"] == 1
+    # The sync path shares the cache
+    assert spotify_cache.get_spotify_recommendations("happy") == first
+    assert search_server.calls["search"] == 1
+
+
+def test_stale_hit_serves_old_tracks_and_refreshes_once(search_server, monkeypatch):
+    monkeypatch.setattr(spotify_cache, "CACHE_TTL", 0.0)
+    recommend("sad")
+    key = next(iter(spotify_cache._cache))
+    old = spotify_cache._cache[key][1]
+    marker = [{**old[0], "name": "served stale"}]
+    spotify_cache._cache[key] = (spotify_cache._cache[key][0], marker)
+
+    # Both stale hits return the old value; only one refresh is started
+    assert recommend("sad", "sad") == [marker, marker]
+    assert spotify_cache.CACHE_STATS["stale_hits"] == 2
+    assert spotify_cache.CACHE_STATS["refreshes"] == 1
+    assert search_server.calls["search"] == 2
+    assert spotify_cache._cache[key][1] == old
+
+
+def test_too_stale_entry_is_a_miss(search_server, monkeypatch):
+    monkeypatch.setattr(spotify_cache, "CACHE_TTL", 0.0)
+    monkeypatch.setattr(spotify_cache, "CACHE_MAX_STALE", 0.0)
+    recommend("sad")
+    recommend("sad")
+
+    assert spotify_cache.CACHE_STATS["misses"] == 2
+    assert spotify_cache.CACHE_STATS["stale_hits"] == 0
+
+
+def test_concurrent_misses_share_one_request(search_server):
+    search_server.latency = 0.05
+    results = recommend(*["angry"] * 8)
+
+    assert all(r == results[0] for r in results)
+    assert search_server.calls["search"] == 1
+    assert spotify_cache.CACHE_STATS["misses"] == 8
+    assert not spotify_cache._pending
+
+
+def test_failed_miss_is_not_cached(search_server):
+    search_server.fail("search", 400)
+    with pytest.raises(Exception):
+        recommend("neutral")
+
+    assert not spotify_cache._pending
+    recommend("neutral")
+    assert search_server.calls["search"] == 2
+
+
+def test_least_recently_used_entry_is_evicted(search_server, monkeypatch):
+    monkeypatch.setattr(spotify_cache, "CACHE_MAX_ENTRIES", 2)
+    recommend("happy")
+    recommend("sad")
+    recommend("happy")      # hit: "sad" is now the oldest
+    recommend("angry")
+
+    assert spotify_cache.CACHE_STATS["evictions"] == 1
+    assert len(spotify_cache._cache) == 2
+
+    recommend("happy")
+    assert search_server.calls["search"] == 3
+    recommend("sad")
+    assert search_server.calls["search"] == 4
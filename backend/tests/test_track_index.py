@@ -0,0 +1,150 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from emotion.emotion_fusion import fusion_mix
+from recommender import track_index
+from recommender.track_index import (
+    RecentTracks,
+    TrackIndex,
+    build_track_index,
+    target_vector,
+)
+
+N_TRACKS = 400
+
+
+def catalogue(n=N_TRACKS, n_artists=None, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "name": f"track {i}",
+            "artist": f"artist {i % n_artists if n_artists else i}",
+            "spotify_url": f"https://open.spotify.com/track/{i}",
+            "preview_url": None,
+            "valence": rng.random(),
+            "energy": rng.random(),
+            "danceability": rng.random(),
+            "tempo": rng.uniform(60, 180),
+        }
+        for i in range(n)
+    ]
+
+
+def open_index(tmp_path, tracks, pool_size):
+    path = str(tmp_path / "index")
+    build_track_index(tracks, path)
+    index = TrackIndex(path, pool_size=pool_size)
+    yield index
+    index.close()
+
+
+@pytest.fixture
+def index(tmp_path):
+    yield from open_index(tmp_path, catalogue(), pool_size=N_TRACKS)
+
+
+def brute_force(index, target, limit, exclude=(), artist_cap=None):
+    """Nearest rows over the whole catalogue, capped per artist greedily"""
+    d = np.sum((np.asarray(index.features) - target[:, None]) ** 2, axis=0)
+    picked, per_artist = [], {}
+    for row in np.argsort(d):
+        row = int(row)
+        artist = int(index.artists[row])
+        if row in exclude:
+            continue
+        if artist_cap is not None and per_artist.get(artist, 0) >= artist_cap:
+            continue
+        per_artist[artist] = per_artist.get(artist, 0) + 1
+        picked.append(row)
+        if len(picked) == limit:
+            break
+    return picked
+
+
+def test_single_emotion_matches_brute_force(tmp_path):
+    # Pool smaller than the catalogue: the pool must hold the true nearest
+    for index in open_index(tmp_path, catalogue(), pool_size=50):
+        assert index.query({"sad": 1.0}, 10) == brute_force(
+            index, target_vector("sad"), 10
+        )
+
+
+def test_blended_target_from_fusion_mix(index):
+    mix = fusion_mix(
+        {"success": True, "emotion": "happy", "confidence": 0.9},
+        {"success": True, "emotion": "sad", "confidence": 0.5},
+    )
+    total = sum(mix.values())
+    target = sum(target_vector(e) * (w / total) for e, w in mix.items())
+
+    rows = index.query(mix, 10)
+
+    # Both pools cover the catalogue, so every row appears twice
+    assert len(set(rows)) == 10
+    assert rows == brute_force(index, target, 10)
+
+
+def test_artist_cap_falls_back_to_full_ranking(tmp_path):
+    # Three artists: the head partition can't fill 10 tracks at 2 per
+    # artist, and a blended query has to sort everything
+    for index in open_index(tmp_path, catalogue(n_artists=3), pool_size=N_TRACKS):
+        target = (target_vector("happy") + target_vector("sad")) / 2
+        rows = index.query({"happy": 1.0, "sad": 1.0}, 10, artist_cap=2)
+        assert len(rows) == 6
+        assert rows == brute_force(index, target, 10, artist_cap=2)
+
+    for index in open_index(tmp_path, catalogue(n_artists=40), pool_size=N_TRACKS):
+        mix = {"happy": 0.7, "calm": 0.3}
+        target = target_vector("happy") * 0.7 + target_vector("calm") * 0.3
+
+        rows = index.query(mix, 10, artist_cap=1)
+        assert len({int(index.artists[r]) for r in rows}) == 10
+        assert rows == brute_force(index, target, 10, artist_cap=1)
+
+
+@pytest.fixture
+def served(monkeypatch, tmp_path):
+    """recommend_local() over a 25-track pool with a fresh recent list"""
+    for index in open_index(tmp_path, catalogue(), pool_size=25):
+        monkeypatch.setattr(track_index, "_index", index)
+        monkeypatch.setattr(track_index, "_index_loaded", True)
+        monkeypatch.setattr(track_index, "_recent", RecentTracks())
+        yield index
+
+
+def test_recent_tracks_are_excluded_across_calls(served):
+    first = track_index.recommend_local("sad", 10, user_id="u1")
+    second = track_index.recommend_local("sad", 10, user_id="u1")
+    other_user = track_index.recommend_local("sad", 10, user_id="u2")
+
+    expected = brute_force(served, target_vector("sad"), 20)
+    assert [t["spotify_url"] for t in first] == [
+        served.track(r)["spotify_url"] for r in expected[:10]
+    ]
+    assert [t["spotify_url"] for t in second] == [
+        served.track(r)["spotify_url"] for r in expected[10:]
+    ]
+    assert other_user == first
+
+
+def test_exhausted_pool_is_a_miss_and_falls_back_to_spotify(served, monkeypatch):
+    calls = []
+
+    async def spotify(emotion, limit):
+        calls.append((emotion, limit))
+        return [{"name": "from spotify"}]
+
+    monkeypatch.setattr(track_index, "get_spotify_recommendations_async", spotify)
+    misses = track_index.INDEX_STATS["misses"]
+
+    assert track_index.recommend_local("sad", 10, user_id="u1") is not None
+    assert track_index.recommend_local("sad", 10, user_id="u1") is not None
+    # 5 of 25 pool rows left
+    assert track_index.recommend_local("sad", 10, user_id="u1") is None
+    assert track_index.INDEX_STATS["misses"] == misses + 1
+
+    tracks = asyncio.run(track_index.recommend_tracks_async("sad", 10, user_id="u1"))
+    assert tracks == [{"name": "from spotify"}]
+    assert calls == [("sad", 10)]
@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from fixtures import SR, speech_clip, wav_bytes
+from emotion.vad import trim_silence
+
+
+@pytest.mark.parametrize("seconds", [0.0, 0.01, 0.05, 0.1, 0.2, 0.25])
+def test_clips_shorter_than_one_window_have_no_speech(seconds):
+    audio = speech_clip(seconds) if seconds else np.zeros(0, np.float32)
+    voiced, info = trim_silence(audio, SR)
+    assert len(voiced) == 0
+    assert info["voiced_seconds"] == 0.0
+
+
+def test_leading_and_trailing_silence_is_trimmed():
+    speech = speech_clip(3)
+    pad = np.zeros(SR * 2, np.float32)
+    voiced, info = trim_silence(np.concatenate([pad, speech, pad]), SR)
+
+    assert 2.5 < info["voiced_seconds"] < 3.3
+    assert info["trimmed"] > 0.4
+    assert info["segments"] == 1
+
+
+def test_stationary_noise_is_not_speech():
+    noise = 0.01 * np.random.default_rng(0).normal(size=SR * 5)
+    _, info = trim_silence(noise.astype(np.float32), SR)
+    assert info["voiced_seconds"] == 0.0
+
+
+def test_short_upload_takes_the_too_little_speech_path():
+    from emotion import voice_emotion
+
+    result = voice_emotion.detect_voice_emotion_bytes(wav_bytes(speech_clip(0.2)))
+    assert result["success"] is False
+    assert result["voiced_seconds"] == 0.0
+    assert result["trimmed"] == 1.0
@@ -0,0 +1,74 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+import main
+from emotion.session_state import get_session_store
+from fixtures import speech_clip
+
+
+@pytest.fixture
+def client(monkeypatch, stand_ins):
+    # Startup would otherwise warm the recommendation cache over the network
+    monkeypatch.setattr(main, "WARM_SPOTIFY_CACHE", False)
+    with TestClient(main.app) as c:
+        yield c
+
+
+@pytest.mark.parametrize("frame", [
+    "not json",
+    "[1, 2]",
+    '{"sample_rate": "fast"}',
+    '{"sample_rate": -16000}',
+    '{"format": "u8"}',
+])
+def test_bad_control_frame_is_reported_and_stream_continues(client, frame):
+    with client.websocket_connect("/ws/voice") as ws:
+        ws.send_text(frame)
+        reply = ws.receive_json()
+        assert reply["type"] == "error"
+        assert "Invalid control message" in reply["detail"]
+
+        # Same connection still accepts a valid control frame
+        ws.send_text('{"sample_rate": 16000, "format": "s16"}')
+        ws.send_text('{"event": "end"}')
+
+
+def test_ephemeral_session_is_deleted_on_disconnect(client):
+    store = get_session_store()
+    before = store.get_stats()["size"]
+
+    audio = speech_clip(3.0, sr=main.TARGET_SR)
+    with client.websocket_connect("/ws/voice") as ws:
+        ws.send_bytes(audio.astype(np.float32).tobytes())
+        ws.send_text('{"event": "end"}')
+
+        replies = []
+        with pytest.raises(WebSocketDisconnect):
+            while True:
+                replies.append(ws.receive_json())
+        assert replies and all(r["type"] == "emotion" for r in replies)
+
+    # The handler deletes in its finally block, off the event loop; the
+    # test client can return before that delete has landed
+    deadline = time.monotonic() + 5.0
+    while store.get_stats()["size"] != before and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert store.get_stats()["size"] == before
+
+
+def test_process_mode_deletes_through_the_pool(monkeypatch):
+    # Memory store + process pool: the state lives in the workers, so the
+    # delete has to be sent there (a thread pool stands in for them here)
+    monkeypatch.setattr(main, "INFERENCE_EXECUTOR", "process")
+    monkeypatch.setattr(main, "SESSION_STORE", "memory")
+
+    store = get_session_store()
+    store.update("ephemeral-test", lambda state: None)
+    asyncio.run(main.drop_voice_session("ephemeral-test"))
+
+    assert "ephemeral-test" not in store._sessions
@@ -1,58 +1,39 @@
 import os
 import numpy as np
-import cv2
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import Conv2D, MaxPooling2D, Dense, Dropout, Flatten
-from tensorflow.keras.utils import to_categorical
 from tensorflow.keras.optimizers import Adam
-from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
+
+from ml_model.face_dataset import build_face_cache, make_dataset
 
 # ---------------- CONFIG ----------------
 DATASET_PATH = "datasets/fer2013/train"   # ✅ FIXED
+# Decoded 64x64 uint8 shards; rebuilt only when the dataset changes
+CACHE_DIR = os.getenv("FACE_DATASET_CACHE", "datasets/cache/fer2013_64")
 IMG_SIZE = 64
 EPOCHS = 30
 BATCH_SIZE = 64
+AUGMENT = os.getenv("FACE_AUGMENT", "1") == "1"
 EMOTIONS = ["angry", "fearful", "happy", "neutral", "sad"]
 
 # ---------------- LOAD DATA ----------------
-X, y = [], []
-
-for emotion in EMOTIONS:
-    folder = os.path.join(DATASET_PATH, emotion)
-    if not os.path.exists(folder):
-        raise FileNotFoundError(f"❌ Folder not found: {folder}")
-
-    for img_name in os.listdir(folder):
-        img_path = os.path.join(folder, img_name)
-        img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-
-        if img is None:
-            continue
+# One-time parallel decode + resize into a memory-mapped cache; later
+# runs start training immediately
+cache = build_face_cache(DATASET_PATH, EMOTIONS, CACHE_DIR, IMG_SIZE)
 
-        img = cv2.resize(img, (IMG_SIZE, IMG_SIZE))
-        X.append(img)
-        y.append(emotion)
-
-X = np.array(X, dtype="float32") / 255.0
-X = X.reshape(-1, IMG_SIZE, IMG_SIZE, 1)
+# ---------------- TRAIN / VAL SPLIT ----------------
+# Stratified 80/20 split with a fixed seed
+train_idx, val_idx = cache.split(test_size=0.2, seed=42)
 
-# ---------------- LABEL ENCODING ----------------
-encoder = LabelEncoder()
-y_encoded = encoder.fit_transform(y)
-y_cat = to_categorical(y_encoded)
+print("✅ Training samples:", (len(train_idx), IMG_SIZE, IMG_SIZE, 1))
+print("✅ Validation samples:", (len(val_idx), IMG_SIZE, IMG_SIZE, 1))
 
-# ---------------- TRAIN / VAL SPLIT ----------------
-X_train, X_val, y_train, y_val = train_test_split(
-    X,
-    y_cat,
-    test_size=0.2,
-    random_state=42,
-    stratify=y_encoded   # ✅ FIXED
+# Streams uint8 batches from the shards; normalize / augment / prefetch
+# run in parallel with training
+train_ds = make_dataset(
+    cache, train_idx, BATCH_SIZE, shuffle=True, augment=AUGMENT, seed=42
 )
-
-print("✅ Training samples:", X_train.shape)
-print("✅ Validation samples:", X_val.shape)
+val_ds = make_dataset(cache, val_idx, BATCH_SIZE)
 
 # ---------------- MODEL ----------------
 model = Sequential([
@@ -85,17 +66,16 @@ model.summary()
 
 # ---------------- TRAIN ----------------
 model.fit(
-    X_train,
-    y_train,
-    validation_data=(X_val, y_val),
-    epochs=EPOCHS,
-    batch_size=BATCH_SIZE
+    train_ds,
+    validation_data=val_ds,
+    epochs=EPOCHS
 )
 
 # ---------------- SAVE ----------------
 os.makedirs("model", exist_ok=True)
 
 model.save("model/face_emotion_model.h5")
-np.save("model/face_emotion_labels.npy", encoder.classes_)
+# Same sorted class order LabelEncoder produced
+np.save("model/face_emotion_labels.npy", cache.classes)
 
 print("✅ Face emotion model trained & saved successfully")
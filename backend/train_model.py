@@ -3,9 +3,8 @@ import numpy as np
 import sys
 import os
 
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-
-from features.extract_features import load_data
+# backend/ on the path, so features/ and emotion/ import from any cwd
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from sklearn.preprocessing import LabelEncoder
 from sklearn.model_selection import train_test_split
@@ -14,7 +13,8 @@ from keras.models import Sequential
 from keras.layers import Dense, Dropout
 from keras.utils import to_categorical
 
-# 👇 adjust import path if needed
+# Parallel extraction through the serving feature code; vectors are
+# cached by content hash, so re-runs only extract new / changed clips
 from features.extract_features import load_data
 
 
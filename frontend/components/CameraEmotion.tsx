@@ -10,6 +10,11 @@ type CameraEmotionProps = {
 
 const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL!;
 
+// 📡 WebSocket frames are cheap (server tracks the face and drops stale
+// frames), so stream much faster than the HTTP fallback polls
+const STREAM_INTERVAL_MS = 300;
+const POLL_INTERVAL_MS = 1500;
+
 export default function CameraEmotion({ onResult }: CameraEmotionProps) {
   const videoRef = useRef<HTMLVideoElement>(null);
   const canvasRef = useRef<HTMLCanvasElement>(null);
@@ -19,6 +24,8 @@ export default function CameraEmotion({ onResult }: CameraEmotionProps) {
 
   const lastEmotionRef = useRef<string | null>(null);
   const requestLock = useRef(false);
+  const socketRef = useRef<WebSocket | null>(null);
+  const lastPollRef = useRef(0);
 
   /* 🎥 Start camera */
   useEffect(() => {
@@ -27,12 +34,43 @@ export default function CameraEmotion({ onResult }: CameraEmotionProps) {
     });
   }, []);
 
+  /* 📡 Stream socket */
+  useEffect(() => {
+    const socket = new WebSocket(
+      `${BACKEND_URL.replace(/^http/, "ws")}/ws/camera`
+    );
+
+    socket.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type === "emotion") handleResult(data);
+    };
+    socket.onerror = (err) => console.error("Camera stream error:", err);
+
+    socketRef.current = socket;
+    return () => socket.close();
+  }, []);
+
   /* 🔁 Capture loop */
   useEffect(() => {
-    const id = setInterval(captureFrame, 1500);
+    const id = setInterval(captureFrame, STREAM_INTERVAL_MS);
     return () => clearInterval(id);
   }, []);
 
+  const handleResult = (data: { emotion?: string; confidence: number }) => {
+    if (!data?.emotion || data.confidence < 0.25) return;
+
+    // ❌ ignore same emotion
+    if (data.emotion === lastEmotionRef.current) return;
+
+    lastEmotionRef.current = data.emotion;
+
+    setEmotion(data.emotion);
+    setConfidence(data.confidence);
+
+    // 🔥 notify parent
+    onResult(data.emotion);
+  };
+
   const captureFrame = async () => {
     if (
       requestLock.current ||
@@ -40,6 +78,15 @@ export default function CameraEmotion({ onResult }: CameraEmotionProps) {
       !canvasRef.current
     ) return;
 
+    const socket = socketRef.current;
+    const streaming = socket?.readyState === WebSocket.OPEN;
+
+    // HTTP fallback keeps the old polling rate
+    if (!streaming) {
+      if (Date.now() - lastPollRef.current < POLL_INTERVAL_MS) return;
+      lastPollRef.current = Date.now();
+    }
+
     const canvas = canvasRef.current;
     const ctx = canvas.getContext("2d");
     if (!ctx) return;
@@ -51,6 +98,11 @@ export default function CameraEmotion({ onResult }: CameraEmotionProps) {
     canvas.toBlob(async (blob) => {
       if (!blob) return;
 
+      if (streaming && socket) {
+        socket.send(blob);
+        return;
+      }
+
       requestLock.current = true;
 
       const formData = new FormData();
@@ -62,20 +114,7 @@ export default function CameraEmotion({ onResult }: CameraEmotionProps) {
           body: formData,
         });
 
-        const data = await res.json();
-
-        if (!data?.emotion || data.confidence < 0.25) return;
-
-        // ❌ ignore same emotion
-        if (data.emotion === lastEmotionRef.current) return;
-
-        lastEmotionRef.current = data.emotion;
-
-        setEmotion(data.emotion);
-        setConfidence(data.confidence);
-
-        // 🔥 notify parent
-        onResult(data.emotion);
+        handleResult(await res.json());
 
       } catch (err) {
         console.error("Camera emotion error:", err);
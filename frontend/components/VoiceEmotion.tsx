@@ -5,6 +5,16 @@ import { motion, AnimatePresence } from "framer-motion";
 
 const BACKEND_URL = process.env.NEXT_PUBLIC_BACKEND_URL;
 
+// 🧠 Per-tab session: the backend smooths voice emotion over it
+const getSessionId = () => {
+  let id = sessionStorage.getItem("moodify-session-id");
+  if (!id) {
+    id = crypto.randomUUID();
+    sessionStorage.setItem("moodify-session-id", id);
+  }
+  return id;
+};
+
 type Result = {
   emotion: string;
   confidence: number;
@@ -30,8 +40,16 @@ export default function VoiceEmotion({ onResult }: Props) {
     const processor = audioContext.createScriptProcessor(4096, 1, 1);
     const chunks: Float32Array[] = [];
 
+    // 🔴 Live streaming: results arrive while still recording
+    const socket = openVoiceSocket(audioContext.sampleRate);
+
     processor.onaudioprocess = (e) => {
-      chunks.push(new Float32Array(e.inputBuffer.getChannelData(0)));
+      const chunk = new Float32Array(e.inputBuffer.getChannelData(0));
+      chunks.push(chunk);
+
+      if (socket.readyState === WebSocket.OPEN) {
+        socket.send(chunk.buffer);
+      }
     };
 
     source.connect(processor);
@@ -44,13 +62,46 @@ export default function VoiceEmotion({ onResult }: Props) {
       source.disconnect();
       stream.getTracks().forEach((t) => t.stop());
 
-      const wavBlob = encodeWAV(chunks, audioContext.sampleRate);
-      sendAudio(wavBlob);
+      if (socket.readyState === WebSocket.OPEN) {
+        setLoading(true);
+        socket.send(JSON.stringify({ event: "end" }));
+      } else {
+        // ↩️ Fallback: upload the whole clip
+        socket.onclose = null;
+        socket.close();
+        const wavBlob = encodeWAV(chunks, audioContext.sampleRate);
+        sendAudio(wavBlob);
+      }
 
       setRecording(false);
     }, 4000);
   };
 
+  const openVoiceSocket = (sampleRate: number) => {
+    const wsUrl = `${BACKEND_URL?.replace(/^http/, "ws")}/ws/voice?session_id=${getSessionId()}`;
+    const socket = new WebSocket(wsUrl);
+    socket.binaryType = "arraybuffer";
+
+    socket.onopen = () => {
+      socket.send(JSON.stringify({ sample_rate: sampleRate, format: "f32" }));
+    };
+
+    socket.onmessage = (event) => {
+      const data = JSON.parse(event.data);
+      if (data.type !== "emotion") return;
+
+      setResult(data);
+      if (data.success) {
+        onResult(data.emotion);
+      }
+    };
+
+    socket.onclose = () => setLoading(false);
+    socket.onerror = (err) => console.error("Voice stream error", err);
+
+    return socket;
+  };
+
   const sendAudio = async (audioBlob: Blob) => {
     setLoading(true);
 
@@ -60,6 +111,7 @@ export default function VoiceEmotion({ onResult }: Props) {
     try {
       const res = await fetch(`${BACKEND_URL}/analyze-voice`, {
         method: "POST",
+        headers: { "X-Session-Id": getSessionId() },
         body: formData,
       });
 